@@ -0,0 +1,7 @@
+"""
+Benchmarks locais do RPA.
+
+Importar `src.config` não exige mais as variáveis do SHIFT e da OpenAI
+(a validação é feita por perfil, ao iniciar o orquestrador), então os
+benchmarks rodam sem um `.env` real.
+"""
@@ -0,0 +1,106 @@
+"""
+Compara chamadas por segundo do `APIClient` usando o transporte com pool de
+conexões contra o comportamento anterior (`requests.request` a cada chamada,
+abrindo uma conexão nova por requisição).
+
+Uso:
+    python -m benchmarks.bench_api_client --chamadas 500 --threads 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from src.config.api_client import APIClient
+from src.config.http_transport import HTTPTransport
+from src.config.logger import logger
+from src.config.outbox import Outbox
+from src.config.polling_cache import PollingCache
+
+from .stub_server import StubAPIServer
+
+
+class TransporteLegado:
+    """Reproduz o `_make_request` original: sem sessão, sem timeout."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def request(self, method, endpoint, **kwargs):
+        return requests.request(method, f'{self.base_url}{endpoint}', **kwargs)
+
+
+def medir(cliente, operacao, chamadas, threads):
+    """Executa `operacao(cliente, i)` `chamadas` vezes e retorna chamadas/s."""
+    inicio = time.perf_counter()
+    if threads == 1:
+        for i in range(chamadas):
+            operacao(cliente, i)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda i: operacao(cliente, i), range(chamadas)))
+    return chamadas / (time.perf_counter() - inicio)
+
+
+OPERACOES = {
+    'get_pending_items': lambda c, i: c.get_pending_items('SHIFT'),
+    'update_item': lambda c, i: c.update_item(i + 1, status='STARTED'),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chamadas', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--latencia-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    logger.disable('src')
+
+    # Outbox e cache próprios: escritas pendentes do stub nunca podem ser
+    # reenviadas à API real pelo outbox de produção.
+    with StubAPIServer(
+        latencia=args.latencia_ms / 1000
+    ) as servidor, tempfile.TemporaryDirectory() as tmp:
+        clientes = {
+            'legado (requests.request)': APIClient(
+                'stub-access',
+                TransporteLegado(servidor.base_url),
+                outbox=Outbox(os.path.join(tmp, 'outbox-legado.sqlite3'), intervalo_reenvio=0),
+                polling_cache=PollingCache(),
+            ),
+            'pool (HTTPTransport)': APIClient(
+                'stub-access',
+                HTTPTransport(
+                    base_url=servidor.base_url, pool_size=max(args.threads, 1)
+                ),
+                outbox=Outbox(os.path.join(tmp, 'outbox-pool.sqlite3'), intervalo_reenvio=0),
+                polling_cache=PollingCache(),
+            ),
+        }
+
+        print(
+            f'{args.chamadas} chamadas, {args.threads} thread(s), '
+            f'latência do stub {args.latencia_ms:.0f} ms'
+        )
+        print(f'{"operação":<20} {"transporte":<28} {"chamadas/s":>12}')
+        for nome_op, operacao in OPERACOES.items():
+            resultados = {}
+            for nome_cliente, cliente in clientes.items():
+                resultados[nome_cliente] = medir(
+                    cliente, operacao, args.chamadas, args.threads
+                )
+                print(
+                    f'{nome_op:<20} {nome_cliente:<28} '
+                    f'{resultados[nome_cliente]:>12.1f}'
+                )
+            legado, pool = resultados.values()
+            print(f'{"":<20} {"ganho":<28} {pool / legado:>11.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Gerador de carga contra a API falsa (`stub_server`): executa cada operação
+do cliente várias vezes, em paralelo, e reporta requisições por segundo e
+latências p50/p99 por operação, além da quantidade de falhas.
+
+As escritas duráveis usam um outbox temporário, descartado ao final, sem
+intervalo entre reenvios: uma escrita que falhou é reenviada junto com a
+próxima, e o custo disso entra na latência medida.
+
+Uso:
+    python -m benchmarks.bench_carga --chamadas 500 --threads 8 \\
+        --latencia-ms 20 --variacao-ms 10 --taxa-erro 0.01
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config.api_client import APIClient
+from src.config.auth_service import AuthenticationService
+from src.config.http_transport import HTTPTransport
+from src.config.logger import logger
+from src.config.outbox import Outbox
+from src.config.polling_cache import PollingCache
+
+from .stub_server import adicionar_argumentos, criar_servidor
+
+OPERACOES = {
+    'login': lambda c, i: AuthenticationService.authenticate(
+        'benchmark', 'benchmark', transport=c.transport
+    ),
+    'get_pending_items': lambda c, i: c.get_pending_items('SHIFT'),
+    'get_sismama_data': lambda c, i: c.get_sismama_data(),
+    'upsert_shift_data': lambda c, i: c.upsert_shift_data(
+        i + 1, {'recipiente': f'{2300000000 + i}'}
+    ),
+    'update_item': lambda c, i: c.update_item(i + 1, status='STARTED'),
+    'update_task': lambda c, i: c.update_task(i + 1, status='STARTED'),
+    'send_alert': lambda c, i: c.send_alert(1, 'Informacao', f'Alerta {i}'),
+}
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) pelo método do posto mais próximo."""
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def medir(cliente, operacao, chamadas, threads):
+    """
+    Executa `operacao(cliente, i)` `chamadas` vezes e retorna
+    (requisições/s, latências em segundos, falhas).
+    """
+
+    def cronometrar(i):
+        inicio = time.perf_counter()
+        try:
+            ok = operacao(cliente, i) is not None
+        except Exception:
+            ok = False
+        return time.perf_counter() - inicio, ok
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        resultados = list(executor.map(cronometrar, range(chamadas)))
+    duracao = time.perf_counter() - inicio
+
+    latencias = [latencia for latencia, _ in resultados]
+    falhas = sum(1 for _, ok in resultados if not ok)
+    return chamadas / duracao, latencias, falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chamadas', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument(
+        '--operacoes',
+        nargs='+',
+        choices=list(OPERACOES),
+        default=list(OPERACOES),
+    )
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    logger.disable('src')
+
+    with criar_servidor(args) as servidor, tempfile.TemporaryDirectory() as tmp:
+        cliente = APIClient(
+            'stub-access',
+            HTTPTransport(base_url=servidor.base_url, pool_size=args.threads),
+            outbox=Outbox(os.path.join(tmp, 'outbox.sqlite3'), intervalo_reenvio=0),
+            polling_cache=PollingCache(),
+        )
+
+        print(
+            f'{args.chamadas} chamadas por operação, {args.threads} thread(s), '
+            f'latência {args.latencia_ms:.0f}±{args.variacao_ms:.0f} ms, '
+            f'taxa de erro {args.taxa_erro:.1%}'
+        )
+        print(
+            f'{"operação":<20} {"req/s":>10} {"p50 (ms)":>10} '
+            f'{"p99 (ms)":>10} {"falhas":>8}'
+        )
+        for nome in args.operacoes:
+            rps, latencias, falhas = medir(
+                cliente, OPERACOES[nome], args.chamadas, args.threads
+            )
+            print(
+                f'{nome:<20} {rps:>10.1f} {percentil(latencias, 50) * 1000:>10.1f} '
+                f'{percentil(latencias, 99) * 1000:>10.1f} {falhas:>8}'
+            )
+        print(f'erros injetados pela API falsa: {servidor.erros_injetados}')
+        pendentes = cliente.outbox.contar()
+        if pendentes:
+            print(f'escritas mantidas no outbox: {pendentes}')
+
+
+if __name__ == '__main__':
+    main()
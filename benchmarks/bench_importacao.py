@@ -0,0 +1,148 @@
+"""
+Mede o custo de inicialização com `python -X importtime`.
+
+Para cada perfil (RPA_PROFILE), mede em um processo novo o tempo de
+`import main` (o que todo nó paga ao subir) e, à parte, o custo dos
+módulos do estágio, carregados só quando ele roda pela primeira vez. O
+tempo de cada medição é a soma do `cumulative` dos imports de primeiro
+nível, descontados os módulos que o interpretador já carrega sozinho
+(`-c pass`), e vale a mediana das repetições.
+
+Sai com código 1 se a inicialização de algum perfil passar do orçamento.
+
+Uso:
+    python -m benchmarks.bench_importacao --repeticoes 5 --orcamento-ms 300
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from src.config.config import Config
+
+# Módulos carregados na primeira execução de cada estágio
+MODULOS_ESTAGIO = {
+    'SHIFT': ['src.controllers.shift_controller'],
+    'IMAGE_PROCESS': ['src.neural_vision.image_processor'],
+    'SISMAMA': ['src.desktop.sismama_runner', 'src.desktop.sismama_digitador'],
+}
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def importtime(codigo, perfil=None):
+    """
+    Executa `codigo` com `-X importtime` e retorna ([(profundidade, módulo,
+    cumulative em µs)], erro ou None).
+    """
+    env = dict(os.environ)
+    if perfil:
+        env['RPA_PROFILE'] = perfil
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=RAIZ,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    modulos = []
+    outras = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith('import time:'):
+            outras.append(linha)
+            continue
+        partes = linha.split('|')
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue  # cabeçalho
+        nome = partes[2][1:]
+        profundidade = (len(nome) - len(nome.lstrip())) // 2
+        modulos.append((profundidade, nome.strip(), int(partes[1])))
+    erro = None
+    if resultado.returncode != 0:
+        erro = outras[-1] if outras else f'código {resultado.returncode}'
+    return modulos, erro
+
+
+def medir(codigo, perfil, ignorar, repeticoes):
+    """
+    Mediana (ms) do custo de `codigo`, os três imports mais caros logo
+    abaixo do primeiro nível e o erro, se houver.
+    """
+    totais = []
+    modulos = []
+    for _ in range(repeticoes):
+        modulos, erro = importtime(codigo, perfil)
+        if erro:
+            return None, [], erro
+        totais.append(
+            sum(us for nivel, nome, us in modulos if nivel == 0 and nome not in ignorar)
+            / 1000
+        )
+    # A saída lista os imports internos antes do módulo que os fez.
+    filhos, internos = [], []
+    for nivel, nome, us in modulos:
+        if nivel == 1:
+            filhos.append((us / 1000, nome))
+        elif nivel == 0:
+            if nome not in ignorar:
+                internos += filhos
+            filhos = []
+    maiores = sorted(internos, reverse=True)[:3]
+    return statistics.median(totais), maiores, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--perfis', nargs='+', default=list(Config.PERFIS), choices=list(Config.PERFIS)
+    )
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument(
+        '--orcamento-ms',
+        type=float,
+        default=300.0,
+        help='tempo máximo de `import main` em cada perfil',
+    )
+    args = parser.parse_args()
+
+    # Imports que o interpretador faz antes do código (site, encodings...)
+    ignorar = {nome for _, nome, _ in importtime('pass')[0]}
+    estourados = []
+
+    print(f'{"perfil":<10} {"medição":<30} {"ms":>8}  maiores imports')
+    for perfil in args.perfis:
+        medicoes = [('inicialização (import main)', 'import main')]
+        for estagio in Config.estagios_ativos(perfil):
+            modulos = MODULOS_ESTAGIO[estagio]
+            # O custo do estágio é a diferença para a inicialização.
+            codigo = 'import main; ' + '; '.join(f'import {m}' for m in modulos)
+            medicoes.append((f'+ estágio {estagio}', codigo))
+
+        base = None
+        for rotulo, codigo in medicoes:
+            ms, maiores, erro = medir(codigo, perfil, ignorar, args.repeticoes)
+            if erro:
+                print(f'{perfil:<10} {rotulo:<30} {"falhou":>8}  {erro}')
+                if base is None:
+                    estourados.append(perfil)
+                    break
+                continue
+            if base is None:
+                base = ms
+                if ms > args.orcamento_ms:
+                    estourados.append(perfil)
+            else:
+                ms -= base
+            resumo = ', '.join(f'{nome} {t:.0f}' for t, nome in maiores)
+            print(f'{perfil:<10} {rotulo:<30} {ms:>8.1f}  {resumo}')
+
+    print(f'orçamento de inicialização: {args.orcamento_ms:.0f} ms')
+    if estourados:
+        print(f'ERRO: acima do orçamento: {", ".join(estourados)}')
+    sys.exit(1 if estourados else 0)
+
+
+if __name__ == '__main__':
+    main()
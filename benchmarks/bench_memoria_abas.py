@@ -0,0 +1,124 @@
+"""
+Compara a memória do Chrome por O.S. simultânea entre o pool de
+navegadores (`ShiftPool`, um Chrome por worker) e as abas em um único
+Chrome (`ShiftAbas`).
+
+Para cada concorrência N, sobe N navegadores e, à parte, um navegador com
+N abas, todos parados na mesma tela, e soma a memória residente da árvore
+de cada chromedriver (Chrome, renderizadores, GPU...). Com `--shift` cada
+navegador/aba faz login e abre a O.S Consulta (exige as variáveis do
+SHIFT); sem ele, só carrega `--url`.
+
+Requer Chrome e o chromedriver, como o robô. Enquanto não houver um
+resultado dele na máquina do robô, SHIFT_ABAS segue experimental.
+
+Uso:
+    python -m benchmarks.bench_memoria_abas --concorrencias 1 2 4 --shift
+"""
+
+import argparse
+import time
+
+from src.browser.utils.browser_manager import finalizar_driver, iniciar_driver
+from src.config.config import Config
+from src.config.logger import logger
+from src.utils.supervisor import memoria_arvore
+
+
+class _ApiNula:
+    """Cliente que descarta as escritas: o benchmark não processa O.S."""
+
+    def __getattr__(self, nome):
+        return lambda *args, **kwargs: None
+
+
+def _pid(driver):
+    return driver.service.process.pid
+
+
+def _controller():
+    from src.controllers.shift_controller import ShiftController
+
+    return ShiftController(
+        url=Config.URL,
+        usuario=Config.USUARIO,
+        senha=Config.SENHA,
+        screenshot_path=Config.LOG_DIR,
+        api_client=_ApiNula(),
+        robot_id=Config.ROBOT_ID,
+    )
+
+
+def medir_pool(args, n):
+    """Memória (bytes) de `n` navegadores independentes."""
+    drivers, controllers = [], []
+    try:
+        for _ in range(n):
+            if args.shift:
+                controller = _controller()
+                controllers.append(controller)
+                if not controller.preparar_sessao():
+                    raise RuntimeError('login no SHIFT falhou')
+                drivers.append(controller.driver)
+            else:
+                driver = iniciar_driver(headless=True)
+                drivers.append(driver)
+                driver.get(args.url)
+        time.sleep(args.assentar)
+        return sum(memoria_arvore(_pid(driver)) or 0 for driver in drivers)
+    finally:
+        for controller in controllers:
+            controller.finalizar()
+        if not args.shift:
+            for driver in drivers:
+                finalizar_driver(driver)
+
+
+def medir_abas(args, n):
+    """Memória (bytes) de um navegador com `n` abas."""
+    if args.shift:
+        from src.controllers.shift_abas import ShiftAbas
+
+        abas = ShiftAbas(_controller(), abas=n)
+        try:
+            if not abas.preparar_sessao():
+                raise RuntimeError('login no SHIFT falhou')
+            time.sleep(args.assentar)
+            return memoria_arvore(abas.controller.pid_navegador()) or 0
+        finally:
+            abas.finalizar()
+
+    driver = iniciar_driver(headless=True)
+    try:
+        driver.get(args.url)
+        for _ in range(n - 1):
+            driver.switch_to.new_window('tab')
+            driver.get(args.url)
+        time.sleep(args.assentar)
+        return memoria_arvore(_pid(driver)) or 0
+    finally:
+        finalizar_driver(driver)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concorrencias', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--shift', action='store_true', help='login e O.S Consulta reais')
+    parser.add_argument('--url', default=Config.URL or 'about:blank')
+    parser.add_argument(
+        '--assentar', type=float, default=5, help='s de espera antes de medir'
+    )
+    args = parser.parse_args()
+    if args.shift:
+        Config.validar_shift()
+
+    logger.disable('src')
+    print(f'{"O.S. simultâneas":>16} {"modo":>6} {"MB total":>9} {"MB por O.S.":>12}')
+    for n in args.concorrencias:
+        for modo, medir in (('pool', medir_pool), ('abas', medir_abas)):
+            total = medir(args, n) / 2**20
+            print(f'{n:>16} {modo:>6} {total:>9.0f} {total / n:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Compara o Chrome do robô com e sem o perfil leve (SHIFT_PERFIL_LEVE:
+recursos bloqueados, page load 'eager', sem serviços em segundo plano).
+
+Para cada perfil, mede o tempo de página e, ao final, a memória da
+árvore de processos do chromedriver (`memoria_arvore`):
+
+  - com `--shift OS=NOME ...`: faz login e, para cada O.S., mede a busca e
+    a extração completas pelo navegador (exige as variáveis do SHIFT; as
+    escritas na API são descartadas);
+  - sem `--shift`: carrega as `--url` `--repeticoes` vezes, contando
+    também os recursos baixados (Resource Timing).
+
+Requer Chrome e o chromedriver, como o robô. Enquanto não houver um
+resultado dele com `--shift` na máquina do robô, SHIFT_PERFIL_LEVE fica
+desligado por padrão.
+
+Uso:
+    python -m benchmarks.bench_perfil_navegador --shift 123456=MARIA\\ DA\\ SILVA
+    python -m benchmarks.bench_perfil_navegador --url https://exemplo --repeticoes 5
+"""
+
+import argparse
+import statistics
+import time
+
+from src.browser.utils.browser_manager import finalizar_driver, iniciar_driver
+from src.config.config import Config
+from src.config.logger import logger
+from src.utils.supervisor import memoria_arvore
+
+RECURSOS_JS = """
+const recursos = performance.getEntriesByType('resource');
+return [recursos.length, recursos.reduce((total, r) => total + (r.transferSize || 0), 0)];
+"""
+
+
+class _ApiNula:
+    """Cliente que descarta as escritas: o benchmark não conclui O.S."""
+
+    def __getattr__(self, nome):
+        return lambda *args, **kwargs: None
+
+
+def _pid(driver):
+    return driver.service.process.pid
+
+
+def medir_urls(args, perfil_leve):
+    """(segundos por página, recursos por página, KB por página, bytes de memória)"""
+    driver = iniciar_driver(headless=True, perfil_leve=perfil_leve)
+    tempos, recursos, transferido = [], [], []
+    try:
+        for _ in range(args.repeticoes):
+            for url in args.url:
+                driver.get('about:blank')
+                inicio = time.perf_counter()
+                driver.get(url)
+                tempos.append(time.perf_counter() - inicio)
+                quantidade, tamanho = driver.execute_script(RECURSOS_JS)
+                recursos.append(quantidade)
+                transferido.append(tamanho / 1024)
+        time.sleep(args.assentar)
+        memoria = memoria_arvore(_pid(driver)) or 0
+    finally:
+        finalizar_driver(driver)
+    return (
+        statistics.median(tempos),
+        statistics.mean(recursos),
+        statistics.mean(transferido),
+        memoria,
+    )
+
+
+def medir_shift(args, perfil_leve):
+    """(segundos por O.S., O.S. extraídas, bytes de memória)"""
+    from src.controllers.navigation_handler import buscar_os_no_sistema
+    from src.controllers.shift_controller import ShiftController
+
+    Config.SHIFT_PERFIL_LEVE = perfil_leve
+    api = _ApiNula()
+    controller = ShiftController(
+        url=Config.URL,
+        usuario=Config.USUARIO,
+        senha=Config.SENHA,
+        screenshot_path=Config.LOG_DIR,
+        api_client=api,
+        robot_id=Config.ROBOT_ID,
+    )
+    tempos, extraidas = [], 0
+    try:
+        if not controller.preparar_sessao():
+            raise RuntimeError('login no SHIFT falhou')
+        for par in args.shift:
+            os_numero, nome = par.split('=', 1)
+            inicio = time.perf_counter()
+            if buscar_os_no_sistema(controller.driver, api, 0, 0, os_numero):
+                extraidas += bool(controller._extrair_dados_do_shift(os_numero, 0, nome))
+            tempos.append(time.perf_counter() - inicio)
+        time.sleep(args.assentar)
+        memoria = memoria_arvore(controller.pid_navegador()) or 0
+    finally:
+        controller.finalizar()
+    return statistics.median(tempos), extraidas, memoria
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--shift', nargs='+', metavar='OS=NOME', help='O.S. reais do SHIFT')
+    parser.add_argument('--url', nargs='+', default=[Config.URL or 'about:blank'])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument(
+        '--assentar', type=float, default=3, help='s de espera antes de medir a memória'
+    )
+    args = parser.parse_args()
+    if args.shift:
+        Config.validar_shift()
+
+    logger.disable('src')
+    perfis = (('padrão', False), ('leve', True))
+    if args.shift:
+        print(f'{"perfil":>7} {"s por O.S.":>10} {"extraídas":>9} {"MB Chrome":>9}')
+        for nome, leve in perfis:
+            tempo, extraidas, memoria = medir_shift(args, leve)
+            print(
+                f'{nome:>7} {tempo:>10.2f} {extraidas:>5}/{len(args.shift):<3} '
+                f'{memoria / 2**20:>9.0f}'
+            )
+    else:
+        print(f'{"perfil":>7} {"s por página":>12} {"recursos":>8} {"KB":>8} {"MB Chrome":>9}')
+        for nome, leve in perfis:
+            tempo, recursos, transferido, memoria = medir_urls(args, leve)
+            print(
+                f'{nome:>7} {tempo:>12.2f} {recursos:>8.0f} {transferido:>8.0f} '
+                f'{memoria / 2**20:>9.0f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Conta os comandos WebDriver (idas e voltas ao chromedriver) que a
+extração de uma O.S. faz, antes e depois da extração declarativa
+(`src.browser.utils.extracao_js`).
+
+As funções de extração das telas de paciente, exame, 'Manutenção de
+indivíduo' e endereço rodam contra um driver falso que conta cada
+comando que o Selenium mandaria ao chromedriver (`find_element`, cada
+`get_attribute`/`is_displayed`/`text`, `click`, `execute_script`,
+`switch_to`...), com todas as telas já prontas. A versão "antes" é lida
+do git (`--antes`, por padrão o commit anterior à extração declarativa).
+
+Uso:
+    python -m benchmarks.contar_comandos_extracao
+"""
+
+import argparse
+import collections
+import re
+import subprocess
+import types
+
+from selenium.webdriver.remote.webelement import WebElement
+
+from src.config.logger import logger
+
+TELAS = (
+    ('paciente', 'src/controllers/paciente_controller.py', 'extrair_dados_paciente'),
+    ('exame', 'src/controllers/anatomopatologico_controller.py', 'extrair_dados_anatomopatologico'),
+    ('manutenção', 'src/controllers/paciente_controller.py', 'extrair_informacoes_paciente'),
+    ('endereço', 'src/controllers/endereco_controller.py', 'extrair_dados_endereco'),
+)
+
+TEXTO = '01/01/1980 (45 anos) - Dimensão do fragmento 1,5 cm, mama esquerda, QSL'
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def frame(self, frame):
+        self.driver.contar('switch_to.frame')
+
+    def default_content(self):
+        self.driver.contar('switch_to.default_content')
+
+
+class DriverContador:
+    """Driver falso: toda tela está pronta e todo comando é contado."""
+
+    def __init__(self):
+        self.comandos = collections.Counter()
+        self.switch_to = _SwitchTo(self)
+
+    def contar(self, comando):
+        self.comandos[comando] += 1
+
+    def execute(self, comando, params=None):
+        self.contar(comando)
+        return {'value': TEXTO if 'Text' in comando else True}
+
+    def find_element(self, by=None, value=None):
+        self.contar('find_element')
+        return WebElement(self, 'elemento')
+
+    def find_elements(self, by=None, value=None):
+        self.contar('find_elements')
+        return [WebElement(self, 'elemento')]
+
+    def execute_script(self, script, *args):
+        self.contar('execute_script')
+        if 'viaFallback' in script:
+            dados = {}
+            for nome, _, _, regex, _ in args[1]:
+                dados[nome] = re.search(regex, TEXTO).group(1) if regex else TEXTO
+            return {'dados': dados, 'viaFallback': []}
+        if 'getAttribute' in script:
+            return TEXTO
+        return True
+
+
+def _revisao_antes():
+    """Commit anterior ao que criou `extracao_js.py`."""
+    criacao = subprocess.run(
+        ['git', 'log', '--diff-filter=A', '--format=%H', '-1', '--',
+         'src/browser/utils/extracao_js.py'],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    return f'{criacao}^' if criacao else 'HEAD'
+
+
+def _carregar(revisao, caminho):
+    """Importa `caminho` como estava em `revisao`, sem tocar na árvore."""
+    fonte = subprocess.run(
+        ['git', 'show', f'{revisao}:{caminho}'], capture_output=True, text=True, check=True
+    ).stdout
+    modulo = types.ModuleType('src.antes.' + caminho[4:-3].replace('/', '.'))
+    exec(compile(fonte, caminho, 'exec'), modulo.__dict__)
+    return modulo
+
+
+def _atual(caminho):
+    return __import__(caminho[:-3].replace('/', '.'), fromlist=['_'])
+
+
+def contar(carregar):
+    """{tela: comandos} de uma O.S."""
+    resultado = {}
+    for tela, caminho, funcao in TELAS:
+        driver = DriverContador()
+        if not getattr(carregar(caminho), funcao)(driver):
+            raise RuntimeError(f'extração da tela {tela} falhou')
+        resultado[tela] = sum(driver.comandos.values())
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--antes', help='revisão do git da versão anterior')
+    args = parser.parse_args()
+    revisao = args.antes or _revisao_antes()
+
+    logger.disable('src')
+    antes = contar(lambda caminho: _carregar(revisao, caminho))
+    depois = contar(_atual)
+
+    print(f'Comandos WebDriver por O.S. ({revisao} -> árvore atual)')
+    print(f'{"tela":>12} {"antes":>6} {"depois":>7}')
+    for tela, *_ in TELAS:
+        print(f'{tela:>12} {antes[tela]:>6} {depois[tela]:>7}')
+    print(f'{"total":>12} {sum(antes.values()):>6} {sum(depois.values()):>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Simula vários robôs dividindo a mesma fila de SHIFT na API falsa, usando
+`LeaseManager` para reivindicar itens.
+
+Cada robô é uma thread com seu próprio `APIClient`, outbox e cache de
+polling. Um dos robôs "morre" depois de reivindicar seus itens (para de
+renovar os leases sem liberá-los); os demais devem reivindicá-los quando
+expirarem. Ao final, verifica que todo item foi concluído exatamente uma vez.
+
+Uso:
+    python -m benchmarks.simular_leases --robos 4 --tarefas 20 --ttl 2
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from src.config.api_client import APIClient
+from src.config.http_transport import HTTPTransport
+from src.config.lease_manager import LeaseManager
+from src.config.logger import logger
+from src.config.outbox import Outbox
+from src.config.polling_cache import PollingCache
+
+from .stub_server import StubAPIServer, gerar_backlog
+
+
+def robo(servidor, robot_id, args, tmp, morrer=False):
+    cliente = APIClient(
+        'stub-access',
+        HTTPTransport(base_url=servidor.base_url),
+        outbox=Outbox(os.path.join(tmp, f'outbox-{robot_id}.sqlite3'), 0),
+        polling_cache=PollingCache(),
+    )
+    leases = LeaseManager(cliente, robot_id, ttl=args.ttl)
+    limite = time.monotonic() + args.duracao
+
+    while time.monotonic() < limite:
+        tarefas = cliente.get_pending_items('SHIFT') or []
+        ids = [item['id'] for tarefa in tarefas for item in tarefa['items']]
+        if not ids:
+            if not servidor.backlog:
+                return
+            time.sleep(args.ttl / 4)
+            continue
+
+        # Reivindica um lote pequeno por vez, como um robô real; a ordem
+        # aleatória evita que todos disputem sempre os mesmos itens.
+        random.shuffle(ids)
+        concedidos = leases.reivindicar('SHIFT', ids[: args.lote])
+        if morrer and concedidos:
+            # Para de renovar sem liberar: os leases precisam expirar.
+            with leases._lock:
+                leases._leases.clear()
+            print(f'robô {robot_id} morreu com {len(concedidos)} item(ns)')
+            return
+
+        for item_id in sorted(concedidos):
+            time.sleep(args.trabalho_ms / 1000)
+            if leases.possui(item_id):
+                cliente.update_item(item_id, status='COMPLETED', stage='IMAGE_PROCESS')
+        leases.liberar(concedidos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--robos', type=int, default=4)
+    parser.add_argument('--tarefas', type=int, default=20)
+    parser.add_argument('--itens-por-tarefa', type=int, default=5)
+    parser.add_argument('--lote', type=int, default=5)
+    parser.add_argument('--ttl', type=float, default=2.0)
+    parser.add_argument('--trabalho-ms', type=float, default=20.0)
+    parser.add_argument('--duracao', type=float, default=60.0)
+    args = parser.parse_args()
+
+    logger.disable('src')
+    backlog = gerar_backlog(args.tarefas, args.itens_por_tarefa)
+    total = sum(len(tarefa['items']) for tarefa in backlog)
+
+    inicio = time.perf_counter()
+    with StubAPIServer(backlog=backlog) as servidor, tempfile.TemporaryDirectory() as tmp:
+        threads = [
+            threading.Thread(
+                target=robo, args=(servidor, robot_id, args, tmp, robot_id == 1)
+            )
+            for robot_id in range(1, args.robos + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        conclusoes = dict(servidor.conclusoes)
+
+    duplicados = {i: n for i, n in conclusoes.items() if n > 1}
+    print(
+        f'{len(conclusoes)}/{total} itens concluídos em '
+        f'{time.perf_counter() - inicio:.1f}s por {args.robos} robôs'
+    )
+    if duplicados:
+        print(f'ERRO: itens concluídos mais de uma vez: {duplicados}')
+    if len(conclusoes) != total:
+        print('ERRO: itens não concluídos.')
+    sys.exit(1 if duplicados or len(conclusoes) != total else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Simula a janela de lote (`JanelaLote`) para escolher LOTE_MIN_ITENS e
+LOTE_ESPERA_MAXIMA de um estágio.
+
+Itens chegam por um processo de Poisson; o agendador consulta o estágio a
+cada `--intervalo` segundos (ou antes, quando a janela pede). Cada lote
+liberado paga a partida a frio do recurso (`--partida`, ex.: Chrome com
+login) e depois `--por-item` segundos por item, e o recurso é fechado ao
+final, como fora do modo daemon. Para cada combinação de mínimo de itens e
+espera máxima, reporta a latência dos itens (chegada até a conclusão) e o
+custo de partida amortizado: quanto maior o lote, menos partidas e mais
+espera.
+
+Uso:
+    python -m benchmarks.simular_lotes --itens-por-hora 12 --partida 45 \\
+        --minimos 1 3 5 10 --esperas 0 300 900
+"""
+
+import argparse
+import random
+
+from src.config.logger import logger
+from src.utils.janela_lote import JanelaLote
+
+from .bench_carga import percentil
+
+
+def simular(args, minimo, espera):
+    """Retorna (latências em s, partidas, segundos com o recurso aberto)."""
+    rng = random.Random(args.seed)
+    chegadas = []
+    t = rng.expovariate(args.itens_por_hora / 3600)
+    while t < args.duracao * 3600:
+        chegadas.append(t)
+        t += rng.expovariate(args.itens_por_hora / 3600)
+
+    relogio = [0.0]
+    janela = JanelaLote({'SHIFT': minimo}, {'SHIFT': espera}, relogio=lambda: relogio[0])
+    pendentes = {}
+    latencias = []
+    partidas = 0
+    ocupado = 0.0
+    proxima = 0
+    while proxima < len(chegadas) or pendentes:
+        agora = relogio[0]
+        while proxima < len(chegadas) and chegadas[proxima] <= agora:
+            pendentes[proxima] = chegadas[proxima]
+            proxima += 1
+
+        if pendentes and janela.avaliar('SHIFT', list(pendentes)):
+            janela.registrar_partida('SHIFT', args.partida)
+            for ordem, chegada in enumerate(sorted(pendentes.values()), 1):
+                fim = agora + args.partida + ordem * args.por_item
+                latencias.append(fim - chegada)
+            duracao = args.partida + len(pendentes) * args.por_item
+            partidas += 1
+            ocupado += duracao
+            pendentes.clear()
+            relogio[0] += duracao
+
+        # Mesmo critério do agendador: intervalo fixo, encurtado pela janela
+        passo = args.intervalo
+        limite = janela.proxima_verificacao('SHIFT')
+        if limite is not None:
+            passo = max(1.0, min(passo, limite))
+        relogio[0] += passo
+    return latencias, partidas, ocupado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--itens-por-hora', type=float, default=12)
+    parser.add_argument('--duracao', type=float, default=48, help='horas simuladas')
+    parser.add_argument('--partida', type=float, default=45, help='s por partida a frio')
+    parser.add_argument('--por-item', type=float, default=20, help='s por item')
+    parser.add_argument('--intervalo', type=float, default=60, help='s entre consultas')
+    parser.add_argument('--minimos', type=int, nargs='+', default=[1, 3, 5, 10])
+    parser.add_argument('--esperas', type=float, nargs='+', default=[0, 300, 900, 1800])
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logger.disable('src')
+    print(
+        f'{args.itens_por_hora:g} itens/h por {args.duracao:g} h, partida {args.partida:g}s, '
+        f'{args.por_item:g}s/item, consulta a cada {args.intervalo:g}s'
+    )
+    print(
+        f'{"mínimo":>7} {"espera (s)":>10} {"partidas":>9} {"itens/lote":>11} '
+        f'{"lat. média (s)":>15} {"lat. p95 (s)":>13} {"partida/item (s)":>17} '
+        f'{"recurso aberto":>15}'
+    )
+    total = args.duracao * 3600
+    for minimo in args.minimos:
+        for espera in args.esperas:
+            latencias, partidas, ocupado = simular(args, minimo, espera)
+            if not latencias:
+                continue
+            print(
+                f'{minimo:>7} {espera:>10.0f} {partidas:>9} '
+                f'{len(latencias) / partidas:>11.1f} '
+                f'{sum(latencias) / len(latencias):>15.0f} '
+                f'{percentil(latencias, 95):>13.0f} '
+                f'{partidas * args.partida / len(latencias):>17.1f} '
+                f'{ocupado / total:>15.1%}'
+            )
+
+
+if __name__ == '__main__':
+    main()
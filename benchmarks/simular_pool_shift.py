@@ -0,0 +1,146 @@
+"""
+Simula o `ShiftPool` com navegadores falsos para ver como a vazão do SHIFT
+escala com o número de workers.
+
+Cada O.S. percorre `--passos` telas. Cada passo tem uma parte local
+(renderização no Chrome, limitada por `--nucleos` em paralelo) e uma
+resposta do servidor do SHIFT, que atende no máximo `--capacidade`
+requisições ao mesmo tempo. Com poucos workers a vazão cresce quase
+linearmente; depois o gargalo passa a ser a máquina ou o servidor.
+`--falhas` derruba o navegador em uma fração das O.S. para exercitar o
+reinício dos workers (cada reinício paga o login de novo).
+
+Os tempos são em segundos simulados; `--escala` os comprime na execução.
+
+Uso:
+    python -m benchmarks.simular_pool_shift --os 120 --workers 1 2 4 8 \\
+        --nucleos 4 --capacidade 6
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from src.config.logger import logger
+from src.controllers.shift_pool import ShiftPool
+
+
+class NavegadorFalho(Exception):
+    pass
+
+
+class ControladorSimulado:
+    """Faz o papel do `ShiftController`: login, O.S Consulta e extração."""
+
+    def __init__(self, args, nucleos, servidor, rng):
+        self.args = args
+        self.nucleos = nucleos
+        self.servidor = servidor
+        self.rng = rng
+        self.lease_manager = None
+        self.ativo = True
+
+    def _esperar(self, segundos):
+        time.sleep(segundos * self.args.escala)
+
+    def _passo(self):
+        with self.nucleos:
+            self._esperar(self.args.local)
+        with self.servidor:
+            self._esperar(self.args.servidor)
+
+    def preparar_sessao(self):
+        for _ in range(3):
+            self._passo()
+        return True
+
+    def navegador_ativo(self):
+        return self.ativo
+
+    def pid_navegador(self):
+        return None
+
+    def processar_dados(self, tasks, ao_concluir=None):
+        for task in tasks:
+            for _ in range(self.args.passos):
+                self._passo()
+            if self.rng.random() < self.args.falhas:
+                self.ativo = False
+                raise NavegadorFalho('chrome caiu')
+            if ao_concluir:
+                ao_concluir({'id': task['item_id']})
+        return True
+
+    def finalizar(self):
+        self.ativo = False
+
+
+def rodar(args, workers):
+    """Retorna (O.S. concluídas, segundos simulados, reinícios)."""
+    nucleos = threading.BoundedSemaphore(args.nucleos)
+    servidor = threading.BoundedSemaphore(args.capacidade)
+    rng = random.Random(args.seed)
+    criados = []
+
+    def criar_controller(api_client):
+        controller = ControladorSimulado(args, nucleos, servidor, rng)
+        criados.append(controller)
+        return controller
+
+    pool = ShiftPool(
+        criar_controller,
+        api_client=object(),
+        tamanho=workers,
+        backoff_inicial=args.escala,
+        backoff_maximo=args.escala,
+    )
+    concluidas = []
+    orders = [{'os': i, 'os_name': f'P{i}', 'task_id': 1, 'item_id': i} for i in range(args.os)]
+    try:
+        pool.preparar_sessao()
+        inicio = time.monotonic()
+        pool.processar_dados(orders, ao_concluir=concluidas.append)
+        duracao = (time.monotonic() - inicio) / args.escala
+    finally:
+        pool.finalizar()
+    return len(concluidas), duracao, len(criados) - workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--os', type=int, default=120)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--passos', type=int, default=8, help='telas por O.S.')
+    parser.add_argument('--local', type=float, default=1.5, help='s de CPU local por tela')
+    parser.add_argument('--servidor', type=float, default=1.0, help='s de servidor por tela')
+    parser.add_argument('--nucleos', type=int, default=4)
+    parser.add_argument('--capacidade', type=int, default=6, help='requisições simultâneas')
+    parser.add_argument('--falhas', type=float, default=0.02, help='fração de O.S. com queda')
+    parser.add_argument('--escala', type=float, default=0.005, help='s reais por s simulado')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logger.disable('src')
+    print(
+        f'{args.os} O.S. de {args.passos} telas ({args.local:g}s local + '
+        f'{args.servidor:g}s servidor), {args.nucleos} núcleos, servidor com '
+        f'{args.capacidade} requisições simultâneas'
+    )
+    print(
+        f'{"workers":>7} {"concluídas":>10} {"O.S./min":>9} {"speedup":>8} '
+        f'{"eficiência":>10} {"reinícios":>9}'
+    )
+    base = None
+    for workers in args.workers:
+        concluidas, duracao, reinicios = rodar(args, workers)
+        vazao = concluidas / duracao * 60
+        base = base or vazao
+        print(
+            f'{workers:>7} {concluidas:>10} {vazao:>9.1f} {vazao / base:>7.2f}x '
+            f'{vazao / base / workers:>10.0%} {reinicios:>9}'
+        )
+
+
+if __name__ == '__main__':
+    main()
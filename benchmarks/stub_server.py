@@ -0,0 +1,484 @@
+"""
+Servidor HTTP local que imita os endpoints da API do painel usados pelo
+`APIClient`, pelo `AuthenticationService` e pelo `OrquestradorRPA`. Serve
+apenas para benchmarks e experimentos locais.
+
+Latência (com variação), taxa de erro e tamanho do backlog são
+configuráveis. Uso direto:
+    python -m benchmarks.stub_server --port 8765 --latencia-ms 50 --taxa-erro 0.02
+
+Para rodar o RPA contra ele, aponte `API_URL=http://127.0.0.1:8765/`.
+"""
+
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def emitir_token(tipo, ttl):
+    """Gera um JWT não assinado com `exp`, suficiente para o `TokenManager`."""
+
+    def b64(dados):
+        return base64.urlsafe_b64encode(json.dumps(dados).encode()).rstrip(b'=').decode()
+
+    payload = {'token_type': tipo, 'exp': int(time.time() + ttl)}
+    return f"{b64({'alg': 'none'})}.{b64(payload)}."
+
+
+def gerar_backlog(total_tarefas=3, itens_por_tarefa=5):
+    """Gera uma lista de tarefas com itens no formato de `items/by-stage/`."""
+    tarefas = []
+    item_id = 1
+    for task_id in range(1, total_tarefas + 1):
+        itens = []
+        for _ in range(itens_por_tarefa):
+            itens.append(
+                {
+                    'id': item_id,
+                    'os_number': f'{task_id:03d}-{item_id:05d}',
+                    'os_name': f'PACIENTE {item_id}',
+                    'status': 'PENDING',
+                    'shift_data': {'recipiente': f'{2300000000 + item_id}'},
+                }
+            )
+            item_id += 1
+        tarefas.append({'id': task_id, 'items': itens})
+    return tarefas
+
+
+def gerar_dados_sismama(total=5, primeiro_id=100001):
+    """Gera registros autorizados no formato de `items/sismama-data/`."""
+    return [
+        {
+            'id': item_id,
+            'item_id': item_id,
+            'os_number': f'SM-{item_id:06d}',
+            'shift_data': {
+                'nome_paciente': f'PACIENTE {item_id}',
+                'cartao_sus': f'{700000000000000 + item_id}',
+                'sexo': 'feminino',
+                'data_nascimento': '01/01/1970',
+                'idade_paciente': 55,
+                'estado': 'SP',
+                'cidade': 'SAO PAULO',
+            },
+        }
+        for item_id in range(primeiro_id, primeiro_id + total)
+    ]
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """Despacha as requisições para as rotas registradas no servidor."""
+
+    protocol_version = 'HTTP/1.1'
+    # Resposta inteira em um único write: evita o atraso de ACK do keep-alive.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._despachar('GET')
+
+    def do_POST(self):
+        self._despachar('POST')
+
+    def do_PATCH(self):
+        self._despachar('PATCH')
+
+    def do_OPTIONS(self):
+        self._despachar('OPTIONS')
+
+    def log_message(self, format, *args):
+        """Silencia o log padrão de cada requisição."""
+        pass
+
+    def _ler_corpo(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        if not tamanho:
+            return None
+        return json.loads(self.rfile.read(tamanho) or b'null')
+
+    def _despachar(self, method):
+        partes = urlsplit(self.path)
+        caminho = partes.path.lstrip('/')
+        params = {k: v[0] for k, v in parse_qs(partes.query).items()}
+        corpo = self._ler_corpo()
+
+        servidor = self.server
+        atraso = servidor.sortear_latencia()
+        if atraso:
+            time.sleep(atraso)
+        if servidor.sortear_erro():
+            self._responder(servidor.status_erro, {'detail': 'Erro injetado.'})
+            return
+
+        for metodo, padrao, rota in servidor.rotas:
+            if metodo != method:
+                continue
+            match = padrao.fullmatch(caminho)
+            if match:
+                self._responder(*rota(self, params, corpo, **match.groupdict()))
+                return
+        self._responder(404, {'detail': 'Not found.'})
+
+    def _responder(self, status, resposta, headers=None):
+        corpo = b'' if resposta is None else json.dumps(resposta).encode()
+        self.send_response(status)
+        if resposta is not None:
+            self.send_header('Content-Type', 'application/json')
+        for chave, valor in (headers or {}).items():
+            self.send_header(chave, valor)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+class StubAPIServer(ThreadingHTTPServer):
+    """
+    API falsa em memória, executada em uma thread de fundo.
+
+    `latencia` e `variacao` (s) definem o atraso de cada resposta (uniforme
+    em `latencia ± variacao`); com probabilidade `taxa_erro` a requisição é
+    respondida com `status_erro` sem chegar à rota. `seed` torna os sorteios
+    reproduzíveis.
+
+    Pode ser usada como context manager:
+
+        with StubAPIServer() as servidor:
+            cliente = APIClient('token', HTTPTransport(base_url=servidor.base_url))
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host='127.0.0.1',
+        port=0,
+        latencia=0.0,
+        backlog=None,
+        suporta_lote=True,
+        variacao=0.0,
+        taxa_erro=0.0,
+        status_erro=503,
+        dados_sismama=None,
+        seed=None,
+        suporta_leases=True,
+    ):
+        super().__init__((host, port), StubAPIHandler)
+        self.latencia = latencia
+        self.variacao = variacao
+        self.taxa_erro = taxa_erro
+        self.status_erro = status_erro
+        self.suporta_lote = suporta_lote
+        self.backlog = backlog if backlog is not None else gerar_backlog()
+        self.dados_sismama = (
+            dados_sismama if dados_sismama is not None else gerar_dados_sismama()
+        )
+        self._aleatorio = random.Random(seed)
+        self.erros_injetados = 0
+        # Leases de itens entre robôs: {item_id: {robot, token, expira}}
+        self.suporta_leases = suporta_leases
+        self.leases = {}
+        self.conclusoes = {}
+        self.lock = threading.RLock()
+        # Versionamento para ETag e deltas `since` de items/by-stage/
+        self.versao = 0
+        self._versao_tarefa = {tarefa['id']: 0 for tarefa in self.backlog}
+        self._removidas = {}
+        self.requisicoes = 0
+        self.rotas = []
+        self._thread = None
+        self._registrar_rotas()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def rota(self, method, padrao, funcao):
+        """Registra `funcao` para o método e o caminho (regex) informados."""
+        self.rotas.append((method, re.compile(padrao), funcao))
+
+    def _registrar_rotas(self):
+        self.rota('POST', r'login/token/', self._login)
+        self.rota('POST', r'login/token/refresh/', self._refresh)
+        self.rota('GET', r'items/by-stage/', self._itens_por_estagio)
+        self.rota('GET', r'items/sismama-data/', self._dados_sismama)
+        self.rota('POST', r'shift-data/', self._criar)
+        self.rota('GET', r'shift-data/(?P<item_id>\d+)/', self._shift_data)
+        self.rota('PATCH', r'items/(?P<item_id>\d+)/', self._atualizar_item)
+        self.rota('OPTIONS', r'items/bulk-update/', self._opcoes_lote)
+        self.rota('PATCH', r'items/bulk-update/', self._atualizar_lote)
+        self.rota('POST', r'items/(?P<item_id>\d+)/shift-data/', self._atualizar)
+        self.rota('PATCH', r'tasks/(?P<task_id>\d+)/update-task/', self._atualizar)
+        self.rota('POST', r'alerts/create/', self._alerta)
+        self.rota('OPTIONS', r'items/claim/', self._opcoes_leases)
+        self.rota('POST', r'items/claim/', self._reivindicar)
+        self.rota('POST', r'items/heartbeat/', self._heartbeat)
+        self.rota('POST', r'items/release/', self._liberar)
+
+    def sortear_latencia(self):
+        if not self.variacao:
+            return self.latencia
+        with self.lock:
+            desvio = self._aleatorio.uniform(-self.variacao, self.variacao)
+        return max(0.0, self.latencia + desvio)
+
+    def sortear_erro(self):
+        if not self.taxa_erro:
+            return False
+        with self.lock:
+            if self._aleatorio.random() >= self.taxa_erro:
+                return False
+            self.erros_injetados += 1
+            return True
+
+    def _contar(self):
+        with self.lock:
+            self.requisicoes += 1
+
+    def _login(self, handler, params, corpo):
+        self._contar()
+        return 200, {
+            'access': emitir_token('access', 300),
+            'refresh': emitir_token('refresh', 86400),
+        }
+
+    def _refresh(self, handler, params, corpo):
+        self._contar()
+        return 200, {'access': emitir_token('access', 300)}
+
+    def _itens_por_estagio(self, handler, params, corpo):
+        self._contar()
+        with self.lock:
+            etag = f'"{self.versao}"'
+            if handler.headers.get('If-None-Match') == etag:
+                return 304, None, {'ETag': etag}
+            if 'since' in params:
+                desde = int(params['since'])
+                return 200, {
+                    'results': [
+                        t for t in self.backlog if self._versao_tarefa[t['id']] > desde
+                    ],
+                    'removed': [t for t, v in self._removidas.items() if v > desde],
+                    'cursor': self.versao,
+                }, {'ETag': etag}
+            return 200, self.backlog, {'ETag': etag, 'X-Next-Cursor': str(self.versao)}
+
+    def _concluir_sismama(self, item_id, dados):
+        if dados.get('stage') != 'SISMAMA' or dados.get('status') not in (
+            'COMPLETED',
+            'ERROR',
+        ):
+            return
+        with self.lock:
+            self.dados_sismama = [
+                r for r in self.dados_sismama if str(r['id']) != str(item_id)
+            ]
+
+    def _concluir_item(self, item_id, dados):
+        """Tira da fila o item que chegou a um status final."""
+        if dados.get('status') not in ('COMPLETED', 'ERROR'):
+            return
+        with self.lock:
+            chave = str(item_id)
+            self.conclusoes[chave] = self.conclusoes.get(chave, 0) + 1
+            for tarefa in list(self.backlog):
+                itens = [i for i in tarefa['items'] if str(i['id']) != str(item_id)]
+                if len(itens) == len(tarefa['items']):
+                    continue
+                self.versao += 1
+                tarefa['items'] = itens
+                self._versao_tarefa[tarefa['id']] = self.versao
+                if not itens:
+                    self.backlog.remove(tarefa)
+                    self._removidas[tarefa['id']] = self.versao
+
+    def _dados_sismama(self, handler, params, corpo):
+        self._contar()
+        with self.lock:
+            return 200, list(self.dados_sismama)
+
+    def _criar(self, handler, params, corpo):
+        self._contar()
+        return 201, {'id': self.requisicoes, **(corpo or {})}
+
+    def _shift_data(self, handler, params, corpo, item_id):
+        self._contar()
+        with self.lock:
+            for tarefa in self.backlog:
+                for item in tarefa['items']:
+                    if str(item['id']) == item_id:
+                        return 200, item.get('shift_data', {})
+        return 404, {'detail': 'Not found.'}
+
+    def _atualizar(self, handler, params, corpo, **ids):
+        self._contar()
+        return 200, {**ids, **(corpo or {})}
+
+    def _atualizar_item(self, handler, params, corpo, item_id):
+        self._concluir_item(item_id, corpo or {})
+        self._concluir_sismama(item_id, corpo or {})
+        return self._atualizar(handler, params, corpo, item_id=item_id)
+
+    def _opcoes_lote(self, handler, params, corpo):
+        if not self.suporta_lote:
+            return 404, {'detail': 'Not found.'}
+        return 200, None, {'Allow': 'OPTIONS, PATCH'}
+
+    def _atualizar_lote(self, handler, params, corpo):
+        if not self.suporta_lote:
+            return 404, {'detail': 'Not found.'}
+        self._contar()
+        itens = (corpo or {}).get('items', [])
+        for item in itens:
+            self._concluir_item(item['id'], item)
+            self._concluir_sismama(item['id'], item)
+        return 200, {
+            'results': [{'id': item['id'], 'status': 200, 'data': item} for item in itens]
+        }
+
+    def _opcoes_leases(self, handler, params, corpo):
+        if not self.suporta_leases:
+            return 404, {'detail': 'Not found.'}
+        return 200, None, {'Allow': 'OPTIONS, POST'}
+
+    def _lease_valido(self, item_id, robot, token=None):
+        lease = self.leases.get(str(item_id))
+        return (
+            lease is not None
+            and lease['robot'] == robot
+            and (token is None or lease['token'] == token)
+            and lease['expira'] > time.monotonic()
+        )
+
+    def _reivindicar(self, handler, params, corpo):
+        if not self.suporta_leases:
+            return 404, {'detail': 'Not found.'}
+        self._contar()
+        robot, ttl = corpo['robot'], float(corpo['ttl'])
+        concedidos, rejeitados = [], []
+        with self.lock:
+            agora = time.monotonic()
+            for item_id in corpo['items']:
+                lease = self.leases.get(str(item_id))
+                if lease and lease['robot'] != robot and lease['expira'] > agora:
+                    rejeitados.append(item_id)
+                    continue
+                token = lease['token'] if lease and lease['robot'] == robot else None
+                token = token or uuid.uuid4().hex
+                self.leases[str(item_id)] = {
+                    'robot': robot,
+                    'token': token,
+                    'expira': agora + ttl,
+                }
+                concedidos.append(
+                    {'id': item_id, 'lease_token': token, 'expires_in': ttl}
+                )
+        return 200, {'claimed': concedidos, 'rejected': rejeitados}
+
+    def _heartbeat(self, handler, params, corpo):
+        self._contar()
+        robot, ttl = corpo['robot'], float(corpo['ttl'])
+        renovados, perdidos = [], []
+        with self.lock:
+            for lease in corpo['leases']:
+                if self._lease_valido(lease['id'], robot, lease['lease_token']):
+                    self.leases[str(lease['id'])]['expira'] = time.monotonic() + ttl
+                    renovados.append(lease['id'])
+                else:
+                    perdidos.append(lease['id'])
+        return 200, {'renewed': renovados, 'lost': perdidos}
+
+    def _liberar(self, handler, params, corpo):
+        self._contar()
+        liberados = []
+        with self.lock:
+            for lease in corpo['leases']:
+                if self._lease_valido(lease['id'], corpo['robot'], lease['lease_token']):
+                    del self.leases[str(lease['id'])]
+                    liberados.append(lease['id'])
+        return 200, {'released': liberados}
+
+    def _alerta(self, handler, params, corpo):
+        self._contar()
+        return 201, {'id': self.requisicoes, **(corpo or {})}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def adicionar_argumentos(parser):
+    """Opções da API falsa, compartilhadas com os benchmarks."""
+    parser.add_argument('--latencia-ms', type=float, default=0.0)
+    parser.add_argument(
+        '--variacao-ms', type=float, default=0.0, help='variação uniforme da latência'
+    )
+    parser.add_argument(
+        '--taxa-erro', type=float, default=0.0, help='fração de respostas com erro'
+    )
+    parser.add_argument('--status-erro', type=int, default=503)
+    parser.add_argument('--tarefas', type=int, default=3)
+    parser.add_argument('--itens-por-tarefa', type=int, default=5)
+    parser.add_argument('--registros-sismama', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument(
+        '--sem-lote', action='store_true', help='não anuncia items/bulk-update/'
+    )
+    parser.add_argument(
+        '--sem-leases', action='store_true', help='não anuncia items/claim/'
+    )
+
+
+def criar_servidor(args, host='127.0.0.1', port=0):
+    """Cria a API falsa a partir das opções de `adicionar_argumentos`."""
+    return StubAPIServer(
+        host,
+        port,
+        args.latencia_ms / 1000,
+        backlog=gerar_backlog(args.tarefas, args.itens_por_tarefa),
+        suporta_lote=not args.sem_lote,
+        variacao=args.variacao_ms / 1000,
+        taxa_erro=args.taxa_erro,
+        status_erro=args.status_erro,
+        dados_sismama=gerar_dados_sismama(args.registros_sismama),
+        seed=args.seed,
+        suporta_leases=not args.sem_leases,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API falsa para benchmarks.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args, args.host, args.port)
+    print(f'API falsa escutando em {servidor.base_url}')
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,46 @@
 import os
 import sys
+import collections
 import ctypes
+import importlib
+import itertools
+import queue
+import threading
+import time
 import traceback
 from datetime import datetime
-from typing import Any, List, Optional, Type
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Type, Union
 
 
+from src.config.alert_sink import AlertSink
 from src.config.api_client import APIClient
-from src.config.auth_service import AuthenticationService
+from src.config.checkpoint_journal import obter_checkpoint_journal
 from src.config.config import Config
+from src.config.lease_manager import LeaseManager
 from src.config.logger import logger
-from src.controllers.shift_controller import ShiftController
-from src.neural_vision.image_processor import AutomacaoImageProcess
+from src.config.token_manager import TokenManager, obter_token_manager
 from src.desktop.sismama_runner import SismamaRunner, VisualValidationError
 from src.controllers.api_handler import tratar_erro_admin_sismama
+from src.utils.janela_lote import obter_janela_lote
+from src.utils.prioridade import obter_priorizador
+from src.utils.supervisor import servir
+from src.utils.watchdog import obter_watchdog
+
+# Selenium (SHIFT) e langchain/PIL (IMAGE_PROCESS) são importados só quando
+# o estágio roda, para que um nó de outro perfil não pague esse custo.
+if TYPE_CHECKING:
+    from src.controllers.shift_abas import ShiftAbas
+    from src.controllers.shift_controller import ShiftController
+    from src.controllers.shift_pool import ShiftPool
+
+# Modo sequencial, pool de navegadores ou abas em um só navegador
+ControladorShift = Union["ShiftController", "ShiftPool", "ShiftAbas"]
+
+
+def importar(caminho: str) -> Any:
+    """Importa sob demanda o atributo em `pacote.modulo.Nome`."""
+    modulo, _, nome = caminho.rpartition(".")
+    return getattr(importlib.import_module(modulo), nome)
 
 
 def is_admin() -> bool:
@@ -35,40 +62,129 @@ class OrquestradorRPA:
       4. Processa SISMAMA
     """
 
-    def __init__(self, config: Type[Config] = Config) -> None:
+    # Estágios na ordem de execução, com a classe de processamento de cada um
+    # (caminho importado só quando o estágio roda)
+    ESTAGIOS = [
+        ("SHIFT", None),
+        ("IMAGE_PROCESS", "src.neural_vision.image_processor.AutomacaoImageProcess"),
+        ("SISMAMA", None),
+    ]
+
+    def __init__(
+        self,
+        config: Type[Config] = Config,
+        token_manager: Optional[TokenManager] = None,
+        alert_sink: Optional[AlertSink] = None,
+        modo_daemon: Optional[bool] = None,
+    ) -> None:
         self.config = config
+        # Estágios do perfil (RPA_PROFILE); só as configurações deles são
+        # exigidas. O modo pipeline sempre roda todos.
+        self.estagios = (
+            list(config.PERFIS["all"])
+            if config.PIPELINE_MODE
+            else config.estagios_ativos()
+        )
+        config.validar(self.estagios)
+        # Em modo daemon a mesma instância atende várias execuções, mantendo
+        # o cliente da API, o Chrome logado e o SIS MAMA entre elas.
+        self.modo_daemon = (
+            config.DAEMON_MODE if modo_daemon is None else modo_daemon
+        )
+        self._shift_controller: Optional[ControladorShift] = None
+        self._sismama_runner: Optional[SismamaRunner] = None
+        # Usados pelo modo pipeline (ver `executar_pipeline`)
+        self._ao_concluir_shift = None
+        self._reter_sismama = False
+        # Compartilhado entre execuções do scheduler: evita um login por tick
+        self.token_manager = token_manager or obter_token_manager()
         self.api_client: Optional[APIClient] = None
-        self.auth_token: Optional[str] = None
+        self.lease_manager: Optional[LeaseManager] = None
+        # Sink informado de fora (ex.: pelo scheduler) não é fechado aqui
+        self.alert_sink = alert_sink or AlertSink()
+        self._fechar_alert_sink = alert_sink is None
+        # Prazos por item e por estágio (ver `WatchdogConfig`)
+        self.watchdog = obter_watchdog()
+        # Ordem dos itens entre tarefas pelo SLA (ver `PriorizadorSLA`)
+        self.priorizador = obter_priorizador()
+        # Só abre Chrome/SIS MAMA com lote suficiente (ver `JanelaLote`)
+        self.janela_lote = obter_janela_lote()
 
     def autenticar_api(self) -> bool:
         logger.info("Autenticando na API...")
-        username = os.getenv("API_USERNAME")
-        password = os.getenv("API_PASSWORD")
-        response = AuthenticationService.authenticate(username, password)
-        if not response or "access" not in response:
+        token = self.token_manager.obter_token()
+        if not token:
             logger.error("Falha na autenticação. Verifique suas credenciais.")
             return False
-        self.auth_token = response["access"]
-        self.api_client = APIClient(auth_token=self.auth_token)
+        if self.api_client is None or not self.modo_daemon:
+            self.api_client = APIClient(
+                token_manager=self.token_manager, alert_sink=self.alert_sink
+            )
+            self.alert_sink.api_client = self.api_client
+            self.lease_manager = LeaseManager(self.api_client, self.config.ROBOT_ID)
         logger.success("Autenticação bem-sucedida.")
         return True
 
     def processar_estagio(
-        self, stage: str, processor_class: Optional[Type[Any]] = None
-    ) -> None:
+        self, stage: str, processor_class: Optional[Union[str, Type[Any]]] = None
+    ) -> int:
+        """
+        Processa as tarefas pendentes do estágio e retorna quantas havia
+        (0 se não havia nenhuma ou se a consulta falhou).
+
+        O estágio tem um prazo no watchdog: ao vencer, ele para de pegar
+        itens novos e os restantes ficam para o próximo ciclo, em vez de
+        segurar o agendador.
+        """
+        segundos = self.config.WATCHDOG_STAGE_TIMEOUTS.get(stage)
+        with self.watchdog.prazo(stage, segundos) as prazo:
+            pendentes = self._processar_estagio(stage, processor_class)
+        if prazo.expirado:
+            self.api_client.send_alert(
+                robot_id=self.config.ROBOT_ID,
+                alert_type="Timeout",
+                message=(
+                    f"Estágio {stage} excedeu o prazo de {segundos:.0f}s; "
+                    "itens restantes ficam para o próximo ciclo."
+                ),
+            )
+        return pendentes
+
+    def _processar_estagio(
+        self, stage: str, processor_class: Optional[Union[str, Type[Any]]] = None
+    ) -> int:
         try:
             logger.info(f"Verificando itens pendentes no estágio: {stage}")
+            if stage == "SHIFT" and self.config.API_STREAM_PENDING:
+                return self._processar_shift_streaming()
+
             data = self.api_client.get_pending_items(stage=stage)
             if isinstance(data, dict) and data.get("detail"):
                 logger.warning(
                     f"Nenhuma tarefa pendente para {stage}: {data['detail']}"
                 )
-                return
+                return 0
             if not data:
                 logger.info(f"Nenhuma tarefa pendente para {stage}.")
-                return
+                return 0
+
+            if not self.janela_lote.avaliar(
+                stage, self._ids_pendentes(stage, data), self._recurso_ativo(stage)
+            ):
+                # Ainda pendentes: o agendador volta quando o lote fechar
+                return len(data)
+
+            if stage != "SISMAMA":
+                data = self._reivindicar_tarefas(stage, data)
+                if not data:
+                    logger.info(f"Itens de {stage} já reivindicados por outros robôs.")
+                    return 0
 
             logger.info(f"{len(data)} item(s) pendente(s) em {stage}.")
+            pendentes = len(data)
+            if stage != "SISMAMA":
+                # Os itens mais urgentes de qualquer tarefa vão primeiro
+                data = self.priorizador.priorizar_tarefas(stage, data)
             if stage == "SHIFT":
                 self._processar_shift(data)
             elif stage == "IMAGE_PROCESS" and processor_class:
@@ -77,9 +193,10 @@ class OrquestradorRPA:
                 self._processar_sismama()
             else:
                 logger.warning(f"Estágio desconhecido: {stage}")
+            return pendentes
 
         except VisualValidationError:
-            return
+            return 0
         
         except Exception as e:
             logger.error(f"Erro ao processar estágio {stage}: {e}")
@@ -90,50 +207,229 @@ class OrquestradorRPA:
                 message=f"Erro no estágio {stage}: {str(e)}",
                 details=detalhes
             )
+            return 0
+        finally:
+            if stage != "SISMAMA" and self.lease_manager:
+                self.lease_manager.liberar(stage=stage)
 
-    def _processar_shift(self, data: List[dict]) -> None:
-        logger.info("Iniciando processamento do SHIFT.")
-        controller = ShiftController(
-            url=self.config.URL,
-            usuario=self.config.USUARIO,
-            senha=self.config.SENHA,
-            screenshot_path=self.config.LOG_DIR,
-            api_client=self.api_client,
-            robot_id=self.config.ROBOT_ID,
+    @staticmethod
+    def _ids_pendentes(stage: str, data: List[dict]) -> List[Any]:
+        if stage == "SISMAMA":
+            return [r.get("item_id") or r.get("id") for r in data]
+        return [item.get("id") for task in data for item in task.get("items", [])]
+
+    def _recurso_ativo(self, stage: str) -> bool:
+        """Indica se o recurso caro do estágio já está aberto (sem partida a pagar)."""
+        if stage == "SHIFT":
+            return (
+                self._shift_controller is not None
+                and self._shift_controller.navegador_ativo()
+            )
+        if stage == "SISMAMA":
+            return (
+                self._sismama_runner is not None
+                and self._sismama_runner.aplicacao_ativa()
+            )
+        return False
+
+    def _reivindicar_tarefas(self, stage: str, tarefas: List[dict]) -> List[dict]:
+        """
+        Reivindica os itens das tarefas para este robô e retorna as tarefas
+        apenas com os itens concedidos (sem as que ficaram vazias).
+        """
+        if self.lease_manager is None:
+            return tarefas
+        concedidos = self.lease_manager.reivindicar(
+            stage,
+            [item.get("id") for task in tarefas for item in task.get("items", [])],
         )
-        for task in data:
-            task_id = task.get("id")
-            orders = [
-                {
-                    "os": item.get("os_number"),
-                    "os_name": item.get("os_name"),
-                    "task_id": task_id,
-                    "item_id": item.get("id"),
-                }
-                for item in task.get("items", [])
-                if item.get("os_number")
-            ]
-            if orders:
-                self.api_client.update_task(
-                    task_id=task_id,
-                    status="STARTED",
-                    started_at=datetime.now().isoformat(),
-                    stage="SHIFT",
-                )
-                logger.info(f"Tarefa {task_id} iniciada.")
-                controller.processar_dados(orders)
+        filtradas = []
+        for task in tarefas:
+            itens = [i for i in task.get("items", []) if i.get("id") in concedidos]
+            if itens:
+                filtradas.append({**task, "items": itens})
+        return filtradas
 
-                self.api_client.send_alert(
-                    robot_id=self.config.ROBOT_ID,
-                    alert_type="Sucesso",
-                    message=f"Tarefa SHIFT {task_id} concluída."
-                )
+    def _processar_shift_streaming(self) -> int:
+        """Inicia o SHIFT na primeira tarefa recebida, sem esperar a lista toda."""
+        tarefas = self.api_client.get_pending_items_stream(stage="SHIFT")
+        # Com leases, cada tarefa é reivindicada assim que chega.
+        tarefas = itertools.chain.from_iterable(
+            self._reivindicar_tarefas("SHIFT", [task]) for task in tarefas
+        )
+        primeira = next(tarefas, None)
+        if primeira is None:
+            logger.info("Nenhuma tarefa pendente para SHIFT.")
+            return 0
+        return self._processar_shift(itertools.chain([primeira], tarefas))
+
+    def _processar_shift(self, data: Iterable[dict]) -> int:
+        """
+        Processa as tarefas do SHIFT e retorna quantas foram lidas. Depois
+        da priorização uma tarefa pode vir em vários trechos: ela é iniciada
+        no primeiro e dada como concluída quando o último termina. Com o
+        pool (SHIFT_POOL_SIZE > 1) ou as abas (SHIFT_ABAS > 1) os trechos só
+        são entregues e processados em paralelo.
+        """
+        lidas, iniciadas = set(), set()
+        # Trechos ainda por vir de cada tarefa (o streaming traz tarefas inteiras)
+        trechos: collections.Counter = collections.Counter()
+        if isinstance(data, list):
+            trechos.update(task.get("id") for task in data)
+        # Trechos entregues e ainda não terminados
+        abertos: collections.Counter = collections.Counter()
+        # Tarefas com alguma O.S. deixada para o próximo ciclo
+        incompletas: set = set()
+        lock_trechos = threading.Lock()
 
+        def concluir_trecho(task_id: Any, executado: bool = True) -> None:
+            with lock_trechos:
+                abertos[task_id] -= 1
+                if not executado:
+                    incompletas.add(task_id)
+                if abertos[task_id] > 0 or trechos[task_id] > 0:
+                    return
+                if task_id in incompletas:
+                    incompletas.discard(task_id)
+                    logger.info(
+                        f"Tarefa SHIFT {task_id} com O.S. pendentes; segue no próximo ciclo."
+                    )
+                    return
+            self.api_client.send_alert(
+                robot_id=self.config.ROBOT_ID,
+                alert_type="Sucesso",
+                message=f"Tarefa SHIFT {task_id} concluída."
+            )
+
+        logger.info("Iniciando processamento do SHIFT.")
+        controller = self._obter_shift_controller()
+        controller.lease_manager = self.lease_manager
+        try:
+            for task in data:
+                if self.watchdog.esgotado("SHIFT"):
+                    break
+                task_id = task.get("id")
+                lidas.add(task_id)
+                orders = [
+                    {
+                        "os": item.get("os_number"),
+                        "os_name": item.get("os_name"),
+                        "task_id": task_id,
+                        "item_id": item.get("id"),
+                    }
+                    for item in task.get("items", [])
+                    if item.get("os_number")
+                ]
+                if orders:
+                    with lock_trechos:
+                        trechos[task_id] -= 1
+                        abertos[task_id] += 1
+                    if task_id not in iniciadas:
+                        iniciadas.add(task_id)
+                        controller.api_client.update_task(
+                            task_id=task_id,
+                            status="STARTED",
+                            started_at=datetime.now().isoformat(),
+                            stage="SHIFT",
+                        )
+                        logger.info(f"Tarefa {task_id} iniciada.")
+                    if hasattr(controller, "submeter"):
+                        controller.submeter(
+                            orders,
+                            ao_concluir=self._ao_concluir_shift,
+                            ao_terminar=lambda executado, task_id=task_id: concluir_trecho(
+                                task_id, executado
+                            ),
+                        )
+                        continue
+                    executado = controller.processar_dados(
+                        orders, ao_concluir=self._ao_concluir_shift
+                    )
+                    concluir_trecho(task_id, executado)
+
+                else:
+                    with lock_trechos:
+                        trechos[task_id] -= 1
+                    logger.warning(f"Sem OS válida para tarefa {task_id}.")
+        finally:
+            if hasattr(controller, "aguardar"):
+                controller.aguardar()
+            if self.modo_daemon:
+                controller.descarregar()
             else:
-                logger.warning(f"Sem OS válida para tarefa {task_id}.")
-        controller.finalizar()
+                controller.finalizar()
+        return len(lidas)
+
+    def _obter_shift_controller(self) -> ControladorShift:
+        """
+        Em modo daemon reaproveita o controlador (e o Chrome) da execução
+        anterior enquanto o navegador responder; senão cria um novo. Com
+        SHIFT_POOL_SIZE > 1 cria um `ShiftPool` com um controlador por
+        navegador; com SHIFT_ABAS > 1, um `ShiftAbas` com várias abas no
+        mesmo navegador.
+        """
+        controller = self._shift_controller
+        if controller is not None:
+            if controller.navegador_ativo():
+                return controller
+            logger.warning("Chrome do SHIFT não responde; será recriado.")
+            self._fechar_shift_controller()
+
+        from src.controllers.shift_controller import ShiftController
+
+        def criar_controller(api_client: Any) -> ShiftController:
+            return ShiftController(
+                url=self.config.URL,
+                usuario=self.config.USUARIO,
+                senha=self.config.SENHA,
+                screenshot_path=self.config.LOG_DIR,
+                api_client=api_client,
+                robot_id=self.config.ROBOT_ID,
+            )
+
+        inicio = time.monotonic()
+        if self.config.SHIFT_POOL_SIZE > 1:
+            from src.controllers.shift_pool import ShiftPool
+
+            controller = ShiftPool(criar_controller, self.api_client)
+        elif self.config.SHIFT_ABAS > 1:
+            from src.controllers.shift_abas import ShiftAbas
+
+            logger.warning(
+                f"SHIFT_ABAS={self.config.SHIFT_ABAS}: modo de abas experimental, "
+                "ainda não medido no Chrome real."
+            )
+            controller = ShiftAbas(criar_controller(self.api_client))
+        else:
+            controller = criar_controller(self.api_client)
+        # Partida a frio completa (Chrome, driver e login) para o relatório
+        # da janela de lote; `processar_dados` reaproveita a sessão.
+        if controller.preparar_sessao():
+            self.janela_lote.registrar_partida("SHIFT", time.monotonic() - inicio)
+        if self.modo_daemon:
+            self._shift_controller = controller
+        return controller
+
+    def _fechar_sismama_runner(self) -> None:
+        runner, self._sismama_runner = self._sismama_runner, None
+        if runner is not None and runner.aplicacao_ativa():
+            try:
+                runner.encerrar()
+            except Exception as e:
+                logger.warning(f"Erro ao finalizar o SIS MAMA: {e}")
+
+    def _fechar_shift_controller(self) -> None:
+        controller, self._shift_controller = self._shift_controller, None
+        if controller is None:
+            return
+        try:
+            controller.finalizar()
+        except Exception as e:
+            logger.warning(f"Erro ao finalizar o Chrome do SHIFT: {e}")
 
-    def _processar_image(self, data: List[dict], processor_class: Type[Any]) -> None:
+    def _processar_image(
+        self, data: List[dict], processor_class: Union[str, Type[Any]]
+    ) -> None:
         logger.info("Iniciando processamento de imagens.")
         try:
             self.api_client.send_alert(
@@ -142,12 +438,14 @@ class OrquestradorRPA:
                 message="Iniciando processamento de imagens."
             )
 
+            if isinstance(processor_class, str):
+                processor_class = importar(processor_class)
             processor = processor_class(
                 robot_id=self.config.ROBOT_ID,
-                auth_token=self.auth_token,
+                token_manager=self.token_manager,
                 api_client=self.api_client,
             )
-            processor.processar_pendentes()
+            processor.processar_pendentes(tarefas=data)
         except Exception as e:
             logger.error(f"Erro no processamento de imagens: {e}")
             detalhes = traceback.format_exc()
@@ -161,7 +459,14 @@ class OrquestradorRPA:
 
     def _processar_sismama(self) -> None:
         logger.info("Iniciando automação SIS MAMA.")
-        runner = SismamaRunner(api_client=self.api_client)  # type: ignore
+        manter_aberto = self.modo_daemon or self._reter_sismama
+        runner = self._sismama_runner or SismamaRunner(
+            api_client=self.api_client,
+            manter_aberto=manter_aberto,
+            lease_manager=self.lease_manager,
+        )  # type: ignore
+        if manter_aberto:
+            self._sismama_runner = runner
         try:
             runner.executar()
         except Exception as e:
@@ -176,15 +481,198 @@ class OrquestradorRPA:
             )
             tratar_erro_admin_sismama(self.api_client)
 
-    def executar(self) -> None:
-        if not self.autenticar_api():
-            return
-        for stage, cls in [
-            ("SHIFT", None),
-            ("IMAGE_PROCESS", AutomacaoImageProcess),
-            ("SISMAMA", None),
-        ]:
-            self.processar_estagio(stage, cls)
+    def _recuperar_itens_interrompidos(self) -> None:
+        """
+        Devolve à fila os itens que um processo anterior deixou em andamento
+        (STARTED) ao cair, segundo o journal de checkpoints. O checkpoint é
+        mantido: ao reprocessar, o estágio retoma da última etapa concluída.
+        """
+        journal = obter_checkpoint_journal()
+        for checkpoint in journal.interrompidos():
+            stage, item_id = checkpoint["stage"], checkpoint["item_id"]
+            if stage not in self.estagios:
+                continue  # Outro processo pode estar com ele agora
+            logger.warning(
+                f"Item {item_id} de {stage} interrompido após '{checkpoint['etapa']}' "
+                f"(processo {checkpoint['pid']}); devolvendo à fila."
+            )
+            self.api_client.update_item(item_id, status="PENDING", stage=stage)
+            journal.assumir(stage, item_id)
+
+    def executar(
+        self, estagios: Optional[Iterable[str]] = None, autenticar: bool = True
+    ) -> Dict[str, int]:
+        """
+        Executa os estágios informados (os do perfil, por padrão) e retorna
+        a quantidade de itens pendentes encontrada em cada um. O modo
+        pipeline sempre executa todos. `autenticar=False` aproveita a
+        autenticação já feita por quem chamou.
+        """
+        if autenticar and not self.autenticar_api():
+            return {}
+
+        # Reenvia escritas que ficaram no outbox em execuções anteriores
+        pendentes = self.api_client.outbox.contar()
+        if pendentes:
+            logger.info(f"Reenviando {pendentes} escrita(s) pendente(s) do outbox.")
+            self.api_client.agendar_replay()
+        self._recuperar_itens_interrompidos()
+        if self.config.PIPELINE_MODE:
+            return self.executar_pipeline()
+
+        selecionados = set(self.estagios if estagios is None else estagios)
+        return {
+            stage: self.processar_estagio(stage, cls)
+            for stage, cls in self.ESTAGIOS
+            if stage in selecionados
+        }
+
+    def executar_pipeline(self) -> Dict[str, int]:
+        """
+        Executa os estágios como workers concorrentes ligados por filas:
+        cada item concluído no SHIFT vai direto para a análise de imagem
+        enquanto o navegador segue para a próxima O.S., e cada análise
+        concluída acorda o SIS MAMA.
+
+        SHIFT e IMAGE_PROCESS rodam em threads; o SIS MAMA (automação de
+        desktop) roda na thread atual. O SIS MAMA só recebe registros já
+        autorizados no painel, então a cada despertar ele consulta
+        `items/sismama-data/` em vez de receber os itens da fila.
+
+        Retorna, como `executar`, os itens pendentes encontrados por estágio.
+        """
+        resultado = {"SHIFT": 0, "IMAGE_PROCESS": 0, "SISMAMA": 0}
+        lock_resultado = threading.Lock()
+        fila_imagem: "queue.Queue[Optional[dict]]" = queue.Queue()
+        fila_sismama: "queue.Queue[Optional[int]]" = queue.Queue()
+        workers_imagem = max(1, self.config.PIPELINE_IMAGE_WORKERS)
+
+        pendentes = self.api_client.get_pending_items(stage="IMAGE_PROCESS")
+        if isinstance(pendentes, list):
+            pendentes = self.priorizador.priorizar_tarefas("IMAGE_PROCESS", pendentes)
+            for task in pendentes:
+                for item in task.get("items", []):
+                    fila_imagem.put(item)
+
+        def worker_shift() -> None:
+            self._ao_concluir_shift = fila_imagem.put
+            try:
+                resultado["SHIFT"] = self.processar_estagio("SHIFT")
+            finally:
+                self._ao_concluir_shift = None
+                for _ in range(workers_imagem):
+                    fila_imagem.put(None)
+
+        def worker_imagem() -> None:
+            processor = importar(dict(self.ESTAGIOS)["IMAGE_PROCESS"])(
+                robot_id=self.config.ROBOT_ID,
+                token_manager=self.token_manager,
+                api_client=self.api_client,
+            )
+            prazo_estagio = self.config.WATCHDOG_STAGE_TIMEOUTS.get("IMAGE_PROCESS")
+            try:
+                with self.watchdog.prazo("IMAGE_PROCESS", prazo_estagio) as prazo:
+                    while True:
+                        item = fila_imagem.get()
+                        if item is None:
+                            return
+                        if prazo.expirado:
+                            # Os itens restantes seguem pendentes na API
+                            # para o próximo ciclo.
+                            continue
+                        # O COMPLETED do SHIFT já está no outbox; o STARTED
+                        # da análise de imagem só sai depois dele.
+                        item_id = item.get("id")
+                        if self.lease_manager and not self.lease_manager.reivindicar(
+                            "IMAGE_PROCESS", [item_id]
+                        ):
+                            continue
+                        try:
+                            processor.processar_item_com_prazo(item)
+                        except Exception as e:
+                            logger.error(f"Erro na análise do item {item_id}: {e}")
+                        finally:
+                            if self.lease_manager:
+                                self.lease_manager.liberar([item_id])
+                        with lock_resultado:
+                            resultado["IMAGE_PROCESS"] += 1
+                        fila_sismama.put(item.get("id"))
+            finally:
+                fila_sismama.put(None)
+
+        threads = [threading.Thread(target=worker_shift, name="pipeline-shift")]
+        threads += [
+            threading.Thread(target=worker_imagem, name=f"pipeline-imagem-{i}")
+            for i in range(workers_imagem)
+        ]
+        for thread in threads:
+            thread.start()
+
+        self._reter_sismama = True
+        try:
+            resultado["SISMAMA"] = self.processar_estagio("SISMAMA")
+            ativos = workers_imagem
+            while ativos:
+                sinal = fila_sismama.get()
+                if sinal is None:
+                    ativos -= 1
+                    continue
+                # Agrupa as análises que terminarem logo em seguida.
+                limite = time.monotonic() + self.config.PIPELINE_SISMAMA_DEBOUNCE
+                while ativos and time.monotonic() < limite:
+                    try:
+                        if fila_sismama.get(timeout=limite - time.monotonic()) is None:
+                            ativos -= 1
+                    except queue.Empty:
+                        break
+                resultado["SISMAMA"] = self.processar_estagio("SISMAMA")
+        finally:
+            for thread in threads:
+                thread.join()
+            self._reter_sismama = False
+            if not self.modo_daemon:
+                self._fechar_sismama_runner()
+        return resultado
+
+    def encerrar(self) -> None:
+        """
+        Fecha o Chrome e o SIS MAMA mantidos pelo modo daemon e envia os
+        alertas pendentes no sink, se ele for deste orquestrador.
+        """
+        self._fechar_shift_controller()
+        self._fechar_sismama_runner()
+        if self.lease_manager is not None:
+            self.lease_manager.close()
+        if self._fechar_alert_sink:
+            self.alert_sink.close()
+
+
+def worker_estagio(estagio: str, conexao: Any) -> None:
+    """
+    Processo de um único estágio sob o `Supervisor` (scheduler com
+    RPA_SUPERVISOR=true). Mantém o recurso do estágio aberto entre os
+    pedidos, como no modo daemon, e responde com os pendentes encontrados.
+    """
+    perfil = next(
+        nome for nome, estagios in Config.PERFIS.items() if tuple(estagios) == (estagio,)
+    )
+    Config.RPA_PROFILE = perfil
+    Config.PIPELINE_MODE = False
+    # Journal próprio: cada worker compacta o seu ao subir sem disputar o
+    # arquivo com os outros
+    raiz, extensao = os.path.splitext(Config.CHECKPOINT_PATH)
+    Config.CHECKPOINT_PATH = f"{raiz}-{perfil}{extensao}"
+
+    orquestrador = OrquestradorRPA(modo_daemon=True)
+    try:
+        servir(
+            conexao,
+            lambda: orquestrador.executar([estagio]).get(estagio, 0),
+            # A janela de lote deste processo decide quando voltar ao estágio
+            lambda: orquestrador.janela_lote.proxima_verificacao(estagio),
+        )
+    finally:
+        orquestrador.encerrar()
 
 
 if __name__ == "__main__":
@@ -194,6 +682,9 @@ if __name__ == "__main__":
     )
     try:
         orchestrator = OrquestradorRPA()
-        orchestrator.executar()
+        try:
+            orchestrator.executar()
+        finally:
+            orchestrator.encerrar()
     except Exception as e:
         logger.error(f"Erro ao executar main: {e}")
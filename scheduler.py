@@ -1,32 +1,49 @@
-import time
 import traceback
 from datetime import datetime
 
-import schedule
-
-from main import OrquestradorRPA
-
-executando = False
-
-def rodar_main():
-    global executando
-
-    if executando:
-        print(f"[{datetime.now()}] Execução anterior ainda em andamento. Pulando...")
-        return
+from main import OrquestradorRPA, worker_estagio
+from src.config.alert_sink import AlertSink
+from src.config.api_client import APIClient
+from src.config.config import Config
+from src.config.token_manager import obter_token_manager
+from src.utils.agendador import AgendadorAdaptativo
+from src.utils.janela_lote import obter_janela_lote
+from src.utils.supervisor import Supervisor
+
+# Compartilhado entre as execuções: o resumo e a deduplicação de alertas
+# valem para toda a vida do scheduler, não só para um ciclo. Criado em
+# `main()`, para que os workers do supervisor, que importam este módulo ao
+# subir, não abram um sink próprio sem uso
+alert_sink = None
+# Em modo daemon (RPA_DAEMON=true) o mesmo orquestrador atende todos os
+# ciclos, mantendo Chrome logado e SIS MAMA abertos
+orquestrador_daemon = None
+
+
+def obter_orquestrador():
+    global orquestrador_daemon
+    if not Config.DAEMON_MODE:
+        return OrquestradorRPA(alert_sink=alert_sink)
+    if orquestrador_daemon is None:
+        orquestrador_daemon = OrquestradorRPA(alert_sink=alert_sink, modo_daemon=True)
+    return orquestrador_daemon
+
+
+def rodar_main(estagios=None):
+    """Executa os estágios informados e retorna os pendentes por estágio."""
+    orquestrador = None
+    resultado = {}
 
     try:
-        executando = True
-        print(f"[{datetime.now()}] Iniciando RPA…")
+        print(f"[{datetime.now()}] Iniciando RPA: {', '.join(estagios or ['todos'])}…")
 
         
-        orquestrador = OrquestradorRPA()
+        orquestrador = obter_orquestrador()
 
         
         if not orquestrador.autenticar_api():
             print(f"[{datetime.now()}] Falha na autenticação. Abortando esta execução.")
-            executando = False
-            return
+            return resultado
 
         orquestrador.api_client.send_alert(
             robot_id=orquestrador.config.ROBOT_ID,
@@ -34,7 +51,7 @@ def rodar_main():
             message="RPA iniciando execução."
         )
 
-        orquestrador.executar()
+        resultado = orquestrador.executar(estagios, autenticar=False)
 
 
         orquestrador.api_client.send_alert(
@@ -48,7 +65,7 @@ def rodar_main():
         traceback.print_exc()
 
         # Se o api_client já existir (autenticou antes), envia alerta de erro
-        if orquestrador.api_client:
+        if orquestrador and orquestrador.api_client:
             detalhes = traceback.format_exc()
             orquestrador.api_client.send_alert(
                 robot_id=orquestrador.config.ROBOT_ID,
@@ -57,13 +74,69 @@ def rodar_main():
                 details=detalhes
             )
     finally:
-        executando = False
+        # Fora do modo daemon cada ciclo tem o seu orquestrador; o do
+        # daemon só é encerrado quando o scheduler para
+        if orquestrador is not None and not Config.DAEMON_MODE:
+            orquestrador.encerrar()
+    return resultado
+
+
+def alertar_falha_worker(estagio, motivo):
+    """Avisa que o supervisor derrubou o processo de um estágio."""
+    if alert_sink.api_client is None:
+        alert_sink.api_client = APIClient(
+            token_manager=obter_token_manager(), alert_sink=alert_sink
+        )
+    alert_sink.api_client.send_alert(
+        robot_id=Config.ROBOT_ID,
+        alert_type="Erro",
+        message=f"Processo do estágio {estagio} reiniciado: {motivo}",
+    )
+
+
+def main():
+    global alert_sink
+    alert_sink = AlertSink()
+
+    # Com RPA_SUPERVISOR=true cada estágio roda em um processo próprio (ver
+    # `worker_estagio`) e este processo só agenda e despacha: cada estágio é
+    # reprogramado quando o seu worker responde, sem esperar os demais
+    supervisor = (
+        Supervisor(worker_estagio, Config.estagios_ativos(), ao_falhar=alertar_falha_worker)
+        if Config.SUPERVISOR_MODE
+        else None
+    )
+
+    # Roda de novo logo em seguida enquanto houver backlog e espaça as consultas
+    # (com jitter) quando ocioso; `touch` em SCHEDULER_WAKE_FILE antecipa o ciclo.
+    # Só agenda os estágios do perfil (RPA_PROFILE).
+    agendador = AgendadorAdaptativo(
+        supervisor.executar if supervisor is not None else rodar_main,
+        Config.estagios_ativos(),
+        intervalo_minimo=Config.SCHEDULER_MIN_INTERVAL,
+        intervalo_inicial=Config.SCHEDULER_IDLE_INTERVAL,
+        intervalos_maximos=Config.SCHEDULER_MAX_INTERVALS,
+        jitter=Config.SCHEDULER_JITTER,
+        arquivo_despertar=Config.SCHEDULER_WAKE_FILE,
+        porta_despertar=Config.SCHEDULER_WAKE_PORT,
+        # Volta a olhar um estágio em espera de lote quando o prazo dele vence;
+        # com o supervisor, o prazo vem na resposta de cada worker
+        limite_intervalo=obter_janela_lote().proxima_verificacao,
+        assincrono=supervisor is not None,
+    )
+    if supervisor is not None:
+        supervisor.ao_concluir = agendador.concluir
 
+    print("Iniciando Scheduler…")
+    try:
+        agendador.executar_para_sempre()
+    finally:
+        if supervisor is not None:
+            supervisor.encerrar()
+        if orquestrador_daemon is not None:
+            orquestrador_daemon.encerrar()
+        alert_sink.close()
 
-schedule.every(1).minutes.do(rodar_main)
 
 if __name__ == "__main__":
-    print("Iniciando Scheduler…")
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    main()
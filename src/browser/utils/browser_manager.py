@@ -1,13 +1,57 @@
+import os
+import subprocess
+import threading
+
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
+from src.config.config import Config
+from src.config.logger import logger
+
+# Serviços do Chrome que não servem ao robô: atualizações, sincronização,
+# tradução, métricas e afins
+ARGUMENTOS_SEM_SERVICOS = (
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--mute-audio",
+)
+
+_caminho_chromedriver = None
+_chromedriver_lock = threading.Lock()
 
-def iniciar_driver(headless=True):
+
+def _obter_chromedriver():
+    """
+    Resolve o chromedriver uma vez por processo: o pool do SHIFT abre vários
+    navegadores ao mesmo tempo e a instalação não é segura em paralelo.
+    """
+    global _caminho_chromedriver
+    with _chromedriver_lock:
+        if _caminho_chromedriver is None:
+            _caminho_chromedriver = ChromeDriverManager().install()
+        return _caminho_chromedriver
+
+
+def iniciar_driver(headless=True, perfil_leve=None):
     """
     Inicializa o driver Selenium garantindo a compatibilidade com a versão do Chrome instalada.
+
+    Com `perfil_leve` (padrão: SHIFT_PERFIL_LEVE) o Chrome não baixa
+    recursos dispensáveis, não espera o evento `load` e roda sem os
+    serviços em segundo plano. O ganho do perfil leve ainda não foi
+    medido no Chrome real (benchmarks/bench_perfil_navegador.py).
     """
+    if perfil_leve is None:
+        perfil_leve = Config.SHIFT_PERFIL_LEVE
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless=new")  # usar o modo moderno
@@ -25,15 +69,75 @@ def iniciar_driver(headless=True):
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
 
+    if perfil_leve:
+        _aplicar_perfil_leve(chrome_options)
+
     # Instalação automática e compatível do driver
-    service = Service(ChromeDriverManager().install())
+    service = Service(_obter_chromedriver())
     driver = webdriver.Chrome(service=service, options=chrome_options)
 
+    if perfil_leve:
+        bloquear_recursos(driver)
     return driver
 
+
+def _aplicar_perfil_leve(chrome_options):
+    """Opções do perfil leve; desligado por padrão até ser medido no SHIFT real."""
+    # Devolve o controle no DOMContentLoaded, sem esperar imagens e afins
+    chrome_options.page_load_strategy = "eager"
+    for argumento in ARGUMENTOS_SEM_SERVICOS:
+        chrome_options.add_argument(argumento)
+
+    preferencias = {
+        "credentials_enable_service": False,
+        "profile.password_manager_enabled": False,
+        "profile.default_content_setting_values.notifications": 2,
+        "profile.default_content_setting_values.geolocation": 2,
+    }
+    if Config.SHIFT_BLOQUEAR_IMAGENS:
+        preferencias["profile.managed_default_content_settings.images"] = 2
+    chrome_options.add_experimental_option("prefs", preferencias)
+
+
+def bloquear_recursos(driver):
+    """
+    Bloqueia via CDP as URLs de SHIFT_URLS_BLOQUEADAS (fontes, mídia,
+    rastreadores). Vale só para a aba atual: chame de novo em cada aba
+    aberta com `switch_to.new_window`.
+    """
+    if not Config.SHIFT_URLS_BLOQUEADAS:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": Config.SHIFT_URLS_BLOQUEADAS}
+        )
+    except Exception as e:
+        logger.warning(f"Não foi possível bloquear recursos via CDP: {e}")
+
 def finalizar_driver(driver):
     """
     Finaliza o driver Selenium.
     """
     if driver:
         driver.quit()
+
+
+def encerrar_driver_a_forca(driver):
+    """
+    Mata o chromedriver e o Chrome iniciado por ele sem passar pelo
+    WebDriver, que pode estar travado. Comandos pendentes no driver falham
+    em seguida.
+    """
+    processo = getattr(getattr(driver, "service", None), "process", None)
+    if processo is None or processo.poll() is not None:
+        return
+    if os.name == "nt":
+        # /T encerra também os processos do Chrome filhos do chromedriver
+        subprocess.run(
+            ["taskkill", "/PID", str(processo.pid), "/T", "/F"],
+            check=False,
+            capture_output=True,
+        )
+    else:
+        processo.kill()
@@ -19,38 +19,60 @@ def capturar_valor_input_por_xpath(driver, xpath):
         return "Não especificado (NI)"
 
 
+XPATH_TEXTO_LAUDO = "//div[33]//span[1]//div[1]//div[1]"
+XPATH_LOCALIZACAO_LESAO = "//div[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'mama direita') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'mama esquerda')]"
+
+OPCOES_RADIOBUTTON = {
+    "QSL": "Quadrante Superior Lateral",
+    "QSM": "Quadrante Superior Medial",
+    "QIL": "Quadrante Inferior Lateral",
+    "QIM": "Quadrante Inferior Medial",
+    "UQLat": "União dos Quadrantes Laterais",
+    "UQSup": "União dos Quadrantes Superiores",
+    "UQMed": "União dos Quadrantes Mediais",
+    "UQInf": "União dos Quadrantes Inferiores",
+    "RRA": "Região Retroareolar",
+}
+
+
+def opcao_radiobutton(texto_laudo):
+    """
+    Código da opção do radiobutton do SISMAMA citada no texto do laudo.
+    """
+    texto_laudo = texto_laudo.upper()
+    for codigo, descricao in OPCOES_RADIOBUTTON.items():
+        if codigo.upper() in texto_laudo or descricao.upper() in texto_laudo:
+            return codigo  # Retorna o código da opção encontrada
+
+    return "Localizacao não especificada (NI)"
+
+
+def lado_mama(texto):
+    """
+    Mama citada no texto: 'Mama esquerda' ou 'Mama direita'.
+    """
+    texto = texto.lower()
+    if "mama esquerda" in texto:
+        return "Mama esquerda"
+    elif "mama direita" in texto:
+        return "Mama direita"
+    else:
+        return "Localizacao nao especificada (NI)"
+
+
 def verificar_opcoes_radiobutton(driver):
     """
     Verifica se o texto do laudo contém alguma das opções do radiobutton do SISMAMA.
     """
-    opcoes_radiobutton = {
-        "QSL": "Quadrante Superior Lateral",
-        "QSM": "Quadrante Superior Medial",
-        "QIL": "Quadrante Inferior Lateral",
-        "QIM": "Quadrante Inferior Medial",
-        "UQLat": "União dos Quadrantes Laterais",
-        "UQSup": "União dos Quadrantes Superiores",
-        "UQMed": "União dos Quadrantes Mediais",
-        "UQInf": "União dos Quadrantes Inferiores",
-        "RRA": "Região Retroareolar",
-    }
-
     try:
         texto_laudo = (
             WebDriverWait(driver, 10)
             .until(
-                EC.visibility_of_element_located(
-                    (By.XPATH, "//div[33]//span[1]//div[1]//div[1]")
-                )
+                EC.visibility_of_element_located((By.XPATH, XPATH_TEXTO_LAUDO))
             )
-            .text.upper()
+            .text
         )
-
-        for codigo, descricao in opcoes_radiobutton.items():
-            if codigo.upper() in texto_laudo or descricao.upper() in texto_laudo:
-                return codigo  # Retorna o código da opção encontrada
-
-        return "Localizacao não especificada (NI)"
+        return opcao_radiobutton(texto_laudo)
     except TimeoutException:
         logger.warning("Não foi possível capturar o radiobutton.")
         return "Localizacao não especificada (NI)"
@@ -62,21 +84,9 @@ def capturar_localizacao_lesao(driver):
     """
     try:
         elemento_localizacao = WebDriverWait(driver, 10).until(
-            EC.visibility_of_element_located(
-                (
-                    By.XPATH,
-                    "//div[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'mama direita') or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'mama esquerda')]",
-                )
-            )
+            EC.visibility_of_element_located((By.XPATH, XPATH_LOCALIZACAO_LESAO))
         )
-        texto_localizacao = elemento_localizacao.text.lower()
-
-        if "mama esquerda" in texto_localizacao:
-            return "Mama esquerda"
-        elif "mama direita" in texto_localizacao:
-            return "Mama direita"
-        else:
-            return "Localizacao nao especificada (NI)"
+        return lado_mama(elemento_localizacao.text)
     except TimeoutException:
         logger.info("Não foi possível encontrar a localização da lesão.")
         return "Localizacao nao especificada (NI)"
@@ -0,0 +1,103 @@
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from src.config.logger import logger
+
+NAO_ESPECIFICADO = 'Não especificado (NI)'
+
+# Lê todos os campos da tela de uma vez. Argumentos: XPath que precisa
+# estar visível (ou null) e a lista [nome, xpath, atributo, regex, fallback].
+# Retorna null enquanto a tela não estiver pronta.
+_SCRIPT = """
+const [pronto, campos] = arguments;
+const fallbacks = [/*FALLBACKS*/];
+const achar = xpath => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const visivel = el => !!el && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+if (pronto && !visivel(achar(pronto))) return null;
+
+const dados = {}, viaFallback = [];
+for (const [nome, xpath, atributo, regex, fallback] of campos) {
+    let valor = '';
+    try {
+        const el = xpath ? achar(xpath) : null;
+        if (el) valor = String(el[atributo] ?? '').trim();
+        if (valor && regex) {
+            const match = valor.match(new RegExp(regex));
+            valor = match ? (match[1] ?? match[0]) : '';
+        }
+    } catch (e) {
+        valor = '';
+    }
+    if (!valor && fallback !== null) {
+        try {
+            valor = String(fallbacks[fallback]() || '').trim();
+        } catch (e) {
+            valor = '';
+        }
+        if (valor) viaFallback.push(nome);
+    }
+    dados[nome] = valor;
+}
+return {dados, viaFallback};
+"""
+
+
+class Extracao:
+    """
+    Extração declarativa de uma tela do SHIFT em um único `execute_script`.
+
+    Cada `find_element`/`get_attribute`/`WebDriverWait` é uma ida e volta
+    ao chromedriver; aqui a tela inteira é lida no navegador e volta como
+    um dicionário. `campos` mapeia o nome do campo à sua especificação:
+
+      - xpath: elemento lido (o primeiro encontrado, como `find_element`);
+      - atributo: propriedade lida, 'value' (padrão, inputs) ou 'innerText';
+      - regex: aplicada ao texto lido; fica o grupo 1;
+      - fallback: corpo JavaScript (com `return`) tentado quando o xpath não
+        dá valor;
+      - converter: função aplicada em Python ao valor lido (pelo xpath ou
+        pelo fallback);
+      - padrao: valor quando nada é encontrado (padrão '').
+
+    `pronto`, se informado, é o XPath de um elemento que precisa estar
+    visível antes da leitura: o script é repetido até lá, por até
+    `tempo_espera` segundos, e depois lê o que houver.
+    """
+
+    def __init__(self, campos, pronto=None):
+        self.campos = campos
+        self.pronto = pronto
+        fallbacks = []
+        self._argumentos = []
+        for nome, spec in campos.items():
+            indice = None
+            if spec.get('fallback'):
+                indice = len(fallbacks)
+                fallbacks.append(f"function () {{ {spec['fallback']} }}")
+            self._argumentos.append(
+                [nome, spec.get('xpath'), spec.get('atributo', 'value'), spec.get('regex'), indice]
+            )
+        self.script = _SCRIPT.replace('/*FALLBACKS*/', ',\n'.join(fallbacks))
+
+    def extrair(self, driver, tempo_espera=10):
+        """Retorna {campo: valor} com todos os campos da tela."""
+        try:
+            resultado = WebDriverWait(driver, tempo_espera, poll_frequency=0.25).until(
+                lambda d: d.execute_script(self.script, self.pronto, self._argumentos)
+            )
+        except TimeoutException:
+            logger.warning(f"Elemento '{self.pronto}' não ficou visível; lendo a tela assim mesmo.")
+            resultado = driver.execute_script(self.script, None, self._argumentos)
+
+        via_fallback = set(resultado['viaFallback'])
+        dados = {}
+        for nome, spec in self.campos.items():
+            valor = resultado['dados'].get(nome)
+            if nome in via_fallback:
+                logger.info(f'[{nome}] Extraído via fallback JS.')
+            if valor and spec.get('converter'):
+                valor = spec['converter'](valor)
+            dados[nome] = valor if valor not in ('', None) else spec.get('padrao', '')
+        return dados
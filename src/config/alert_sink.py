@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from .config import Config
+from .logger import logger
+
+
+class AlertSink:
+    """
+    Destino assíncrono dos alertas enviados via `APIClient.send_alert`.
+
+    `send_alert` só enfileira e retorna; uma thread de fundo faz o envio.
+    Alertas dos tipos em `tipos_digest` (por padrão Informacao e Sucesso) são
+    acumulados e enviados a cada `intervalo_digest` segundos como um único
+    alerta-resumo por robô e tipo. Os demais (Erro, Timeout, ...) saem
+    imediatamente. Um alerta igual (robô, tipo e mensagem) a outro recebido
+    há menos de `janela_dedupe` segundos é descartado.
+
+    O sink pode durar mais que o cliente (ex.: entre execuções do scheduler);
+    `api_client` pode ser trocado a qualquer momento.
+
+    Chame `close()` ao final para enviar o resumo pendente.
+    """
+
+    _PARAR = object()
+
+    def __init__(
+        self,
+        api_client=None,
+        intervalo_digest=None,
+        janela_dedupe=None,
+        tipos_digest=None,
+    ):
+        self.api_client = api_client
+        self.intervalo_digest = (
+            intervalo_digest
+            if intervalo_digest is not None
+            else Config.ALERT_DIGEST_INTERVAL
+        )
+        self.janela_dedupe = (
+            janela_dedupe if janela_dedupe is not None else Config.ALERT_DEDUPE_WINDOW
+        )
+        self.tipos_digest = set(tipos_digest or Config.ALERT_DIGEST_TYPES)
+        self.descartados = 0
+        self._fila = queue.Queue()
+        self._vistos = {}
+        self._digest = OrderedDict()
+        self._thread = threading.Thread(
+            target=self._loop, name='alert-sink', daemon=True
+        )
+        self._thread.start()
+
+    def send_alert(self, robot_id, alert_type, message, details=None):
+        """Enfileira o alerta; mesma assinatura de `APIClient.send_alert`."""
+        if not self._thread.is_alive():
+            # Depois de `close()` os alertas voltam a ser enviados na hora.
+            self._enviar(robot_id, alert_type, message, details)
+            return None
+        self._fila.put((robot_id, alert_type, message, details, time.monotonic()))
+        return {'alert_type': alert_type, 'enfileirado': True}
+
+    def _loop(self):
+        proximo_digest = time.monotonic() + self.intervalo_digest
+        while True:
+            espera = max(0.0, proximo_digest - time.monotonic())
+            try:
+                alerta = self._fila.get(timeout=espera)
+            except queue.Empty:
+                alerta = None
+
+            if alerta is self._PARAR:
+                return
+            if alerta is not None:
+                self._tratar(*alerta)
+            if time.monotonic() >= proximo_digest:
+                self._enviar_digest()
+                proximo_digest = time.monotonic() + self.intervalo_digest
+
+    def _tratar(self, robot_id, alert_type, message, details, recebido_em):
+        chave = (robot_id, alert_type, message)
+        ultimo = self._vistos.get(chave)
+        if ultimo is not None and recebido_em - ultimo < self.janela_dedupe:
+            self.descartados += 1
+            return
+        self._vistos[chave] = recebido_em
+        self._limpar_vistos(recebido_em)
+
+        if alert_type in self.tipos_digest:
+            self._digest.setdefault((robot_id, alert_type), []).append(
+                (message, details)
+            )
+        else:
+            self._enviar(robot_id, alert_type, message, details)
+
+    def _limpar_vistos(self, agora):
+        expirados = [
+            chave
+            for chave, visto_em in self._vistos.items()
+            if agora - visto_em >= self.janela_dedupe
+        ]
+        for chave in expirados:
+            del self._vistos[chave]
+
+    def _enviar_digest(self):
+        digest, self._digest = self._digest, OrderedDict()
+        for (robot_id, alert_type), alertas in digest.items():
+            if len(alertas) == 1:
+                message, details = alertas[0]
+                self._enviar(robot_id, alert_type, message, details)
+                continue
+            self._enviar(
+                robot_id,
+                alert_type,
+                f'{len(alertas)} alertas "{alert_type}" agrupados.',
+                '\n'.join(
+                    message if not details else f'{message} ({details})'
+                    for message, details in alertas
+                ),
+            )
+
+    def _enviar(self, robot_id, alert_type, message, details):
+        try:
+            self.api_client.enviar_alerta(robot_id, alert_type, message, details)
+        except Exception as e:
+            logger.error(f'Erro ao enviar alerta {alert_type}: {e}')
+
+    def close(self):
+        """Envia o que estiver na fila e o resumo pendente, e encerra a thread."""
+        if not self._thread.is_alive():
+            return
+        self._fila.put(self._PARAR)
+        self._thread.join()
+        while not self._fila.empty():
+            alerta = self._fila.get_nowait()
+            if alerta is not self._PARAR:
+                self._tratar(*alerta)
+        self._enviar_digest()
+        if self.descartados:
+            logger.info(f'{self.descartados} alerta(s) duplicado(s) descartado(s).')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
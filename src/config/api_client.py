@@ -1,30 +1,157 @@
 import json
+import queue
+import threading
+import time
+import uuid
 
 import requests
 
 from .config import Config
+from .http_transport import obter_transporte_padrao
+from .json_stream import JSONNaoEArray, iterar_array_json
 from .logger import logger
-from typing import Dict, Any
+from .outbox import Outbox, obter_outbox_padrao
+from .polling_cache import PollingCache, obter_polling_cache
+from typing import Dict, Any, List
+
+
+class TokenIndisponivel(requests.exceptions.RequestException):
+    """Não há token válido para autenticar a requisição."""
 
 
 class APIClient:
     """Cliente para interagir com a API."""
 
-    def __init__(self, auth_token):
-        """Inicializa o cliente da API com o token JWT."""
-        self.auth_token = auth_token
-        self.headers = {
-            'Authorization': f'Bearer {self.auth_token}',
+    # Escritas que podem ir direto para o outbox (`gravar_escrita`):
+    # tipo -> (método, endpoint com o id)
+    ROTAS_ESCRITA = {
+        'item': ('PATCH', 'items/{}/'),
+        'task': ('PATCH', 'tasks/{}/update-task/'),
+        'shift_data': ('POST', 'items/{}/shift-data/'),
+    }
+
+    def __init__(
+        self,
+        auth_token=None,
+        transport=None,
+        outbox=None,
+        token_manager=None,
+        polling_cache=None,
+        alert_sink=None,
+    ):
+        """
+        Inicializa o cliente da API com o token JWT.
+
+        Com `token_manager`, o token é obtido (e renovado) a cada requisição e
+        uma resposta 401 provoca uma nova tentativa com token renovado; sem
+        ele, usa o `auth_token` fixo informado.
+
+        Se `transport` não for informado, usa o transporte HTTP compartilhado
+        do processo (sessão com pool de conexões e timeouts por endpoint).
+        Se `outbox` não for informado, usa o outbox SQLite compartilhado, e o
+        mesmo vale para o cache de polling condicional (`polling_cache`).
+
+        Com `alert_sink` (ver `AlertSink`), `send_alert` apenas entrega o
+        alerta ao sink, que agrupa e envia em segundo plano.
+        """
+        self._auth_token = auth_token
+        self.token_manager = token_manager
+        self.transport = transport or obter_transporte_padrao()
+        self.outbox = outbox or obter_outbox_padrao()
+        self.polling_cache = polling_cache or obter_polling_cache()
+        self._suporta_lote = None
+        self._suporta_leases = None
+        self.alert_sink = alert_sink
+        self._replay_agendado = threading.Event()
+        self._thread_replay = None
+        self._lock_thread_replay = threading.Lock()
+
+    @property
+    def auth_token(self):
+        """Token JWT atual."""
+        if self.token_manager:
+            return self.token_manager.obter_token()
+        return self._auth_token
+
+    @property
+    def headers(self):
+        return self._cabecalhos(self.auth_token)
+
+    @staticmethod
+    def _cabecalhos(token):
+        if not token:
+            # Nunca envia 'Bearer None': a requisição falha como erro de rede
+            # e, no outbox, a escrita fica pendente para reenvio.
+            raise TokenIndisponivel('sem token de acesso para a API')
+        return {
+            'Authorization': f'Bearer {token}',
             'Content-Type': 'application/json',
         }
 
-    def _make_request(self, method, endpoint, params=None, data=None):
-        """Realiza requisições HTTP genéricas."""
-        url = f'{Config.API_URL}{endpoint}'
-        try:
-            response = requests.request(
-                method, url, headers=self.headers, params=params, json=data
+    def _enviar(self, method, endpoint, headers=None, **kwargs):
+        """
+        Envia a requisição pelo transporte. Se a API responder 401 e houver
+        `token_manager`, invalida o token e tenta uma única vez de novo.
+        Sem token disponível, levanta `TokenIndisponivel`.
+        """
+        token = self.auth_token
+        response = self.transport.request(
+            method, endpoint, headers={**self._cabecalhos(token), **(headers or {})}, **kwargs
+        )
+        if response.status_code == 401 and self.token_manager:
+            self.token_manager.invalidar(token)
+            response = self.transport.request(
+                method,
+                endpoint,
+                headers={**self._cabecalhos(self.auth_token), **(headers or {})},
+                **kwargs,
             )
+        return response
+
+    def _make_request(self, method, endpoint, params=None, data=None, duravel=False):
+        """
+        Realiza requisições HTTP genéricas.
+
+        Com `duravel=True` a escrita é gravada no outbox antes do envio e só
+        sai de lá quando a API confirma. Apenas a nova escrita é enviada aqui;
+        as pendentes são reenviadas em segundo plano (`agendar_replay`). Se o
+        backend estiver em espera de reenvio ou houver escrita mais antiga
+        pendente para o mesmo endpoint, a nova apenas entra na fila. Nesses
+        casos, e em erros transitórios, retorna None.
+        """
+        if duravel:
+            outbox = self.outbox
+            registro = {
+                'method': method,
+                'endpoint': endpoint,
+                'payload': data,
+                'idempotency_key': str(uuid.uuid4()),
+            }
+            registro['id'] = outbox.adicionar(
+                method, endpoint, data, registro['idempotency_key']
+            )
+            outbox.reservar(registro['id'], endpoint)
+            try:
+                if time.monotonic() < outbox.proxima_tentativa or outbox.anterior_pendente(
+                    registro['id'], endpoint
+                ):
+                    situacao, response = Outbox.PENDENTE, None
+                else:
+                    situacao, response = self._enviar_registro(registro)
+            finally:
+                outbox.liberar(registro['id'])
+
+            if situacao == Outbox.PENDENTE:
+                logger.warning(
+                    f'Escrita {method} para {endpoint} mantida no outbox para reenvio.'
+                )
+            if situacao == Outbox.PENDENTE or outbox.contar():
+                self.agendar_replay()
+            return response
+
+        url = f'{self.transport.base_url}{endpoint}'
+        try:
+            response = self._enviar(method, endpoint, params=params, json=data)
             response.raise_for_status()
             logger.info(f'Requisição {method} para {url} bem-sucedida.')
             return response.json()
@@ -32,11 +159,187 @@ class APIClient:
             logger.error(f'Erro na requisição {method} para {url}: {str(e)}')
         return None
 
+    def gravar_escrita(self, tipo, ident, dados):
+        """
+        Grava a escrita (`ROTAS_ESCRITA`) no outbox sem enviá-la e agenda o
+        replay, que a envia em segundo plano. Retorna o id do registro.
+        """
+        method, endpoint = self.ROTAS_ESCRITA[tipo]
+        dados = {k: v for k, v in dados.items() if v is not None}
+        registro_id = self.outbox.adicionar(
+            method, endpoint.format(ident), dados, str(uuid.uuid4())
+        )
+        self.agendar_replay()
+        return registro_id
+
+    def _enviar_registro(self, registro):
+        """
+        Envia um registro do outbox com sua chave `Idempotency-Key`.
+
+        Retorna `(situacao, resposta)`: `Outbox.PENDENTE` após um erro
+        transitório (o registro fica na fila), `Outbox.FALHOU` após um erro
+        definitivo (`Outbox.ERROS_DEFINITIVOS`) ou a última de
+        `outbox.max_tentativas` tentativas, com alerta, ou None quando a API
+        confirma. Se o backend parece fora (sem resposta, 408, 429 ou 5xx),
+        novos envios esperam `outbox.intervalo_reenvio` segundos.
+        """
+        outbox = self.outbox
+        method, endpoint = registro['method'], registro['endpoint']
+        url = f'{self.transport.base_url}{endpoint}'
+        try:
+            response = self._enviar(
+                method,
+                endpoint,
+                headers={'Idempotency-Key': registro['idempotency_key']},
+                json=registro['payload'],
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            status = getattr(e.response, 'status_code', None)
+            tentativas = outbox.registrar_tentativa(registro['id'], str(e))
+            if status in Outbox.ERROS_DEFINITIVOS:
+                self._descartar_registro(registro, f'erro definitivo: {e}')
+                return Outbox.FALHOU, None
+
+            logger.error(f'Erro na requisição {method} para {url}: {str(e)}')
+            if status is None or status in (408, 429) or status >= 500:
+                outbox.proxima_tentativa = time.monotonic() + outbox.intervalo_reenvio
+            if tentativas >= outbox.max_tentativas:
+                self._descartar_registro(registro, f'{tentativas} tentativas; último erro: {e}')
+                return Outbox.FALHOU, None
+            return Outbox.PENDENTE, None
+
+        try:
+            resposta = (
+                response.json() if response.content else {'status_code': response.status_code}
+            )
+        except ValueError:
+            resposta = {'status_code': response.status_code}
+        outbox.remover(registro['id'])
+        logger.info(f'Requisição {method} para {url} bem-sucedida.')
+        return None, resposta
+
+    def _descartar_registro(self, registro, motivo):
+        """Tira o registro da fila como falha e avisa por alerta."""
+        method, endpoint = registro['method'], registro['endpoint']
+        payload = json.dumps(registro['payload'], ensure_ascii=False)
+        logger.error(
+            f'Escrita {method} para {endpoint} descartada do outbox ({motivo}). '
+            f'Payload: {payload}'
+        )
+        self.outbox.marcar_falha(registro['id'], motivo)
+        try:
+            self.send_alert(
+                robot_id=Config.ROBOT_ID,
+                alert_type='Erro',
+                message=f'Escrita {method} para {endpoint} não enviada à API.',
+                details=f'{motivo}\nPayload: {payload}',
+            )
+        except Exception as e:
+            logger.error(f'Erro ao alertar sobre a escrita descartada: {e}')
+
+    def replay_outbox(self):
+        """
+        Reenvia as escritas pendentes do outbox, na ordem em que foram gravadas,
+        cada uma com sua chave `Idempotency-Key`.
+
+        A ordem é mantida por endpoint: um registro que falhou há menos de
+        `outbox.intervalo_reenvio` segundos, ou que acaba de ter um erro
+        transitório (401, 403, 409...), segura as escritas seguintes do mesmo
+        endpoint até o próximo replay, e as dos demais seguem. Se o backend
+        parece fora (rede, timeout, 408, 429, 5xx), o replay para e, por
+        `outbox.intervalo_reenvio` segundos, novas escritas são apenas
+        gravadas. Os erros de `Outbox.ERROS_DEFINITIVOS` e a última de
+        `outbox.max_tentativas` tentativas tiram o registro da fila.
+        Retorna um dicionário {id do registro: resposta} das escritas confirmadas.
+        """
+        respostas = {}
+        outbox = self.outbox
+        with outbox.lock_replay:
+            outbox.purgar_falhas()
+            if time.monotonic() < outbox.proxima_tentativa:
+                return respostas
+
+            bloqueados = set()
+            for registro in outbox.pendentes():
+                if (
+                    registro['endpoint'] in bloqueados
+                    or outbox.reservado(registro)
+                    or outbox.adiado(registro)
+                ):
+                    # Adiado, em envio ou atrás de uma escrita pendente
+                    bloqueados.add(registro['endpoint'])
+                    continue
+                situacao, resposta = self._enviar_registro(registro)
+                if situacao == Outbox.PENDENTE:
+                    if time.monotonic() < outbox.proxima_tentativa:
+                        break
+                    bloqueados.add(registro['endpoint'])
+                elif situacao is None:
+                    respostas[registro['id']] = resposta
+
+        return respostas
+
+    def agendar_replay(self):
+        """
+        Pede o reenvio das escritas pendentes a uma thread de fundo, criada
+        na primeira chamada, que repete o replay a cada intervalo de reenvio
+        enquanto houver pendências.
+        """
+        with self._lock_thread_replay:
+            self._replay_agendado.set()
+            if self._thread_replay is None:
+                self._thread_replay = threading.Thread(
+                    target=self._loop_replay, name='outbox-replay', daemon=True
+                )
+                self._thread_replay.start()
+
+    def _loop_replay(self):
+        while True:
+            self._replay_agendado.wait()
+            self._replay_agendado.clear()
+            try:
+                self.replay_outbox()
+                pendentes = self.outbox.contar()
+            except Exception as e:
+                logger.error(f'Erro no reenvio do outbox: {e}')
+                pendentes = 1
+            if pendentes:
+                espera = self.outbox.proximo_reenvio() - time.monotonic()
+                time.sleep(max(espera, 1.0))
+                self._replay_agendado.set()
+
+    def _get_condicional(self, endpoint, params=None):
+        """
+        GET condicional: envia `If-None-Match`/`If-Modified-Since` e o cursor
+        `since` guardados no `polling_cache`. Um 304 devolve a visão local sem
+        decodificar corpo algum; respostas completas ou delta são mescladas.
+        """
+        cache = self.polling_cache
+        chave = PollingCache.chave(endpoint, params)
+        url = f'{self.transport.base_url}{endpoint}'
+        try:
+            response = self._enviar(
+                'GET',
+                endpoint,
+                headers=cache.cabecalhos(chave),
+                params={**(params or {}), **cache.parametros(chave)},
+            )
+            if response.status_code == 304:
+                logger.info(f'Requisição GET para {url}: sem alterações (304).')
+                return cache.visao(chave)
+            response.raise_for_status()
+            logger.info(f'Requisição GET para {url} bem-sucedida.')
+            return cache.atualizar(chave, response.json(), response.headers)
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Erro na requisição GET para {url}: {str(e)}')
+        return None
+
     def get_pending_items(self, stage):
         """Obtém todos os itens pendentes do painel, filtrados por robô e estágio."""
         endpoint = 'items/by-stage/'
         params = {'stage': stage}
-        response = self._make_request('GET', endpoint, params=params)
+        response = self._get_condicional(endpoint, params=params)
 
         if response is None:
             logger.error(f'Falha ao buscar itens no estágio {stage}.')
@@ -45,6 +348,68 @@ class APIClient:
         logger.info(f'{len(response)} itens encontrados no estágio {stage}.')
         return response
 
+    def get_pending_items_stream(self, stage, chunk_size=64 * 1024):
+        """
+        Versão em streaming de `get_pending_items`: gera cada tarefa assim que
+        ela é recebida, sem carregar a resposta inteira em memória.
+        Não usa o cache de polling condicional.
+
+        Uma thread lê a resposta para um buffer de até `Config.API_STREAM_BUFFER`
+        tarefas enquanto o consumidor processa as já recebidas, de modo que a
+        conexão não fica presa ao ritmo do processamento (ex.: uma O.S. no
+        SHIFT). Se o consumidor parar antes do fim, a leitura é interrompida.
+        """
+        endpoint = 'items/by-stage/'
+        url = f'{self.transport.base_url}{endpoint}'
+        try:
+            response = self._enviar(
+                'GET', endpoint, params={'stage': stage}, stream=True
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Erro na requisição GET para {url}: {str(e)}')
+            logger.error(f'Falha ao buscar itens no estágio {stage}.')
+            return
+
+        fim = object()
+        buffer = queue.Queue(maxsize=Config.API_STREAM_BUFFER)
+        parar = threading.Event()
+
+        def colocar(valor):
+            while not parar.is_set():
+                try:
+                    buffer.put(valor, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def ler():
+            total = 0
+            try:
+                with response:
+                    for tarefa in iterar_array_json(response.iter_content(chunk_size)):
+                        if not colocar(tarefa):
+                            return
+                        total += 1
+            except JSONNaoEArray as e:
+                logger.warning(f'Resposta sem lista de tarefas para {stage}: {e.valor}')
+            except (ValueError, requests.exceptions.RequestException) as e:
+                logger.error(f'Erro ao ler itens do estágio {stage} em streaming: {e}')
+            finally:
+                colocar(fim)
+            logger.info(f'{total} tarefa(s) recebida(s) em streaming no estágio {stage}.')
+
+        threading.Thread(target=ler, name=f'stream-{stage}', daemon=True).start()
+        try:
+            while True:
+                tarefa = buffer.get()
+                if tarefa is fim:
+                    return
+                yield tarefa
+        finally:
+            parar.set()
+
     def get_shift_data(self, item_id):
         """Obtém os dados de Shift para um item específico usando o ID do item."""
         endpoint = f'shift-data/{item_id}/'
@@ -53,7 +418,7 @@ class APIClient:
     def get_sismama_data(self):
         """Obtém os dados do SISMAMA do endpoint `/items/sismama-data/`."""
         endpoint = 'items/sismama-data/'
-        return self._make_request('GET', endpoint)
+        return self._get_condicional(endpoint)
 
     def create_shift_data(self, shift_data):
         """Envia os dados do shift para o backend."""
@@ -62,7 +427,9 @@ class APIClient:
             logger.info(
                 f'Enviando dados do Shift: {json.dumps(shift_data, indent=4, ensure_ascii=False)}'
             )
-            response = self._make_request('POST', endpoint, data=shift_data)
+            response = self._make_request(
+                'POST', endpoint, data=shift_data, duravel=True
+            )
             if response:
                 logger.info(
                     f'Dados do Shift enviados com sucesso: {json.dumps(response, indent=4, ensure_ascii=False)}'
@@ -83,7 +450,9 @@ class APIClient:
         logger.info(
             f'Upserting ShiftData para item {item_id}: {json.dumps(shift_data, indent=4, ensure_ascii=False)}'
         )
-        response = self._make_request('POST', endpoint, data=shift_data)
+        response = self._make_request(
+            'POST', endpoint, data=shift_data, duravel=True
+        )
         if response:
             logger.info(
                 f'ShiftData upserted com sucesso: {json.dumps(response, indent=4, ensure_ascii=False)}'
@@ -96,7 +465,7 @@ class APIClient:
         """Atualiza uma tarefa específica."""
         endpoint = f'tasks/{task_id}/update-task/'
         data = {k: v for k, v in kwargs.items() if v is not None}
-        return self._make_request('PATCH', endpoint, data=data)
+        return self._make_request('PATCH', endpoint, data=data, duravel=True)
 
     def update_item(self, item_id, **kwargs):
         """Atualiza um item específico."""
@@ -106,7 +475,7 @@ class APIClient:
             logger.info(
                 f'Atualizando item {item_id} com os dados: {json.dumps(data, indent=4, ensure_ascii=False)}'
             )
-            response = self._make_request('PATCH', endpoint, data=data)
+            response = self._make_request('PATCH', endpoint, data=data, duravel=True)
             if response:
                 logger.info(f'Item {item_id} atualizado com sucesso.')
             return response
@@ -114,6 +483,222 @@ class APIClient:
             logger.error(f'Erro ao atualizar o item {item_id}: {str(e)}')
         return None
 
+    def suporta_atualizacao_em_lote(self):
+        """
+        Verifica (uma vez por cliente) se o backend anuncia o endpoint
+        `items/bulk-update/`, via OPTIONS com PATCH no cabeçalho `Allow`.
+        """
+        if self._suporta_lote is None:
+            try:
+                response = self._enviar('OPTIONS', 'items/bulk-update/')
+                self._suporta_lote = response.ok and 'PATCH' in response.headers.get(
+                    'Allow', ''
+                )
+            except requests.exceptions.RequestException as e:
+                logger.warning(f'Não foi possível verificar o endpoint de lote: {e}')
+                return False
+            logger.info(
+                f'Endpoint de atualização em lote disponível: {self._suporta_lote}.'
+            )
+        return self._suporta_lote
+
+    def update_items_bulk(
+        self, patches: List[Dict[str, Any]], concorrencia=None
+    ) -> List[Dict[str, Any]]:
+        """
+        Atualiza vários itens de uma vez.
+
+        Cada patch deve conter `item_id` (ou `id`) e os campos a atualizar.
+        Como em `update_item`, cada PATCH é gravado no outbox com sua chave
+        de idempotência antes do envio e só sai de lá quando a API confirma.
+        Usa `PATCH items/bulk-update/` (com a chave de cada item no corpo)
+        quando o backend o anuncia; caso contrário, ou se o lote falhar,
+        envia um PATCH por item com sua `Idempotency-Key`, com no máximo
+        `concorrencia` requisições simultâneas (`AsyncAPIClient`). Itens não
+        confirmados, ou com escrita anterior ainda pendente, ficam no outbox
+        e são reenviados em segundo plano.
+
+        Retorna, na ordem de `patches`, dicionários
+        `{'item_id': ..., 'ok': bool, 'response': ...}`.
+        """
+        outbox = self.outbox
+        registros = []
+        for patch in patches:
+            campos = {k: v for k, v in patch.items() if v is not None}
+            item_id = campos.pop('item_id') if 'item_id' in campos else campos.pop('id')
+            registro = {
+                'item_id': item_id,
+                'method': 'PATCH',
+                'endpoint': f'items/{item_id}/',
+                'payload': campos,
+                'idempotency_key': str(uuid.uuid4()),
+            }
+            registro['id'] = outbox.adicionar(
+                'PATCH', registro['endpoint'], campos, registro['idempotency_key']
+            )
+            outbox.reservar(registro['id'], registro['endpoint'])
+            registros.append(registro)
+        if not registros:
+            return []
+
+        respostas = {}
+        try:
+            if time.monotonic() >= outbox.proxima_tentativa:
+                a_enviar = [
+                    r
+                    for r in registros
+                    if not outbox.anterior_pendente(r['id'], r['endpoint'])
+                ]
+                if a_enviar and self.suporta_atualizacao_em_lote():
+                    respostas.update(self._update_items_lote(a_enviar) or {})
+                    a_enviar = [r for r in a_enviar if r['id'] not in respostas]
+                    if a_enviar:
+                        logger.warning('Falha no endpoint de lote; enviando item a item.')
+                if a_enviar:
+                    respostas.update(self._update_items_individual(a_enviar, concorrencia))
+        finally:
+            for registro in registros:
+                outbox.liberar(registro['id'])
+
+        resultados = []
+        for registro in registros:
+            response = respostas.get(registro['id'])
+            if response is None:
+                logger.warning(f"Item {registro['item_id']} mantido no outbox para reenvio.")
+            resultados.append(
+                {'item_id': registro['item_id'], 'ok': response is not None, 'response': response}
+            )
+        if outbox.contar():
+            self.agendar_replay()
+        return resultados
+
+    def _update_items_lote(self, registros):
+        """
+        Envia os registros em um `PATCH items/bulk-update/`. Retorna
+        {id do registro: resposta} dos itens confirmados, que saem do outbox;
+        os recusados com erro definitivo são marcados como falha. Retorna
+        None se o lote inteiro falhar.
+        """
+        logger.info(f'Atualizando {len(registros)} item(ns) via items/bulk-update/.')
+        endpoint = 'items/bulk-update/'
+        url = f'{self.transport.base_url}{endpoint}'
+        try:
+            response = self._enviar(
+                'PATCH',
+                endpoint,
+                headers={'Idempotency-Key': str(uuid.uuid4())},
+                json={
+                    'items': [
+                        {
+                            'id': r['item_id'],
+                            'idempotency_key': r['idempotency_key'],
+                            **r['payload'],
+                        }
+                        for r in registros
+                    ]
+                },
+            )
+            response.raise_for_status()
+            resultado_lote = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f'Erro na requisição PATCH para {url}: {str(e)}')
+            return None
+        if not isinstance(resultado_lote, dict) or 'results' not in resultado_lote:
+            return None
+
+        por_id = {str(r.get('id')): r for r in resultado_lote['results']}
+        respostas = {}
+        for registro in registros:
+            resultado = por_id.get(str(registro['item_id']))
+            status = resultado.get('status', 200) if resultado else None
+            if status is not None and status < 400:
+                self.outbox.remover(registro['id'])
+                respostas[registro['id']] = resultado
+                continue
+            logger.error(f"Falha ao atualizar item {registro['item_id']} no lote: {resultado}")
+            if status in Outbox.ERROS_DEFINITIVOS:
+                self.outbox.registrar_tentativa(registro['id'], json.dumps(resultado))
+                self._descartar_registro(registro, f'erro definitivo no lote: {resultado}')
+        return respostas
+
+    def _update_items_individual(self, registros, concorrencia):
+        """
+        Envia um PATCH por registro, com sua `Idempotency-Key`, via
+        `AsyncAPIClient`. Retorna {id do registro: resposta} dos confirmados,
+        que saem do outbox; os demais ficam pendentes para o replay.
+        """
+        logger.info(f'Atualizando {len(registros)} item(ns) com PATCH individual.')
+        token = self.auth_token
+        if not token:
+            logger.error('Sem token de acesso; itens mantidos no outbox.')
+            return {}
+        # asyncio e httpx só são carregados quando este caminho é usado
+        import asyncio
+
+        from .async_api_client import AsyncAPIClient
+
+        async def _enviar():
+            async with AsyncAPIClient(token, base_url=self.transport.base_url) as cliente:
+                return await cliente.update_items(
+                    [
+                        {
+                            'item_id': r['item_id'],
+                            'idempotency_key': r['idempotency_key'],
+                            **r['payload'],
+                        }
+                        for r in registros
+                    ],
+                    concorrencia or Config.API_BULK_CONCURRENCY,
+                )
+
+        respostas = {}
+        for registro, response in zip(registros, asyncio.run(_enviar())):
+            if response is not None:
+                self.outbox.remover(registro['id'])
+                respostas[registro['id']] = response
+        return respostas
+
+    def suporta_leases(self):
+        """
+        Verifica (uma vez por cliente) se o backend anuncia `items/claim/`,
+        via OPTIONS com POST no cabeçalho `Allow`.
+        """
+        if self._suporta_leases is None:
+            try:
+                response = self._enviar('OPTIONS', 'items/claim/')
+                self._suporta_leases = response.ok and 'POST' in response.headers.get(
+                    'Allow', ''
+                )
+            except requests.exceptions.RequestException as e:
+                logger.warning(f'Não foi possível verificar o endpoint de leases: {e}')
+                return False
+            logger.info(f'Leases de itens disponíveis: {self._suporta_leases}.')
+        return self._suporta_leases
+
+    def claim_items(self, robot_id, stage, item_ids, ttl):
+        """
+        Reivindica itens para o robô por `ttl` segundos. Itens sem lease, com
+        lease expirado ou já do próprio robô são concedidos.
+
+        Retorna `{'claimed': [{'id', 'lease_token', 'expires_in'}],
+        'rejected': [ids]}` ou None em caso de erro.
+        """
+        data = {'robot': robot_id, 'stage': stage, 'items': list(item_ids), 'ttl': ttl}
+        return self._make_request('POST', 'items/claim/', data=data)
+
+    def heartbeat_leases(self, robot_id, leases, ttl):
+        """
+        Renova os leases informados (`[{'id', 'lease_token'}]`) por mais `ttl`
+        segundos. Retorna `{'renewed': [ids], 'lost': [ids]}` ou None.
+        """
+        data = {'robot': robot_id, 'leases': leases, 'ttl': ttl}
+        return self._make_request('POST', 'items/heartbeat/', data=data)
+
+    def release_items(self, robot_id, leases):
+        """Libera os leases informados (`[{'id', 'lease_token'}]`)."""
+        data = {'robot': robot_id, 'leases': leases}
+        return self._make_request('POST', 'items/release/', data=data)
+
     def refresh_token(self, refresh_token):
         """Atualiza o token JWT usando o token de refresh."""
         endpoint = 'login/token/refresh/'
@@ -131,8 +716,18 @@ class APIClient:
         - alert_type: tipo do alerta (por exemplo: "Informacao", "Erro", "Sucesso", "Alerta", "Debug", "Timeout", "Validacao", "Interrupcao").
         - message: texto descritivo do alerta (mínimo 1 caractere).
         - details: (opcional) detalhes técnicos do alerta (stack trace, logs, etc.).
+
+        Se houver `alert_sink`, o alerta é repassado a ele e enviado em
+        segundo plano.
         """
+        if self.alert_sink is not None:
+            return self.alert_sink.send_alert(robot_id, alert_type, message, details)
+        return self.enviar_alerta(robot_id, alert_type, message, details)
 
+    def enviar_alerta(
+        self, robot_id: int, alert_type: str, message: str, details: str = None
+    ) -> Dict[str, Any] | None:
+        """Envia o alerta diretamente à API (`alerts/create/`), sem o sink."""
         endpoint = 'alerts/create/'
         payload: Dict[str, Any] = {
             'robot': robot_id,
@@ -143,14 +738,10 @@ class APIClient:
             payload['details'] = details
 
         try:
-            logger.info(
-                f'Enviando alerta: {json.dumps(payload, ensure_ascii=False)}'
-            )
+            logger.info(f'Enviando alerta {alert_type}: {message}')
             response = self._make_request('POST', endpoint, data=payload)
             if response is not None:
-                logger.info(
-                    f'Alerta enviado com sucesso: {json.dumps(response, ensure_ascii=False)}'
-                )
+                logger.info(f'Alerta {alert_type} enviado com sucesso.')
             return response
         except Exception as e:
             logger.error(f'Erro ao enviar alerta: {str(e)}')
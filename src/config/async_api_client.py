@@ -0,0 +1,183 @@
+import asyncio
+import json
+from typing import Any, Dict, Iterable, List
+
+import httpx
+
+from .config import Config
+from .http_transport import resolver_timeout
+from .logger import logger
+
+
+class AsyncAPIClient:
+    """
+    Versão assíncrona do `APIClient`, baseada em `httpx.AsyncClient`.
+
+    Usa HTTP/2 quando o servidor suporta, o que permite multiplexar várias
+    atualizações sobre uma única conexão. Deve ser usado como context
+    manager assíncrono:
+
+        async with AsyncAPIClient(token) as client:
+            await client.update_items([...])
+    """
+
+    def __init__(
+        self,
+        auth_token,
+        base_url=None,
+        pool_size=None,
+        max_retries=None,
+        http2=True,
+    ):
+        """Inicializa o cliente assíncrono com o token JWT."""
+        if not auth_token:
+            raise ValueError('AsyncAPIClient exige um token de acesso.')
+        self.auth_token = auth_token
+        self.base_url = base_url if base_url is not None else Config.API_URL
+        self.headers = {
+            'Authorization': f'Bearer {self.auth_token}',
+            'Content-Type': 'application/json',
+        }
+        self.timeouts = Config.API_ENDPOINT_TIMEOUTS
+        self.timeout_padrao = (Config.API_CONNECT_TIMEOUT, Config.API_READ_TIMEOUT)
+        pool_size = pool_size or Config.API_POOL_SIZE
+        # Retentativas do transporte cobrem apenas falhas de conexão.
+        transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+            retries=(
+                max_retries if max_retries is not None else Config.API_MAX_RETRIES
+            ),
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url, headers=self.headers, transport=transport
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        """Fecha o cliente e as conexões abertas."""
+        await self._client.aclose()
+
+    def _timeout(self, endpoint):
+        connect, read = resolver_timeout(
+            endpoint, self.timeouts, self.timeout_padrao
+        )
+        return httpx.Timeout(read, connect=connect)
+
+    async def _make_request(self, method, endpoint, params=None, data=None, headers=None):
+        """Realiza requisições HTTP genéricas de forma assíncrona."""
+        url = f'{self.base_url}{endpoint}'
+        try:
+            response = await self._client.request(
+                method,
+                endpoint,
+                params=params,
+                json=data,
+                headers=headers,
+                timeout=self._timeout(endpoint),
+            )
+            response.raise_for_status()
+            logger.info(
+                f'Requisição {method} para {url} bem-sucedida ({response.http_version}).'
+            )
+            # 204 ou corpo que não é JSON não devem virar exceção fora do
+            # tratamento por item de `update_items`
+            if not response.content:
+                return {'status_code': response.status_code}
+            try:
+                return response.json()
+            except ValueError:
+                return {'status_code': response.status_code}
+        except httpx.HTTPError as e:
+            logger.error(f'Erro na requisição {method} para {url}: {str(e)}')
+        return None
+
+    async def get_pending_items(self, stage):
+        """Obtém todos os itens pendentes do painel, filtrados por robô e estágio."""
+        response = await self._make_request(
+            'GET', 'items/by-stage/', params={'stage': stage}
+        )
+        if response is None:
+            logger.error(f'Falha ao buscar itens no estágio {stage}.')
+            return None
+
+        logger.info(f'{len(response)} itens encontrados no estágio {stage}.')
+        return response
+
+    async def get_sismama_data(self):
+        """Obtém os dados do SISMAMA do endpoint `/items/sismama-data/`."""
+        return await self._make_request('GET', 'items/sismama-data/')
+
+    async def upsert_shift_data(
+        self, item_id: int, shift_data: Dict[str, Any]
+    ) -> Dict[str, Any] | None:
+        """Cria ou atualiza os dados de Shift do item (POST /items/{item_id}/shift-data/)."""
+        response = await self._make_request(
+            'POST', f'items/{item_id}/shift-data/', data=shift_data
+        )
+        if response:
+            logger.info(f'ShiftData do item {item_id} upserted com sucesso.')
+        else:
+            logger.error(f'Falha no upsert de ShiftData para item {item_id}.')
+        return response
+
+    async def update_task(self, task_id, **kwargs):
+        """Atualiza uma tarefa específica."""
+        data = {k: v for k, v in kwargs.items() if v is not None}
+        return await self._make_request(
+            'PATCH', f'tasks/{task_id}/update-task/', data=data
+        )
+
+    async def update_item(self, item_id, idempotency_key=None, **kwargs):
+        """Atualiza um item específico (com `Idempotency-Key`, se informada)."""
+        data = {k: v for k, v in kwargs.items() if v is not None}
+        headers = {'Idempotency-Key': idempotency_key} if idempotency_key else None
+        response = await self._make_request(
+            'PATCH', f'items/{item_id}/', data=data, headers=headers
+        )
+        if response:
+            logger.info(f'Item {item_id} atualizado com sucesso.')
+        return response
+
+    async def update_items(
+        self, updates: Iterable[Dict[str, Any]], concorrencia=None
+    ) -> List[Dict[str, Any] | None]:
+        """
+        Envia vários PATCH de itens simultaneamente e aguarda todos.
+
+        Cada elemento de `updates` deve conter `item_id`, os campos a
+        atualizar e, opcionalmente, `idempotency_key`. No máximo
+        `concorrencia` requisições ficam em voo ao mesmo tempo. Retorna as
+        respostas na mesma ordem de `updates`.
+        """
+        semaforo = asyncio.Semaphore(concorrencia or Config.API_POOL_SIZE)
+
+        async def enviar(update):
+            campos = dict(update)
+            item_id = campos.pop('item_id')
+            async with semaforo:
+                return await self.update_item(item_id, **campos)
+
+        return await asyncio.gather(*(enviar(u) for u in updates))
+
+    async def send_alert(
+        self, robot_id: int, alert_type: str, message: str, details: str = None
+    ) -> Dict[str, Any] | None:
+        """Envia um alerta à API (ver `APIClient.send_alert`)."""
+        payload: Dict[str, Any] = {
+            'robot': robot_id,
+            'alert_type': alert_type,
+            'message': message,
+        }
+        if details is not None:
+            payload['details'] = details
+
+        logger.info(f'Enviando alerta: {json.dumps(payload, ensure_ascii=False)}')
+        return await self._make_request('POST', 'alerts/create/', data=payload)
@@ -1,7 +1,6 @@
 import requests
 
-from src.config.config import Config
-
+from .http_transport import obter_transporte_padrao
 from .logger import logger
 
 
@@ -9,15 +8,33 @@ class AuthenticationService:
     """Serviço de autenticação para gerenciar login e tokens."""
 
     @staticmethod
-    def authenticate(username, password):
+    def authenticate(username, password, transport=None):
         """Autentica o usuário e retorna os tokens."""
-        auth_url = f'{Config.API_URL}login/token/'
         data = {'username': username, 'password': password}
+        transport = transport or obter_transporte_padrao()
         try:
-            response = requests.post(auth_url, json=data)
+            response = transport.request(
+                'POST', 'login/token/', json=data
+            )
             response.raise_for_status()
             logger.info('Autenticação bem-sucedida.')
             return response.json()
         except requests.RequestException as e:
             logger.error(f'Erro durante a autenticação: {str(e)}')
             return None
+
+    @staticmethod
+    def refresh(refresh_token, transport=None):
+        """Obtém um novo access token a partir do token de refresh."""
+        data = {'refresh': refresh_token}
+        transport = transport or obter_transporte_padrao()
+        try:
+            response = transport.request(
+                'POST', 'login/token/refresh/', json=data
+            )
+            response.raise_for_status()
+            logger.info('Token renovado com sucesso.')
+            return response.json()
+        except requests.RequestException as e:
+            logger.error(f'Erro ao renovar o token: {str(e)}')
+            return None
@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+
+from .config import Config
+from .logger import logger
+
+
+class CheckpointJournal:
+    """
+    Journal local, só de acréscimo (JSON Lines), do progresso de cada item.
+
+    Cada etapa concluída de um item em um estágio vira uma linha:
+    `started` é gravado antes de o item ir a STARTED na API; SHIFT registra
+    ainda `searched`, `extracted` (com os dados extraídos) e `upserted`;
+    SISMAMA registra `typed` e `saved`; `done` encerra o item. `upserted` e
+    `done` só são gravados depois que as escritas do item estão na API ou
+    no outbox.
+    Se o processo morrer no meio, a próxima execução consulta `estado()` e
+    retoma da última etapa concluída em vez de refazer o trabalho caro, e
+    `interrompidos()` lista os itens deixados por outro processo.
+
+    O arquivo é compactado ao abrir, mantendo só os itens não concluídos.
+    """
+
+    INICIADO = 'started'
+    EXTRAIDO = 'extracted'
+    DIGITADO = 'typed'
+    SALVO = 'saved'
+    CONCLUIDO = 'done'
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or Config.CHECKPOINT_PATH
+        self._lock = threading.Lock()
+        self._estados = {}
+        self._carregar()
+        self.compactar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, encoding='utf-8') as arquivo:
+                linhas = arquivo.readlines()
+        except FileNotFoundError:
+            return
+        for numero, linha in enumerate(linhas, 1):
+            try:
+                self._aplicar(json.loads(linha))
+            except ValueError:
+                # Linha truncada por uma queda no meio da escrita.
+                logger.warning(f'Checkpoint: linha {numero} inválida ignorada.')
+
+    def _aplicar(self, registro):
+        chave = (registro['stage'], registro['item_id'])
+        if registro['etapa'] == self.CONCLUIDO:
+            self._estados.pop(chave, None)
+            return
+        anterior = self._estados.get(chave, {})
+        self._estados[chave] = {
+            **registro,
+            # As etapas seguintes mantêm os dados extraídos antes.
+            'dados': registro.get('dados') or anterior.get('dados'),
+        }
+
+    def _acrescentar(self, registro):
+        with open(self.caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            arquivo.flush()
+
+    def registrar(self, stage, item_id, etapa, dados=None):
+        """Registra que o item concluiu `etapa` no estágio."""
+        registro = {
+            'stage': stage,
+            'item_id': item_id,
+            'etapa': etapa,
+            'pid': os.getpid(),
+            'ts': time.time(),
+        }
+        if dados is not None:
+            registro['dados'] = dados
+        with self._lock:
+            self._acrescentar(registro)
+            self._aplicar(registro)
+
+    def concluir(self, stage, item_id):
+        """Marca o item como encerrado no estágio; não há o que retomar."""
+        self.registrar(stage, item_id, self.CONCLUIDO)
+
+    def estado(self, stage, item_id):
+        """Último registro do item não concluído (`etapa`, `dados`, ...) ou None."""
+        with self._lock:
+            estado = self._estados.get((stage, item_id))
+            return dict(estado) if estado else None
+
+    def interrompidos(self):
+        """Itens não concluídos registrados por outro processo."""
+        pid = os.getpid()
+        with self._lock:
+            return [dict(e) for e in self._estados.values() if e['pid'] != pid]
+
+    def assumir(self, stage, item_id):
+        """Passa o item interrompido para este processo, mantendo etapa e dados."""
+        estado = self.estado(stage, item_id)
+        if estado:
+            self.registrar(stage, item_id, estado['etapa'], estado.get('dados'))
+
+    def compactar(self):
+        """Reescreve o arquivo só com o último estado dos itens não concluídos."""
+        with self._lock:
+            temporario = f'{self.caminho}.tmp'
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                for estado in self._estados.values():
+                    registro = {k: v for k, v in estado.items() if v is not None}
+                    arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            os.replace(temporario, self.caminho)
+
+
+_journal_padrao = None
+_journal_lock = threading.Lock()
+
+
+def obter_checkpoint_journal():
+    """Retorna o journal de checkpoints compartilhado do processo."""
+    global _journal_padrao
+    with _journal_lock:
+        if _journal_padrao is None:
+            _journal_padrao = CheckpointJournal()
+        return _journal_padrao
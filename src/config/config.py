@@ -14,6 +14,37 @@ class BaseConfig:
 
     LOG_FILE = os.path.join(LOG_DIR, 'main.log')
 
+    # Estado local persistente (outbox de escritas, caches)
+    DATA_DIR = os.path.join(BASE_DIR, 'data')
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    # Journal do progresso de cada item, para retomar após uma queda
+    CHECKPOINT_PATH = os.getenv(
+        'CHECKPOINT_PATH', os.path.join(DATA_DIR, 'checkpoints.jsonl')
+    )
+
+    # Perfis de estágio: um nó que roda só parte do fluxo (ex.:
+    # RPA_PROFILE=image) importa e valida apenas o que esse estágio usa.
+    # Aceita vários perfis separados por vírgula (ex.: shift,image).
+    PERFIS = {
+        'shift': ('SHIFT',),
+        'image': ('IMAGE_PROCESS',),
+        'sismama': ('SISMAMA',),
+        'all': ('SHIFT', 'IMAGE_PROCESS', 'SISMAMA'),
+    }
+    RPA_PROFILE = os.getenv('RPA_PROFILE', 'all')
+
+    # Modo daemon do scheduler: mantém cliente da API, Chrome logado no SHIFT
+    # e SIS MAMA abertos entre as execuções
+    DAEMON_MODE = os.getenv('RPA_DAEMON', 'false').lower() in ('1', 'true', 'sim')
+
+    # Modo pipeline: SHIFT, IMAGE_PROCESS e SISMAMA rodam como workers
+    # concorrentes ligados por filas, em vez de um estágio após o outro
+    PIPELINE_MODE = os.getenv('RPA_PIPELINE', 'false').lower() in ('1', 'true', 'sim')
+    PIPELINE_IMAGE_WORKERS = int(os.getenv('PIPELINE_IMAGE_WORKERS', 2))
+    # Espera (s) para agrupar itens analisados antes de rodar o SIS MAMA
+    PIPELINE_SISMAMA_DEBOUNCE = float(os.getenv('PIPELINE_SISMAMA_DEBOUNCE', 5))
+
 
 class ShiftConfig:
     """Configurações específicas para o sistema SHIFT."""
@@ -23,11 +54,54 @@ class ShiftConfig:
     SENHA = os.getenv('SENHA_SHIFT')
     NUMERO_CNES = os.getenv('NUMERO_CNES')
 
-    # Garantir que as variáveis essenciais estão definidas
-    if not URL or not USUARIO or not SENHA:
-        raise ValueError(
-            'Variáveis de ambiente do SHIFT não estão configuradas corretamente!'
-        )
+    # Navegadores logados em paralelo no SHIFT (ver `ShiftPool`); cada um
+    # é um Chrome completo, então limite pela memória da máquina
+    SHIFT_POOL_SIZE = int(os.getenv('SHIFT_POOL_SIZE', 1))
+    # Espera (s) antes de recriar o navegador de um worker que falhou,
+    # dobrando a cada falha seguida até o máximo
+    SHIFT_POOL_BACKOFF_INICIAL = float(os.getenv('SHIFT_POOL_BACKOFF_INICIAL', 5))
+    SHIFT_POOL_BACKOFF_MAXIMO = float(os.getenv('SHIFT_POOL_BACKOFF_MAXIMO', 120))
+    # EXPERIMENTAL: alternativa de pouca memória ao pool, várias abas em
+    # um único Chrome (ver `ShiftAbas`), intercaladas enquanto o servidor
+    # responde. A economia de memória ainda não foi medida no Chrome real
+    # (benchmarks/bench_memoria_abas.py); mantenha 1 em produção até lá.
+    # Ignorado quando SHIFT_POOL_SIZE > 1
+    SHIFT_ABAS = int(os.getenv('SHIFT_ABAS', 1))
+    # Pausa (s) do laço das abas quando nenhuma tela respondeu ainda
+    SHIFT_ABAS_INTERVALO = float(os.getenv('SHIFT_ABAS_INTERVALO', 0.2))
+
+    # Perfil leve do Chrome (ver `iniciar_driver`): bloqueia imagens,
+    # fontes, mídia e rastreadores, não espera o evento `load` (page load
+    # 'eager'; as esperas do robô são explícitas) e desliga serviços em
+    # segundo plano. Screenshots saem sem as imagens bloqueadas. Ganho
+    # ainda não medido: rode benchmarks/bench_perfil_navegador.py no Chrome
+    # real antes de ligar em produção
+    SHIFT_PERFIL_LEVE = os.getenv('SHIFT_PERFIL_LEVE', 'false').lower() in ('1', 'true', 'sim')
+    SHIFT_BLOQUEAR_IMAGENS = os.getenv('SHIFT_BLOQUEAR_IMAGENS', 'true').lower() in (
+        '1',
+        'true',
+        'sim',
+    )
+    # Padrões de URL bloqueados via CDP (Network.setBlockedURLs), separados
+    # por vírgula; '*' casa com qualquer trecho
+    SHIFT_URLS_BLOQUEADAS = [
+        padrao.strip()
+        for padrao in os.getenv(
+            'SHIFT_URLS_BLOQUEADAS',
+            '*.woff,*.woff2,*.ttf,*.otf,*.eot,*.mp4,*.webm,*.mp3,*.ogg,'
+            '*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,'
+            '*hotjar.com*,*clarity.ms*,*facebook.net*',
+        ).split(',')
+        if padrao.strip()
+    ]
+
+    @classmethod
+    def validar_shift(cls):
+        """Garante que as variáveis essenciais do SHIFT estão definidas."""
+        if not cls.URL or not cls.USUARIO or not cls.SENHA:
+            raise ValueError(
+                'Variáveis de ambiente do SHIFT não estão configuradas corretamente!'
+            )
 
 
 class APIConfig:
@@ -35,6 +109,157 @@ class APIConfig:
 
     API_URL = os.getenv('API_URL', 'http://localhost:8000')
 
+    # Transporte HTTP (sessão persistente com pool de conexões)
+    API_POOL_SIZE = int(os.getenv('API_POOL_SIZE', 10))
+    API_CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', 5))
+    API_READ_TIMEOUT = float(os.getenv('API_READ_TIMEOUT', 30))
+    API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', 3))
+    API_BACKOFF_FACTOR = float(os.getenv('API_BACKOFF_FACTOR', 0.5))
+
+    # Timeouts (connect, read) por endpoint. O prefixo mais longo prevalece;
+    # endpoints sem correspondência usam API_CONNECT_TIMEOUT/API_READ_TIMEOUT.
+    API_ENDPOINT_TIMEOUTS = {
+        'login/token/': (5, 15),
+        'items/by-stage/': (5, 60),
+        'items/sismama-data/': (5, 60),
+        'alerts/create/': (3, 10),
+    }
+
+    # Intervalo (s) entre envios da fila write-behind de status do SHIFT
+    WRITE_BEHIND_INTERVAL = float(os.getenv('WRITE_BEHIND_INTERVAL', 2))
+
+    # Lê `items/by-stage/` do SHIFT em streaming, processando cada tarefa
+    # assim que chega (útil para backlogs grandes após uma indisponibilidade)
+    API_STREAM_PENDING = os.getenv('API_STREAM_PENDING', 'false').lower() in (
+        '1',
+        'true',
+        'sim',
+    )
+    # Máximo de tarefas lidas do stream à frente do processamento; a leitura
+    # só espera o consumidor quando o buffer enche
+    API_STREAM_BUFFER = int(os.getenv('API_STREAM_BUFFER', 10000))
+
+    # Alertas: intervalo (s) do resumo de Informacao/Sucesso e janela (s) em
+    # que alertas repetidos (mesmo robô, tipo e mensagem) são descartados
+    ALERT_DIGEST_INTERVAL = float(os.getenv('ALERT_DIGEST_INTERVAL', 60))
+    ALERT_DEDUPE_WINDOW = float(os.getenv('ALERT_DEDUPE_WINDOW', 300))
+    ALERT_DIGEST_TYPES = ('Informacao', 'Sucesso')
+
+    # Máximo de PATCH simultâneos quando não há endpoint de lote
+    API_BULK_CONCURRENCY = int(os.getenv('API_BULK_CONCURRENCY', 8))
+
+    # Outbox SQLite das escritas na API e intervalo (s) entre tentativas de
+    # reenvio depois de uma falha transitória
+    OUTBOX_PATH = os.getenv(
+        'OUTBOX_PATH', os.path.join(BaseConfig.DATA_DIR, 'outbox.sqlite3')
+    )
+    OUTBOX_RETRY_INTERVAL = float(os.getenv('OUTBOX_RETRY_INTERVAL', 30))
+    # Tentativas de uma escrita antes de ela sair da fila como falha (com
+    # alerta) e dias que as falhas ficam guardadas para consulta
+    OUTBOX_MAX_TENTATIVAS = int(os.getenv('OUTBOX_MAX_TENTATIVAS', 20))
+    OUTBOX_RETENCAO_FALHAS_DIAS = float(os.getenv('OUTBOX_RETENCAO_FALHAS_DIAS', 7))
+
+    # Duração (s) dos leases de itens entre robôs; renovados a cada TTL/3
+    LEASE_TTL = float(os.getenv('LEASE_TTL', 120))
+
+    # Cache dos tokens JWT e antecedência (s) para renovar antes de expirar
+    TOKEN_CACHE_PATH = os.getenv(
+        'TOKEN_CACHE_PATH', os.path.join(BaseConfig.DATA_DIR, 'token_cache.json')
+    )
+    TOKEN_REFRESH_MARGIN = float(os.getenv('TOKEN_REFRESH_MARGIN', 60))
+
+
+class SchedulerConfig:
+    """Configurações do agendador adaptativo (`scheduler.py`)."""
+
+    # Intervalo (s) entre ciclos enquanto há backlog e primeiro intervalo ocioso
+    SCHEDULER_MIN_INTERVAL = float(os.getenv('SCHEDULER_MIN_INTERVAL', 1))
+    SCHEDULER_IDLE_INTERVAL = float(os.getenv('SCHEDULER_IDLE_INTERVAL', 5))
+    # Teto (s) do intervalo ocioso por estágio; dobra a cada ciclo sem trabalho
+    SCHEDULER_MAX_INTERVALS = {
+        'SHIFT': float(os.getenv('SCHEDULER_MAX_INTERVAL_SHIFT', 60)),
+        'IMAGE_PROCESS': float(os.getenv('SCHEDULER_MAX_INTERVAL_IMAGE', 60)),
+        'SISMAMA': float(os.getenv('SCHEDULER_MAX_INTERVAL_SISMAMA', 300)),
+    }
+    SCHEDULER_JITTER = float(os.getenv('SCHEDULER_JITTER', 0.2))
+
+    # Despertar externo: `touch` neste arquivo ou conexão TCP local na porta
+    # (0 desativa o socket)
+    SCHEDULER_WAKE_FILE = os.getenv(
+        'SCHEDULER_WAKE_FILE', os.path.join(BaseConfig.DATA_DIR, 'despertar')
+    )
+    SCHEDULER_WAKE_PORT = int(os.getenv('SCHEDULER_WAKE_PORT', 0))
+
+    # Prioridade dos itens entre tarefas (`src/utils/prioridade.py`): prazo
+    # em dias a partir da data de coleta, prazo em horas por estágio para
+    # itens sem coleta e espera máxima (h) antes de um item ser promovido
+    SLA_COLETA_DIAS = float(os.getenv('SLA_COLETA_DIAS', 30))
+    SLA_ESTAGIO_HORAS = {
+        'SHIFT': float(os.getenv('SLA_HORAS_SHIFT', 24)),
+        'IMAGE_PROCESS': float(os.getenv('SLA_HORAS_IMAGE', 24)),
+        'SISMAMA': float(os.getenv('SLA_HORAS_SISMAMA', 48)),
+    }
+    SLA_ESPERA_MAXIMA = float(os.getenv('SLA_ESPERA_MAXIMA', 72))
+
+    # Janela de lote (`src/utils/janela_lote.py`): o estágio só abre o recurso
+    # caro (Chrome, SIS MAMA) com LOTE_MIN_ITENS itens pendentes ou quando o
+    # mais antigo espera há LOTE_ESPERA_MAXIMA segundos. Com o recurso já
+    # aberto não espera. O padrão (1 item, 0 s) não agrupa.
+    LOTE_MIN_ITENS = {
+        'SHIFT': int(os.getenv('LOTE_MIN_ITENS_SHIFT', 1)),
+        'IMAGE_PROCESS': int(os.getenv('LOTE_MIN_ITENS_IMAGE', 1)),
+        'SISMAMA': int(os.getenv('LOTE_MIN_ITENS_SISMAMA', 1)),
+    }
+    LOTE_ESPERA_MAXIMA = {
+        'SHIFT': float(os.getenv('LOTE_ESPERA_MAXIMA_SHIFT', 0)),
+        'IMAGE_PROCESS': float(os.getenv('LOTE_ESPERA_MAXIMA_IMAGE', 0)),
+        'SISMAMA': float(os.getenv('LOTE_ESPERA_MAXIMA_SISMAMA', 0)),
+    }
+
+
+class WatchdogConfig:
+    """Prazos (s) vigiados pelo watchdog (`src/utils/watchdog.py`); 0 desativa."""
+
+    # Por item: ao vencer, o recurso do estágio é reciclado e o item vai
+    # para ERROR com o motivo de timeout
+    WATCHDOG_ITEM_TIMEOUTS = {
+        'SHIFT': float(os.getenv('WATCHDOG_ITEM_TIMEOUT_SHIFT', 180)),
+        'IMAGE_PROCESS': float(os.getenv('WATCHDOG_ITEM_TIMEOUT_IMAGE', 180)),
+        'SISMAMA': float(os.getenv('WATCHDOG_ITEM_TIMEOUT_SISMAMA', 300)),
+    }
+    # Por execução do estágio: ao vencer, os itens restantes ficam para o
+    # próximo ciclo
+    WATCHDOG_STAGE_TIMEOUTS = {
+        'SHIFT': float(os.getenv('WATCHDOG_STAGE_TIMEOUT_SHIFT', 3600)),
+        'IMAGE_PROCESS': float(os.getenv('WATCHDOG_STAGE_TIMEOUT_IMAGE', 1800)),
+        'SISMAMA': float(os.getenv('WATCHDOG_STAGE_TIMEOUT_SISMAMA', 3600)),
+    }
+
+
+class SupervisorConfig:
+    """Processos isolados por estágio sob o supervisor (`src/utils/supervisor.py`)."""
+
+    # Com RPA_SUPERVISOR=true o scheduler só despacha; cada estágio do
+    # perfil roda em um processo próprio, mantido aberto entre os ciclos
+    SUPERVISOR_MODE = os.getenv('RPA_SUPERVISOR', 'false').lower() in ('1', 'true', 'sim')
+    # Limites por worker, contando o Chrome e demais processos filhos;
+    # 0 desativa. CPU é a fração da máquina toda (0.5 = metade dos núcleos)
+    SUPERVISOR_MEMORIA_MAXIMA_MB = float(os.getenv('SUPERVISOR_MEMORIA_MAXIMA_MB', 2048))
+    SUPERVISOR_CPU_MAXIMA = float(os.getenv('SUPERVISOR_CPU_MAXIMA', 0.5))
+    # Fora do Windows: tempo acima do limite de CPU antes de reiniciar
+    SUPERVISOR_JANELA_CPU = float(os.getenv('SUPERVISOR_JANELA_CPU', 300))
+    SUPERVISOR_INTERVALO_MONITOR = float(os.getenv('SUPERVISOR_INTERVALO_MONITOR', 5))
+    # Espera (s) antes de subir de novo um worker que caiu, dobrando a cada
+    # falha seguida até o máximo
+    SUPERVISOR_BACKOFF_INICIAL = float(os.getenv('SUPERVISOR_BACKOFF_INICIAL', 5))
+    SUPERVISOR_BACKOFF_MAXIMO = float(os.getenv('SUPERVISOR_BACKOFF_MAXIMO', 300))
+    # Resposta máxima de um worker: o prazo do estágio no watchdog mais uma
+    # folga para fechar o recurso; sem prazo no watchdog, espera sempre
+    SUPERVISOR_PRAZOS = {
+        estagio: segundos + 300 if segundos else 0
+        for estagio, segundos in WatchdogConfig.WATCHDOG_STAGE_TIMEOUTS.items()
+    }
+
 
 class ScreenshotConfig:
     """Configuração para capturas de tela da automação."""
@@ -49,19 +274,67 @@ class OpenAIConfig:
     """Configurações para integração com a OpenAI."""
 
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    # Timeout (s) e retentativas de cada chamada ao modelo
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', 60))
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', 2))
 
-    if not OPENAI_API_KEY:
-        raise ValueError(
-            'A variável de ambiente OPENAI_API_KEY não está configurada! Verifique seu .env.'
-        )
+    # Diretório com as imagens digitalizadas das requisições
+    BASE_IMAGE_PATH = os.getenv('BASE_IMAGE_PATH')
+
+    @classmethod
+    def validar_openai(cls):
+        """Garante que a análise de imagens tem chave e diretório configurados."""
+        if not cls.OPENAI_API_KEY:
+            raise ValueError(
+                'A variável de ambiente OPENAI_API_KEY não está configurada! Verifique seu .env.'
+            )
+        if not cls.BASE_IMAGE_PATH:
+            raise ValueError(
+                'A variável de ambiente BASE_IMAGE_PATH não está configurada! Verifique seu .env.'
+            )
 
 
 class Config(
-    BaseConfig, ShiftConfig, APIConfig, ScreenshotConfig, OpenAIConfig
+    BaseConfig,
+    ShiftConfig,
+    APIConfig,
+    SchedulerConfig,
+    WatchdogConfig,
+    SupervisorConfig,
+    ScreenshotConfig,
+    OpenAIConfig,
 ):
     """
     Classe que combina todas as configurações em um único ponto de acesso.
-    Herda de BaseConfig, ShiftConfig, APIConfig e ScreenshotConfig e OpenAIConfig.
+    Herda de BaseConfig, ShiftConfig, APIConfig, SchedulerConfig,
+    WatchdogConfig, SupervisorConfig, ScreenshotConfig e OpenAIConfig.
     """
 
     ROBOT_ID = os.getenv('ROBOT_ID', 1)
+
+    @classmethod
+    def estagios_ativos(cls, perfil=None):
+        """Estágios do perfil (padrão: RPA_PROFILE), na ordem do fluxo."""
+        perfil = perfil or cls.RPA_PROFILE
+        estagios = set()
+        for nome in perfil.split(','):
+            nome = nome.strip().lower()
+            if nome not in cls.PERFIS:
+                raise ValueError(
+                    f"Perfil '{nome}' inválido em RPA_PROFILE; use {', '.join(cls.PERFIS)}."
+                )
+            estagios.update(cls.PERFIS[nome])
+        return [e for e in cls.PERFIS['all'] if e in estagios]
+
+    @classmethod
+    def validar(cls, estagios=None):
+        """
+        Valida só as configurações exigidas pelos estágios informados (padrão:
+        os do perfil ativo). Feito ao iniciar o orquestrador, e não no import,
+        para que um nó de um só estágio não precise das variáveis dos outros.
+        """
+        estagios = cls.estagios_ativos() if estagios is None else estagios
+        if 'SHIFT' in estagios:
+            cls.validar_shift()
+        if 'IMAGE_PROCESS' in estagios:
+            cls.validar_openai()
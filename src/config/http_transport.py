@@ -0,0 +1,116 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import Config
+
+
+def resolver_timeout(endpoint, timeouts, padrao):
+    """
+    Retorna a tupla (connect, read) do prefixo mais longo de `timeouts` que
+    casar com o endpoint, ou `padrao` se nenhum casar.
+    """
+    melhor = None
+    for prefixo in timeouts:
+        if endpoint.startswith(prefixo) and (
+            melhor is None or len(prefixo) > len(melhor)
+        ):
+            melhor = prefixo
+    return timeouts[melhor] if melhor else padrao
+
+
+class HTTPTransport:
+    """
+    Transporte HTTP baseado em `requests.Session`.
+
+    Mantém conexões keep-alive em um pool de tamanho configurável, aplica
+    timeouts (connect, read) por endpoint e faz retentativas limitadas com
+    backoff exponencial apenas para verbos idempotentes (GET/PATCH).
+    """
+
+    METODOS_COM_RETENTATIVA = frozenset({'GET', 'PATCH'})
+    STATUS_COM_RETENTATIVA = (429, 502, 503, 504)
+
+    def __init__(
+        self,
+        base_url=None,
+        pool_size=None,
+        max_retries=None,
+        backoff_factor=None,
+        timeouts=None,
+        timeout_padrao=None,
+    ):
+        self.base_url = base_url if base_url is not None else Config.API_URL
+        self.pool_size = pool_size or Config.API_POOL_SIZE
+        self.max_retries = (
+            max_retries if max_retries is not None else Config.API_MAX_RETRIES
+        )
+        self.backoff_factor = (
+            backoff_factor
+            if backoff_factor is not None
+            else Config.API_BACKOFF_FACTOR
+        )
+        self.timeouts = dict(
+            timeouts if timeouts is not None else Config.API_ENDPOINT_TIMEOUTS
+        )
+        self.timeout_padrao = timeout_padrao or (
+            Config.API_CONNECT_TIMEOUT,
+            Config.API_READ_TIMEOUT,
+        )
+        self.session = self._criar_sessao()
+
+    def _criar_sessao(self):
+        """Cria a sessão com o adapter de pool e a política de retentativas."""
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.STATUS_COM_RETENTATIVA,
+            allowed_methods=self.METODOS_COM_RETENTATIVA,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def timeout_para(self, endpoint):
+        """Retorna a tupla (connect, read) aplicável ao endpoint."""
+        return resolver_timeout(endpoint, self.timeouts, self.timeout_padrao)
+
+    def request(self, method, endpoint, **kwargs):
+        """Envia a requisição para `base_url + endpoint` usando a sessão."""
+        kwargs.setdefault('timeout', self.timeout_para(endpoint))
+        url = f'{self.base_url}{endpoint}'
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        """Fecha a sessão e libera as conexões do pool."""
+        self.session.close()
+
+
+_transporte_padrao = None
+_transporte_lock = threading.Lock()
+
+
+def obter_transporte_padrao():
+    """
+    Retorna o transporte compartilhado do processo, criando-o na primeira
+    chamada. Reaproveitar a mesma instância entre execuções do scheduler
+    mantém as conexões do pool abertas.
+    """
+    global _transporte_padrao
+    with _transporte_lock:
+        if _transporte_padrao is None:
+            _transporte_padrao = HTTPTransport()
+        return _transporte_padrao
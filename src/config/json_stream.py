@@ -0,0 +1,65 @@
+import codecs
+import json
+
+
+class JSONNaoEArray(ValueError):
+    """O documento JSON recebido não é um array; `valor` traz o conteúdo decodificado."""
+
+    def __init__(self, valor):
+        super().__init__('O documento JSON não é um array.')
+        self.valor = valor
+
+
+def iterar_array_json(pedacos, encoding='utf-8'):
+    """
+    Decodifica incrementalmente um array JSON de nível superior, gerando cada
+    elemento assim que ele chega por completo.
+
+    `pedacos` é um iterável de bytes (ex.: `response.iter_content()`). Só o
+    elemento em andamento fica em memória, não o documento inteiro. Se o
+    documento não for um array, lança `JSONNaoEArray` com o valor decodificado.
+    """
+    decoder = json.JSONDecoder()
+    decodificador = codecs.getincrementaldecoder(encoding)()
+    buffer = ''
+    dentro_do_array = None
+    fim = False
+
+    for pedaco in pedacos:
+        buffer += decodificador.decode(pedaco)
+
+        if dentro_do_array is None:
+            buffer = buffer.lstrip()
+            if not buffer:
+                continue
+            dentro_do_array = buffer[0] == '['
+            if dentro_do_array:
+                buffer = buffer[1:]
+        if not dentro_do_array:
+            continue
+
+        posicao = 0
+        while True:
+            while posicao < len(buffer) and buffer[posicao] in ' \t\r\n,':
+                posicao += 1
+            if posicao < len(buffer) and buffer[posicao] == ']':
+                fim = True
+                break
+            try:
+                elemento, final = decoder.raw_decode(buffer, posicao)
+            except json.JSONDecodeError:
+                break
+            # Um elemento que termina no fim do buffer pode estar truncado
+            # (ex.: número); só é aceito quando há algo depois dele.
+            if final >= len(buffer):
+                break
+            posicao = final
+            yield elemento
+        buffer = buffer[posicao:]
+        if fim:
+            return
+
+    buffer += decodificador.decode(b'', final=True)
+    if dentro_do_array:
+        raise ValueError('Array JSON incompleto: resposta encerrada antes do "]".')
+    raise JSONNaoEArray(json.loads(buffer) if buffer.strip() else None)
@@ -0,0 +1,134 @@
+import threading
+import time
+
+from .config import Config
+from .logger import logger
+
+
+class LeaseManager:
+    """
+    Leases de itens para que vários robôs dividam a mesma fila.
+
+    Antes de trabalhar em um item, o robô o reivindica (`items/claim/`) por
+    `ttl` segundos; enquanto houver leases, uma thread de fundo os renova
+    (`items/heartbeat/`) a cada `intervalo_heartbeat`. Se o robô morrer, os
+    leases expiram e outro robô pode reivindicar os itens. Um lease perdido
+    (expirado e tomado por outro robô) deixa de valer em `possui()`.
+
+    Se o backend não anuncia os endpoints de lease, todo item é considerado
+    concedido, como antes (um único robô).
+    """
+
+    def __init__(self, api_client, robot_id=None, ttl=None, intervalo_heartbeat=None):
+        self.api_client = api_client
+        self.robot_id = robot_id if robot_id is not None else Config.ROBOT_ID
+        self.ttl = ttl if ttl is not None else Config.LEASE_TTL
+        self.intervalo_heartbeat = intervalo_heartbeat or self.ttl / 3
+        # {item_id: {'lease_token', 'stage', 'expira'}}
+        self._leases = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def ativo(self):
+        return self.api_client.suporta_leases()
+
+    def reivindicar(self, stage, item_ids):
+        """Reivindica os itens para o estágio e retorna o conjunto concedido."""
+        item_ids = [i for i in item_ids if i is not None]
+        if not item_ids or not self.ativo:
+            return set(item_ids)
+
+        response = self.api_client.claim_items(
+            self.robot_id, stage, item_ids, self.ttl
+        )
+        if not response:
+            logger.warning(f'Falha ao reivindicar {len(item_ids)} item(ns) de {stage}.')
+            return set()
+
+        agora = time.monotonic()
+        concedidos = set()
+        with self._lock:
+            for lease in response.get('claimed', []):
+                self._leases[lease['id']] = {
+                    'lease_token': lease['lease_token'],
+                    'stage': stage,
+                    'expira': agora + float(lease.get('expires_in', self.ttl)),
+                }
+                concedidos.add(lease['id'])
+            self._iniciar_heartbeat()
+
+        rejeitados = response.get('rejected', [])
+        if rejeitados:
+            logger.info(
+                f'{len(rejeitados)} item(ns) de {stage} já reivindicado(s) por outro robô.'
+            )
+        return concedidos
+
+    def possui(self, item_id):
+        """Indica se o robô ainda tem um lease válido para o item."""
+        if not self.ativo:
+            return True
+        with self._lock:
+            lease = self._leases.get(item_id)
+            return lease is not None and lease['expira'] > time.monotonic()
+
+    def liberar(self, item_ids=None, stage=None):
+        """
+        Libera os leases dos itens informados, ou de todos os do estágio, ou
+        todos, nessa ordem de precedência.
+        """
+        with self._lock:
+            if item_ids is not None:
+                ids = [i for i in item_ids if i in self._leases]
+            else:
+                ids = [
+                    i
+                    for i, lease in self._leases.items()
+                    if stage is None or lease['stage'] == stage
+                ]
+            leases = [
+                {'id': i, 'lease_token': self._leases.pop(i)['lease_token']}
+                for i in ids
+            ]
+        if leases:
+            self.api_client.release_items(self.robot_id, leases)
+
+    def close(self):
+        """Libera todos os leases ainda mantidos."""
+        self.liberar()
+
+    def _iniciar_heartbeat(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, name='lease-heartbeat', daemon=True
+            )
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.intervalo_heartbeat)
+            with self._lock:
+                if not self._leases:
+                    # Sem leases a thread termina; `reivindicar` cria outra.
+                    self._thread = None
+                    return
+                leases = [
+                    {'id': i, 'lease_token': lease['lease_token']}
+                    for i, lease in self._leases.items()
+                ]
+            self.renovar(leases)
+
+    def renovar(self, leases):
+        response = self.api_client.heartbeat_leases(self.robot_id, leases, self.ttl)
+        if not response:
+            logger.warning(f'Falha ao renovar {len(leases)} lease(s).')
+            return
+        expira = time.monotonic() + self.ttl
+        with self._lock:
+            for item_id in response.get('renewed', []):
+                if item_id in self._leases:
+                    self._leases[item_id]['expira'] = expira
+            for item_id in response.get('lost', []):
+                if self._leases.pop(item_id, None) is not None:
+                    logger.warning(f'Lease do item {item_id} perdido para outro robô.')
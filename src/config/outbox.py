@@ -0,0 +1,224 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from .config import Config
+
+
+class Outbox:
+    """
+    Outbox local (SQLite) para escritas na API.
+
+    Cada escrita é gravada antes de ser enviada e só é removida depois que a
+    API confirma. Se o backend estiver fora, o registro fica pendente e é
+    reenviado depois, na ordem original, com a mesma chave de idempotência.
+
+    Depois de `max_tentativas` falhas, ou de um erro definitivo, o registro
+    sai da fila marcado como falha; as falhas com mais de
+    `retencao_falhas_dias` dias são apagadas (`purgar_falhas`).
+    """
+
+    PENDENTE = 'pendente'
+    FALHOU = 'falhou'
+    # Únicos status HTTP que tiram o registro da fila; os demais (401, 408,
+    # 409, 429, 5xx...) são transitórios e o registro é reenviado depois.
+    ERROS_DEFINITIVOS = (400, 404, 422)
+
+    # Intervalo (s) mínimo entre duas limpezas de falhas antigas
+    INTERVALO_PURGA = 3600
+
+    def __init__(
+        self,
+        caminho=None,
+        intervalo_reenvio=None,
+        max_tentativas=None,
+        retencao_falhas_dias=None,
+    ):
+        self.caminho = caminho or Config.OUTBOX_PATH
+        self.intervalo_reenvio = (
+            intervalo_reenvio
+            if intervalo_reenvio is not None
+            else Config.OUTBOX_RETRY_INTERVAL
+        )
+        self.max_tentativas = max_tentativas or Config.OUTBOX_MAX_TENTATIVAS
+        self.retencao_falhas_dias = (
+            retencao_falhas_dias
+            if retencao_falhas_dias is not None
+            else Config.OUTBOX_RETENCAO_FALHAS_DIAS
+        )
+        self._proxima_purga = 0.0
+        self._lock = threading.Lock()
+        # Serializa o replay entre threads (ex.: fila write-behind e loop principal)
+        self.lock_replay = threading.Lock()
+        self.proxima_tentativa = 0.0
+        # Registros sendo enviados fora do replay: {id: endpoint}
+        self._em_envio = {}
+        # Registros que falharam e só voltam a ser tentados depois de
+        # `intervalo_reenvio`: {id: instante (monotonic)}
+        self._adiados = {}
+        with self._conexao() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    method TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT NOT NULL DEFAULT 'pendente',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+        self.purgar_falhas()
+
+    @contextmanager
+    def _conexao(self):
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def adicionar(self, method, endpoint, payload, idempotency_key):
+        """Grava uma escrita pendente e retorna o id do registro."""
+        with self._lock, self._conexao() as conn:
+            cursor = conn.execute(
+                'INSERT INTO outbox (idempotency_key, method, endpoint, payload, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (
+                    idempotency_key,
+                    method,
+                    endpoint,
+                    json.dumps(payload, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            return cursor.lastrowid
+
+    def pendentes(self):
+        """Retorna os registros pendentes, do mais antigo para o mais novo."""
+        with self._lock, self._conexao() as conn:
+            conn.row_factory = sqlite3.Row
+            linhas = conn.execute(
+                'SELECT * FROM outbox WHERE status = ? ORDER BY id', (self.PENDENTE,)
+            ).fetchall()
+        return [
+            {**dict(linha), 'payload': json.loads(linha['payload'])}
+            for linha in linhas
+        ]
+
+    def contar(self):
+        """Quantidade de escritas pendentes."""
+        with self._lock, self._conexao() as conn:
+            return conn.execute(
+                'SELECT COUNT(*) FROM outbox WHERE status = ?', (self.PENDENTE,)
+            ).fetchone()[0]
+
+    def anterior_pendente(self, registro_id, endpoint):
+        """True se há escrita pendente mais antiga para o mesmo endpoint."""
+        with self._lock, self._conexao() as conn:
+            return conn.execute(
+                'SELECT 1 FROM outbox WHERE status = ? AND endpoint = ? AND id < ? LIMIT 1',
+                (self.PENDENTE, endpoint, registro_id),
+            ).fetchone() is not None
+
+    def reservar(self, registro_id, endpoint):
+        """Marca o registro como em envio; o replay o pula até `liberar`."""
+        with self._lock:
+            self._em_envio[registro_id] = endpoint
+
+    def liberar(self, registro_id):
+        with self._lock:
+            self._em_envio.pop(registro_id, None)
+
+    def reservado(self, registro):
+        """
+        True se o registro, ou outro do mesmo endpoint, está em envio: o
+        replay não o envia, para não reordenar escritas de um mesmo recurso.
+        """
+        with self._lock:
+            return (
+                registro['id'] in self._em_envio
+                or registro['endpoint'] in self._em_envio.values()
+            )
+
+    def adiado(self, registro):
+        """True se o registro falhou há menos de `intervalo_reenvio` segundos."""
+        with self._lock:
+            return time.monotonic() < self._adiados.get(registro['id'], 0)
+
+    def proximo_reenvio(self):
+        """Instante (monotonic) a partir do qual algum registro pode ser reenviado."""
+        with self._lock:
+            adiados = min(self._adiados.values(), default=0.0)
+        return max(self.proxima_tentativa, adiados)
+
+    def remover(self, registro_id):
+        """Remove um registro confirmado pela API."""
+        with self._lock, self._conexao() as conn:
+            self._adiados.pop(registro_id, None)
+            conn.execute('DELETE FROM outbox WHERE id = ?', (registro_id,))
+
+    def registrar_tentativa(self, registro_id, erro):
+        """
+        Registra uma falha transitória; o registro continua pendente.
+        Retorna o total de tentativas do registro.
+        """
+        with self._lock, self._conexao() as conn:
+            self._adiados[registro_id] = time.monotonic() + self.intervalo_reenvio
+            conn.execute(
+                'UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?',
+                (erro, registro_id),
+            )
+            linha = conn.execute(
+                'SELECT attempts FROM outbox WHERE id = ?', (registro_id,)
+            ).fetchone()
+        return linha[0] if linha else 0
+
+    def marcar_falha(self, registro_id, erro):
+        """
+        Tira o registro da fila após um erro definitivo (`ERROS_DEFINITIVOS`)
+        ou após `max_tentativas` tentativas.
+        """
+        with self._lock, self._conexao() as conn:
+            self._adiados.pop(registro_id, None)
+            conn.execute(
+                'UPDATE outbox SET status = ?, last_error = ? WHERE id = ?',
+                (self.FALHOU, erro, registro_id),
+            )
+
+    def purgar_falhas(self):
+        """
+        Apaga as falhas criadas há mais de `retencao_falhas_dias` dias, no
+        máximo uma vez a cada `INTERVALO_PURGA` segundos.
+        """
+        agora = time.monotonic()
+        if agora < self._proxima_purga:
+            return 0
+        self._proxima_purga = agora + self.INTERVALO_PURGA
+        limite = time.time() - self.retencao_falhas_dias * 86400
+        with self._lock, self._conexao() as conn:
+            return conn.execute(
+                'DELETE FROM outbox WHERE status = ? AND created_at < ?',
+                (self.FALHOU, limite),
+            ).rowcount
+
+
+_outbox_padrao = None
+_outbox_lock = threading.Lock()
+
+
+def obter_outbox_padrao():
+    """Retorna o outbox compartilhado do processo, criando-o na primeira chamada."""
+    global _outbox_padrao
+    with _outbox_lock:
+        if _outbox_padrao is None:
+            _outbox_padrao = Outbox()
+        return _outbox_padrao
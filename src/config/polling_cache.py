@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+
+from .logger import logger
+
+
+class PollingCache:
+    """
+    Visão local das consultas de trabalho pendente (`items/by-stage/`,
+    `items/sismama-data/`), usada para polling condicional.
+
+    Para cada consulta guarda `ETag`, `Last-Modified` e o cursor `since`
+    devolvidos pela API. Na próxima chamada esses valores são reenviados:
+    um 304 devolve a visão local sem baixar nem decodificar nada, e uma
+    resposta delta (`{'results': [...], 'removed': [...], 'cursor': ...}`)
+    é mesclada na visão, por `id`. Uma lista simples substitui a visão toda.
+    """
+
+    def __init__(self):
+        self._entradas = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(endpoint, params=None):
+        return (endpoint, tuple(sorted((params or {}).items())))
+
+    def cabecalhos(self, chave):
+        """Cabeçalhos condicionais para a próxima requisição da consulta."""
+        with self._lock:
+            entrada = self._entradas.get(chave, {})
+            cabecalhos = {}
+            if entrada.get('etag'):
+                cabecalhos['If-None-Match'] = entrada['etag']
+            if entrada.get('last_modified'):
+                cabecalhos['If-Modified-Since'] = entrada['last_modified']
+            return cabecalhos
+
+    def parametros(self, chave):
+        """Parâmetro `since` com o último cursor recebido, se houver."""
+        with self._lock:
+            cursor = self._entradas.get(chave, {}).get('cursor')
+            return {'since': cursor} if cursor is not None else {}
+
+    def visao(self, chave):
+        """Lista atual de registros da consulta."""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            return list(entrada['registros'].values()) if entrada else []
+
+    def atualizar(self, chave, corpo, headers):
+        """
+        Aplica uma resposta 200 à visão local e retorna a lista resultante.
+        Respostas em outro formato (ex.: `{'detail': ...}`) descartam o cache
+        da consulta e são devolvidas sem alteração.
+        """
+        with self._lock:
+            if isinstance(corpo, list):
+                registros = OrderedDict((r.get('id'), r) for r in corpo)
+            elif isinstance(corpo, dict) and 'results' in corpo:
+                entrada = self._entradas.get(chave)
+                registros = entrada['registros'] if entrada else OrderedDict()
+                for registro in corpo['results']:
+                    registros[registro.get('id')] = registro
+                for removido in corpo.get('removed', []):
+                    registros.pop(removido, None)
+                logger.info(
+                    f"Delta de {chave[0]}: {len(corpo['results'])} alterado(s), "
+                    f"{len(corpo.get('removed', []))} removido(s)."
+                )
+            else:
+                self._entradas.pop(chave, None)
+                return corpo
+
+            # Tarefas sem itens pendentes saem da fila.
+            for ident in [i for i, r in registros.items() if r.get('items') == []]:
+                registros.pop(ident)
+
+            cursor = headers.get('X-Next-Cursor')
+            if isinstance(corpo, dict):
+                cursor = corpo.get('cursor', cursor)
+            self._entradas[chave] = {
+                'registros': registros,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'cursor': cursor,
+            }
+            return list(registros.values())
+
+
+_polling_cache_padrao = None
+_polling_cache_lock = threading.Lock()
+
+
+def obter_polling_cache():
+    """Retorna o cache de polling compartilhado do processo."""
+    global _polling_cache_padrao
+    with _polling_cache_lock:
+        if _polling_cache_padrao is None:
+            _polling_cache_padrao = PollingCache()
+        return _polling_cache_padrao
@@ -0,0 +1,127 @@
+import base64
+import json
+import os
+import threading
+import time
+
+from .auth_service import AuthenticationService
+from .config import Config
+from .logger import logger
+
+
+class TokenManager:
+    """
+    Mantém os tokens JWT da API entre execuções.
+
+    Guarda access e refresh em memória e em um cache local, renova o access
+    via `login/token/refresh/` antes de expirar e só faz login completo com
+    usuário e senha quando o refresh não é mais possível. É thread-safe, para
+    que vários workers compartilhem o mesmo cliente.
+    """
+
+    def __init__(self, username=None, password=None, cache_path=None, margem=None):
+        self.username = username or os.getenv('API_USERNAME')
+        self.password = password or os.getenv('API_PASSWORD')
+        self.cache_path = cache_path or Config.TOKEN_CACHE_PATH
+        self.margem = margem if margem is not None else Config.TOKEN_REFRESH_MARGIN
+        self._lock = threading.RLock()
+        self._access = None
+        self._refresh = None
+        self._carregar_cache()
+
+    @staticmethod
+    def _expiracao(token):
+        """Lê o claim `exp` do JWT (sem validar a assinatura)."""
+        try:
+            payload = token.split('.')[1]
+            payload += '=' * (-len(payload) % 4)
+            return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+        except Exception:
+            return None
+
+    def _valido(self, token, margem):
+        if not token:
+            return False
+        exp = self._expiracao(token)
+        # Tokens sem `exp` são considerados válidos até a API responder 401.
+        return exp is None or exp - margem > time.time()
+
+    def obter_token(self):
+        """Retorna um access token válido, renovando ou autenticando se preciso."""
+        with self._lock:
+            if self._valido(self._access, self.margem):
+                return self._access
+            if self._valido(self._refresh, 0) and self._renovar():
+                return self._access
+            if self._autenticar():
+                return self._access
+            return None
+
+    def invalidar(self, token):
+        """Descarta o access token recusado pela API (ex.: após um 401)."""
+        with self._lock:
+            if token == self._access:
+                logger.info('Access token recusado pela API; será renovado.')
+                self._access = None
+
+    def _renovar(self):
+        logger.info('Renovando access token via refresh.')
+        response = AuthenticationService.refresh(self._refresh)
+        if not response or 'access' not in response:
+            logger.warning('Falha ao renovar o token; será feito novo login.')
+            self._refresh = None
+            return False
+        self._guardar(response['access'], response.get('refresh', self._refresh))
+        return True
+
+    def _autenticar(self):
+        response = AuthenticationService.authenticate(self.username, self.password)
+        if not response or 'access' not in response:
+            return False
+        self._guardar(response['access'], response.get('refresh'))
+        return True
+
+    def _guardar(self, access, refresh):
+        self._access = access
+        self._refresh = refresh
+        self._salvar_cache()
+
+    def _carregar_cache(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as arquivo:
+                cache = json.load(arquivo)
+        except (OSError, ValueError):
+            return
+        if cache.get('username') == self.username:
+            self._access = cache.get('access')
+            self._refresh = cache.get('refresh')
+
+    def _salvar_cache(self):
+        temporario = f'{self.cache_path}.tmp'
+        try:
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump(
+                    {
+                        'username': self.username,
+                        'access': self._access,
+                        'refresh': self._refresh,
+                    },
+                    arquivo,
+                )
+            os.chmod(temporario, 0o600)
+            os.replace(temporario, self.cache_path)
+        except OSError as e:
+            logger.warning(f'Não foi possível gravar o cache de tokens: {e}')
+
+
+_token_manager_padrao = None
+_token_manager_lock = threading.Lock()
+
+
+def obter_token_manager():
+    """Retorna o gerenciador de tokens compartilhado do processo."""
+    global _token_manager_padrao
+    with _token_manager_lock:
+        if _token_manager_padrao is None:
+            _token_manager_padrao = TokenManager()
+        return _token_manager_padrao
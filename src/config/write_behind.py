@@ -0,0 +1,158 @@
+import threading
+from collections import OrderedDict
+
+from .config import Config
+from .logger import logger
+
+
+class WriteBehindQueue:
+    """
+    Fila write-behind para as escritas de status do SHIFT.
+
+    Envolve um `APIClient`: `update_item`, `update_task` e `upsert_shift_data`
+    apenas enfileiram a escrita e retornam imediatamente, e uma thread de fundo
+    envia tudo a cada `intervalo_flush` segundos. Escritas consecutivas para o
+    mesmo item ou tarefa são mescladas em uma única requisição (por exemplo,
+    STARTED seguido de COMPLETED vira um só PATCH). Os demais métodos são
+    repassados ao cliente original.
+
+    `persistir_item()` grava as escritas de um item direto no outbox do
+    cliente, sem rede, para que o checkpoint possa avançar sem esperar a API.
+
+    Chame `close()` ao final para enviar o que ainda estiver pendente.
+    """
+
+    def __init__(self, api_client, intervalo_flush=None):
+        self.api_client = api_client
+        self.intervalo_flush = intervalo_flush or Config.WRITE_BEHIND_INTERVAL
+        self._pendentes = OrderedDict()
+        self._lock = threading.Lock()
+        self._lock_flush = threading.Lock()
+        # Chaves retiradas pelo flush cujo envio (e gravação no outbox) ainda
+        # não terminou
+        self._em_envio = set()
+        self._enviado = threading.Condition(self._lock)
+        self._parar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop, name='write-behind', daemon=True
+        )
+        self._thread.start()
+
+    def __getattr__(self, nome):
+        return getattr(self.api_client, nome)
+
+    def update_item(self, item_id, **kwargs):
+        """Enfileira a atualização do item, mesclando com a pendente."""
+        return self._enfileirar('item', item_id, kwargs)
+
+    def update_task(self, task_id, **kwargs):
+        """Enfileira a atualização da tarefa, mesclando com a pendente."""
+        return self._enfileirar('task', task_id, kwargs)
+
+    def upsert_shift_data(self, item_id, shift_data):
+        """Enfileira o upsert de ShiftData; um novo payload substitui o anterior."""
+        return self._enfileirar('shift_data', item_id, shift_data, mesclar=False)
+
+    def _enfileirar(self, tipo, ident, dados, mesclar=True):
+        dados = {k: v for k, v in dados.items() if v is not None}
+        chave = (tipo, ident)
+        with self._lock:
+            if mesclar and chave in self._pendentes:
+                self._pendentes[chave].update(dados)
+            else:
+                self._pendentes[chave] = dados
+            # A escrita mais recente vai para o fim, preservando a ordem
+            # relativa (ex.: ShiftData antes do COMPLETED do item).
+            self._pendentes.move_to_end(chave)
+        return {'id': ident, 'enfileirado': True}
+
+    def _loop(self):
+        while not self._parar.wait(self.intervalo_flush):
+            self.flush()
+
+    def flush(self):
+        """
+        Envia todas as escritas pendentes, na ordem em que ficaram na fila.
+        Havendo mais de um item, os PATCH de itens saem por último, juntos,
+        via `update_items_bulk`.
+        """
+        with self._lock_flush:
+            with self._lock:
+                lote, self._pendentes = self._pendentes, OrderedDict()
+                self._em_envio.update(lote)
+            if lote:
+                logger.info(f'Write-behind: enviando {len(lote)} escrita(s).')
+
+            itens = [
+                {'item_id': ident, **dados}
+                for (tipo, ident), dados in lote.items()
+                if tipo == 'item'
+            ]
+            em_lote = len(itens) > 1
+            for (tipo, ident), dados in lote.items():
+                if em_lote and tipo == 'item':
+                    continue
+                try:
+                    self._enviar(tipo, ident, dados)
+                except Exception as e:
+                    logger.error(f'Write-behind: erro ao enviar {tipo} {ident}: {e}')
+                finally:
+                    self._terminar_envio([(tipo, ident)])
+
+            if em_lote:
+                try:
+                    resultados = self.api_client.update_items_bulk(itens)
+                except Exception as e:
+                    logger.error(f'Write-behind: erro ao enviar itens em lote: {e}')
+                    return
+                finally:
+                    self._terminar_envio(list(lote))
+                for resultado in resultados:
+                    if not resultado['ok']:
+                        logger.error(
+                            f"Write-behind: falha ao enviar item {resultado['item_id']}."
+                        )
+
+    def _terminar_envio(self, chaves):
+        with self._lock:
+            self._em_envio.difference_update(chaves)
+            self._enviado.notify_all()
+
+    def persistir_item(self, item_id):
+        """
+        Grava no outbox as escritas pendentes do item (ShiftData e status),
+        na ordem da fila, sem enviá-las: o replay do cliente as envia em
+        segundo plano, antes de qualquer escrita posterior ao mesmo recurso.
+        Só espera se um flush já retirou escritas do item e ainda não as
+        gravou no outbox.
+        """
+        def do_item(chave):
+            return chave[0] in ('shift_data', 'item') and chave[1] == item_id
+
+        with self._lock:
+            self._enviado.wait_for(lambda: not any(map(do_item, self._em_envio)))
+            for chave in [chave for chave in self._pendentes if do_item(chave)]:
+                self.api_client.gravar_escrita(*chave, self._pendentes.pop(chave))
+
+    def _enviar(self, tipo, ident, dados):
+        if tipo == 'item':
+            response = self.api_client.update_item(ident, **dados)
+        elif tipo == 'task':
+            response = self.api_client.update_task(ident, **dados)
+        else:
+            response = self.api_client.upsert_shift_data(ident, dados)
+
+        if not response:
+            logger.error(f'Write-behind: falha ao enviar {tipo} {ident}.')
+
+    def close(self):
+        """Interrompe a thread de fundo e envia o que ainda estiver pendente."""
+        self._parar.set()
+        self._thread.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
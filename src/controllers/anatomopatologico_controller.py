@@ -2,16 +2,90 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from src.browser.utils.fallback_utils import tentar_captura_com_fallback
 
 from src.browser.utils.element_utils import (
-    capturar_innerText_por_xpath,
-    capturar_localizacao_lesao,
-    capturar_texto_visivel_com_regex,
-    verificar_opcoes_radiobutton,
+    XPATH_LOCALIZACAO_LESAO,
+    XPATH_TEXTO_LAUDO,
+    lado_mama,
+    opcao_radiobutton,
 )
+from src.browser.utils.extracao_js import Extracao
 from src.config.logger import logger
 
+XPATH_DATAS_EXAME = "//span[@class='estiloSpan estiloColuna']/div[contains(text(), ' - ')]"
+
+# Os fallbacks varrem os <span> da tela quando o layout do laudo muda.
+EXTRACAO_EXAME = Extracao(
+    {
+        'data_coleta': {
+            'xpath': f"({XPATH_DATAS_EXAME})[1]",
+            'atributo': 'innerText',
+            'fallback': """
+                return Array.from(document.querySelectorAll('span'))
+                    .map(el => el.textContent.trim())
+                    .find(text =>
+                        text.toLowerCase().includes('coleta') && /\\d{2}\\/\\d{2}\\/\\d{4}/.test(text)
+                    ) || "";
+            """,
+            'padrao': "Campo 'data_coleta' nao especificada (NI)",
+        },
+        'data_liberacao': {
+            'xpath': f"({XPATH_DATAS_EXAME})[2]",
+            'atributo': 'innerText',
+            'fallback': """
+                return Array.from(document.querySelectorAll('span'))
+                    .map(el => el.textContent.trim())
+                    .find(text =>
+                        text.toLowerCase().includes('liberação') && /\\d{2}\\/\\d{2}\\/\\d{4}/.test(text)
+                    ) || "";
+            """,
+            'padrao': "Campo 'data_liberacao' nao especificada (NI)",
+        },
+        'tamanho_lesao': {
+            'xpath': "//span[contains(text(), 'Dimensão') and contains(text(), 'fragmento')]",
+            'atributo': 'innerText',
+            'regex': r'(\d+,\d+\s?cm)',
+            'fallback': """
+                const spanTextos = Array.from(document.querySelectorAll('span'))
+                    .map(el => el.textContent.trim());
+
+                for (const texto of spanTextos) {
+                    const match = texto.match(/(\\d+,\\d+\\s?cm)/);
+                    if (match) return match[1];
+                }
+                return "";
+            """,
+            'padrao': "Campo 'tamanho_lesao' nao especificada (NI)",
+        },
+        'caracteristica_lesao': {
+            'xpath': XPATH_LOCALIZACAO_LESAO,
+            'atributo': 'innerText',
+            'converter': lado_mama,
+            'fallback': """
+                return Array.from(document.querySelectorAll('span'))
+                    .map(el => el.textContent.trim())
+                    .find(text =>
+                        text.toLowerCase().includes('caracter') || text.toLowerCase().includes('lesão')
+                    ) || "";
+            """,
+            'padrao': "Campo 'caracteristica_lesao' nao especificada (NI)",
+        },
+        'localizacao_lesao': {
+            'xpath': XPATH_TEXTO_LAUDO,
+            'atributo': 'innerText',
+            'converter': opcao_radiobutton,
+            'fallback': """
+                const text = document.body.innerText.toLowerCase();
+                if (text.includes('mama esquerda')) return 'Mama esquerda';
+                if (text.includes('mama direita')) return 'Mama direita';
+                return 'Localizacao nao especificada (NI)';
+            """,
+            'padrao': "Campo 'localizacao_lesao' nao especificada (NI)",
+        },
+    },
+    pronto=f"({XPATH_DATAS_EXAME})[1]",
+)
+
 
 def extrair_dados_anatomopatologico(driver):
     """Extrai informações do exame anatomopatológico no SHIFT."""
@@ -39,135 +113,7 @@ def extrair_dados_anatomopatologico(driver):
         actions = ActionChains(driver)
         actions.double_click(elemento_procedimento).perform()
 
-        try:
-            data_coleta = tentar_captura_com_fallback(
-                funcao_primaria=lambda: capturar_innerText_por_xpath(
-                    driver,
-                    "(//span[@class='estiloSpan estiloColuna']/div[contains(text(), ' - ')])[1]",
-                ),
-                fallback_js="""
-                    return Array.from(document.querySelectorAll('span'))
-                        .map(el => el.textContent.trim())
-                        .find(text => 
-                            text.toLowerCase().includes('coleta') && /\\d{2}\\/\\d{2}\\/\\d{4}/.test(text)
-                        ) || "";
-                """,
-                driver=driver,
-                campo='data_coleta',
-            )
-
-        except:
-            data_coleta = ''
-            logger.warning("Campo 'data_coleta' ausente.")
-
-        try:
-            data_liberacao = tentar_captura_com_fallback(
-                funcao_primaria=lambda: capturar_innerText_por_xpath(
-                    driver,
-                    "(//span[@class='estiloSpan estiloColuna']/div[contains(text(), ' - ')])[2]",
-                ),
-                fallback_js="""
-                    return Array.from(document.querySelectorAll('span'))
-                        .map(el => el.textContent.trim())
-                        .find(text => 
-                            text.toLowerCase().includes('liberação') && /\\d{2}\\/\\d{2}\\/\\d{4}/.test(text)
-                        ) || "";
-                """,
-                driver=driver,
-                campo='data_liberacao',
-            )
-
-        except:
-            data_liberacao = ''
-            logger.warning("Campo 'data_liberacao' ausente.")
-
-        try:
-            tamanho_lesao = tentar_captura_com_fallback(
-                funcao_primaria=lambda: capturar_texto_visivel_com_regex(
-                    driver,
-                    "//span[contains(text(), 'Dimensão') and contains(text(), 'fragmento')]",
-                    r'(\d+,\d+\s?cm)',
-                ),
-                fallback_js="""
-                    const spanTextos = Array.from(document.querySelectorAll('span'))
-                        .map(el => el.textContent.trim());
-                    
-                    for (const texto of spanTextos) {
-                        const match = texto.match(/(\\d+,\\d+\\s?cm)/);
-                        if (match) return match[1];
-                    }
-                    return "";
-                """,
-                driver=driver,
-                campo='tamanho_lesao',
-            )
-            
-        except:
-            tamanho_lesao = ''
-            logger.warning("Campo 'tamanho_lesao' ausente.")
-
-        try:
-            caracteristica_lesao = tentar_captura_com_fallback(
-                funcao_primaria=lambda: capturar_localizacao_lesao(driver),
-                fallback_js="""
-                    return Array.from(document.querySelectorAll('span'))
-                        .map(el => el.textContent.trim())
-                        .find(text => 
-                            text.toLowerCase().includes('caracter') || text.toLowerCase().includes('lesão')
-                        ) || "";
-                """,
-                driver=driver,
-                campo='caracteristica_lesao',
-            )
-
-        except:
-            caracteristica_lesao = ''
-            logger.warning("Campo 'caracteristica_lesao' ausente.")
-
-        try:
-            localizacao_lesao = tentar_captura_com_fallback(
-                funcao_primaria=lambda: verificar_opcoes_radiobutton(driver),
-                fallback_js="""
-                    const text = document.body.innerText.toLowerCase();
-                    if (text.includes('mama esquerda')) return 'Mama esquerda';
-                    if (text.includes('mama direita')) return 'Mama direita';
-                    return 'Localizacao nao especificada (NI)';
-                """,
-                driver=driver,
-                campo='localizacao_lesao',
-            )
-
-        except:
-            localizacao_lesao = ''
-            logger.warning("Campo 'localizacao_lesao' ausente.")
-
-        dados = {
-            'data_coleta': (
-                data_coleta
-                if data_coleta
-                else "Campo 'data_coleta' nao especificada (NI)"
-            ),
-            'data_liberacao': (
-                data_liberacao
-                if data_liberacao
-                else "Campo 'data_liberacao' nao especificada (NI)"
-            ),
-            'tamanho_lesao': (
-                tamanho_lesao
-                if tamanho_lesao
-                else "Campo 'tamanho_lesao' nao especificada (NI)"
-            ),
-            'caracteristica_lesao': (
-                caracteristica_lesao
-                if caracteristica_lesao
-                else "Campo 'caracteristica_lesao' nao especificada (NI)"
-            ),
-            'localizacao_lesao': (
-                localizacao_lesao
-                if localizacao_lesao
-                else "Campo 'localizacao_lesao' nao especificada (NI)"
-            ),
-        }
+        dados = EXTRACAO_EXAME.extrair(driver)
 
         logger.info(f'Dados do exame anatomopatológico extraídos: {dados}')
         return dados
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Dict, Any, Optional
 from src.config.api_client import APIClient
+from src.config.config import Config
 
 from src.config.logger import logger
 from src.utils.data_utils import formatar_data_iso
@@ -219,6 +220,33 @@ def atualizar_item_erro_shift(api_client, item_id, mensagem_erro):
         logger.error(f"Falha ao atualizar item {item_id} para 'ERROR'.")
 
 
+def reportar_timeout_item(api_client, stage, item_id, prazo):
+    """
+    Marca o item como 'ERROR' pelo estouro do prazo do watchdog e envia um
+    alerta do tipo 'Timeout'.
+
+    Args:
+        api_client: Cliente da API para enviar a requisição.
+        stage (str): Estágio em que o item estourou o prazo.
+        item_id (int): ID do item abandonado.
+        prazo (float): Prazo excedido, em segundos.
+    """
+    mensagem = f"Tempo limite de {prazo:.0f}s excedido no estágio {stage}."
+    logger.warning(f"Item {item_id}: {mensagem}")
+    api_client.update_item(
+        item_id,
+        status="ERROR",
+        stage=stage,
+        ended_at=datetime.now().isoformat(),
+        bot_error_message=mensagem,
+    )
+    api_client.send_alert(
+        robot_id=Config.ROBOT_ID,
+        alert_type="Timeout",
+        message=f"Item {item_id} abandonado: {mensagem}",
+    )
+
+
 def tratar_erro_admin_sismama(api_client: APIClient) -> None:
     """
     Marca como erro todos os itens autorizados para SISMAMA,
@@ -230,7 +258,22 @@ def tratar_erro_admin_sismama(api_client: APIClient) -> None:
         logger.info("Nenhum item pendente para SISMAMA.")
         return
 
-    for registro in pendentes:
-        item_id = registro.get('id')
-        mensagem = "Erro ao abrir SisMama: privilégios de administrador ausentes"
-        atualizar_item_erro_sismama(api_client, item_id, mensagem)
+    mensagem = "Erro ao abrir SisMama: privilégios de administrador ausentes"
+    ended_at = datetime.now().isoformat()
+    atualizacoes = [
+        {
+            "item_id": registro.get('id'),
+            "status": "ERROR",
+            "stage": "SISMAMA",
+            "ended_at": ended_at,
+            "bot_error_message": mensagem,
+        }
+        for registro in pendentes
+    ]
+
+    logger.info(f"Marcando {len(atualizacoes)} item(ns) como 'ERROR' no SISMAMA.")
+    for resultado in api_client.update_items_bulk(atualizacoes):
+        if not resultado["ok"]:
+            logger.error(
+                f"Falha ao atualizar item {resultado['item_id']} para 'ERROR'."
+            )
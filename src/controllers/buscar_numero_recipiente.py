@@ -5,6 +5,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from src.config.logger import logger
 
+XPATH_ABA_RECIPIENTES = "//td[contains(@id, 'btn_4_') and contains(.,'Recipientes')]"
+
 
 def buscar_prefixo_numero_recipiente(driver):
     """
@@ -15,12 +17,7 @@ def buscar_prefixo_numero_recipiente(driver):
         logger.info("Buscando e clicando na aba 'Recipientes'...")
 
         aba_recipientes = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable(
-                (
-                    By.XPATH,
-                    "//td[contains(@id, 'btn_4_') and contains(.,'Recipientes')]",
-                )
-            )
+            EC.element_to_be_clickable((By.XPATH, XPATH_ABA_RECIPIENTES))
         )
         aba_recipientes.click()
         logger.success("Aba 'Recipientes' clicada com sucesso.")
@@ -1,8 +1,31 @@
 from selenium.webdriver.common.by import By
 
-from src.browser.utils.element_utils import capturar_valor_input_por_xpath
+from src.browser.utils.extracao_js import NAO_ESPECIFICADO, Extracao
 from src.config.logger import logger
 
+EXTRACAO_ENDERECO = Extracao({
+    'codigo_postal': {
+        'xpath': "//div[@id='compositeEndereco.txtCodigoPostalEstrangeiro']//input",
+        'padrao': NAO_ESPECIFICADO,
+    },
+    'logradouro': {
+        'xpath': "//div[@id='compositeEndereco.txtLogradouroEstrangeiro']//input",
+        'padrao': NAO_ESPECIFICADO,
+    },
+    'numero_residencial': {
+        'xpath': "//div[@id='compositeEndereco.txtNumeroEstrangeiro']//input",
+        'padrao': NAO_ESPECIFICADO,
+    },
+    'cidade': {
+        'xpath': "//div[@id='compositeEndereco.txtCidadeEstrageiro']//input",
+        'padrao': NAO_ESPECIFICADO,
+    },
+    'estado': {
+        'xpath': "//div[@id='compositeEndereco.txtEstadoEstrangeiro']//input",
+        'padrao': NAO_ESPECIFICADO,
+    },
+})
+
 
 def extrair_dados_endereco(driver):
     """Extrai os dados de endereço do paciente."""
@@ -11,28 +34,7 @@ def extrair_dados_endereco(driver):
             By.XPATH, "//td[contains(text(), 'Endereço')]"
         ).click()
 
-        dados = {
-            'codigo_postal': capturar_valor_input_por_xpath(
-                driver,
-                "//div[@id='compositeEndereco.txtCodigoPostalEstrangeiro']//input",
-            ),
-            'logradouro': capturar_valor_input_por_xpath(
-                driver,
-                "//div[@id='compositeEndereco.txtLogradouroEstrangeiro']//input",
-            ),
-            'numero_residencial': capturar_valor_input_por_xpath(
-                driver,
-                "//div[@id='compositeEndereco.txtNumeroEstrangeiro']//input",
-            ),
-            'cidade': capturar_valor_input_por_xpath(
-                driver,
-                "//div[@id='compositeEndereco.txtCidadeEstrageiro']//input",
-            ),
-            'estado': capturar_valor_input_por_xpath(
-                driver,
-                "//div[@id='compositeEndereco.txtEstadoEstrangeiro']//input",
-            ),
-        }
+        dados = EXTRACAO_ENDERECO.extrair(driver)
 
         logger.info(f'Endereço extraído: {dados}')
         return dados
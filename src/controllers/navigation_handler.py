@@ -1,6 +1,6 @@
 import time
 
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoAlertPresentException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
@@ -9,6 +9,12 @@ from selenium.webdriver.support.ui import WebDriverWait
 from src.browser.utils.frame_manager import (mudar_para_iframe,
                                              voltar_para_frame_padrao)
 from src.config.logger import logger
+from src.controllers.buscar_numero_recipiente import XPATH_ABA_RECIPIENTES
+
+XPATH_FRAME_OS = "//iframe[@id='frmContentZen']"
+XPATH_TELA_MANUTENCAO = (
+    "//div[@class='ng-star-inserted' and contains(.,'Manutenção de indivíduo')]"
+)
 
 
 def fechar_janela_exame(driver):
@@ -61,12 +67,7 @@ def esperar_tela_manutencao(driver):
         voltar_para_frame_padrao(driver)
 
         WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located(
-                (
-                    By.XPATH,
-                    "//div[@class='ng-star-inserted' and contains(.,'Manutenção de indivíduo')]",
-                )
-            )
+            EC.presence_of_element_located((By.XPATH, XPATH_TELA_MANUTENCAO))
         )
         logger.info("Tela 'Manutenção de indivíduo' carregada com sucesso.")
 
@@ -107,13 +108,48 @@ def fechar_janela_manutencao(driver):
         logger.warning(f'Erro ao fechar a janela de manutenção: {str(e)}')
 
 
+def tela_manutencao_aberta(driver):
+    """
+    Verifica, sem esperar, se a tela 'Manutenção de indivíduo' já abriu.
+    Deixa o foco no frame principal.
+    """
+    driver.switch_to.default_content()
+    return bool(driver.find_elements(By.XPATH, XPATH_TELA_MANUTENCAO))
+
+
+def busca_os_respondida(driver):
+    """
+    Verifica, sem esperar, se o SHIFT já respondeu à busca digitada por
+    `digitar_os`: um alerta (O.S. não encontrada) ou a aba 'Recipientes'.
+    Deixa o foco no frame da O.S., onde a extração continua.
+    """
+    try:
+        driver.switch_to.alert
+        return True
+    except NoAlertPresentException:
+        pass
+    driver.switch_to.default_content()
+    frames = driver.find_elements(By.XPATH, XPATH_FRAME_OS)
+    if not frames:
+        return False
+    driver.switch_to.frame(frames[0])
+    return bool(driver.find_elements(By.XPATH, XPATH_ABA_RECIPIENTES))
+
+
 def buscar_os_no_sistema(driver, api_client, task_id, item_id, os_numero):
     """Realiza a busca da O.S no sistema."""
+    if not digitar_os(driver, os_numero):
+        return False
+    return tratar_alerta_busca(driver, api_client, task_id, item_id, os_numero)
+
+
+def digitar_os(driver, os_numero):
+    """Digita a O.S no campo de busca e envia, sem esperar a resposta."""
     try:
         logger.info(f'Buscando OS {os_numero} no sistema SHIFT.')
 
         # Muda para o iframe correto ANTES de tentar buscar a OS
-        if not mudar_para_iframe(driver, "//iframe[@id='frmContentZen']"):
+        if not mudar_para_iframe(driver, XPATH_FRAME_OS):
             logger.error('Não foi possível acessar o frame da O.S.')
             return False
 
@@ -138,9 +174,25 @@ def buscar_os_no_sistema(driver, api_client, task_id, item_id, os_numero):
 
         # 🔹 Insere a O.S no campo
         campo_busca.send_keys(os_numero, Keys.ENTER)
+        return True
+
+    except TimeoutException:
+        logger.error(f'Campo de busca não carregou para OS {os_numero}.')
+        return False
 
+    except Exception as e:
+        logger.error(f'Erro ao buscar OS {os_numero}: {str(e)}')
+        return False
+
+
+def tratar_alerta_busca(driver, api_client, task_id, item_id, os_numero, espera=5):
+    """
+    Aguarda até `espera` segundos pelo alerta de O.S. não encontrada; se
+    ele aparecer, fecha-o, marca tarefa e item com erro e retorna False.
+    """
+    try:
         try:
-            WebDriverWait(driver, 5).until(EC.alert_is_present())
+            WebDriverWait(driver, espera).until(EC.alert_is_present())
             alerta = driver.switch_to.alert
             mensagem_alerta = alerta.text.strip()
 
@@ -172,10 +224,6 @@ def buscar_os_no_sistema(driver, api_client, task_id, item_id, os_numero):
         logger.success(f'O.S {os_numero} buscada com sucesso.')
         return True
 
-    except TimeoutException:
-        logger.error(f'Campo de busca não carregou para OS {os_numero}.')
-        return False
-
     except Exception as e:
         logger.error(f'Erro ao buscar OS {os_numero}: {str(e)}')
         return False
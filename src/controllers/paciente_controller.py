@@ -1,53 +1,63 @@
-import re
-
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
-from src.browser.utils.element_utils import (capturar_texto_por_xpath,
-                                             capturar_valor_input_por_xpath)
+from src.browser.utils.extracao_js import NAO_ESPECIFICADO, Extracao
 from src.browser.utils.frame_manager import (mudar_para_iframe,
                                              voltar_para_frame_padrao)
 from src.config.logger import logger
 
+EXTRACAO_IDADE = Extracao(
+    {
+        'idade_paciente': {
+            'xpath': "//div[@id='lblDataNascimento']//span",
+            'atributo': 'innerText',
+            'regex': r'\((\d+)\s+anos',
+            'converter': int,
+            'padrao': None,
+        },
+    },
+    pronto="//div[@id='lblDataNascimento']//span",
+)
+
+EXTRACAO_DADOS_CADASTRAIS = Extracao(
+    {
+        'raca_etinia': {
+            'xpath': "//span[contains(text(), 'Raça/Cor do paciente')]/ancestor::td/following-sibling::td//input[@type='text']",
+            'padrao': NAO_ESPECIFICADO,
+        },
+    },
+    pronto="//span[normalize-space()='Dados cadastrais']",
+)
+
+EXTRACAO_MANUTENCAO = Extracao({
+    'data_nascimento': {
+        'xpath': "//input[@name='$V_DataNascimento']",
+        'padrao': NAO_ESPECIFICADO,
+    },
+    'Sexo': {
+        'xpath': "(//div[@id='formularioCadastro.Sexo']//input)[2]",
+        'padrao': NAO_ESPECIFICADO,
+    },
+    'CNS': {
+        'xpath': "//div[@id='formularioCadastro.CNS']//input",
+        'padrao': NAO_ESPECIFICADO,
+    },
+})
+
 
 def extrair_dados_paciente(driver):
     """Extrai informações do paciente na tela do SHIFT."""
     try:
-        idade_texto = capturar_texto_por_xpath(
-            driver, "//div[@id='lblDataNascimento']//span"
-        )
-        match_idade = re.search(r'\((\d+)\s+anos', idade_texto)
-        idade_paciente = int(match_idade.group(1)) if match_idade else None
+        dados = EXTRACAO_IDADE.extrair(driver)
 
-        # Clica em 'Fontes pagadoras' e aguarda a exibição da seção "Dados cadastrais"
+        # Clica em 'Fontes pagadoras' e lê a raça/etnia em "Dados cadastrais"
         fonte_pagadoras = driver.find_element(
             By.XPATH, "//span[contains(text(),'Fontes pagadoras')]"
         )
         fonte_pagadoras.click()
-        WebDriverWait(driver, 5).until(
-            EC.visibility_of_element_located(
-                (By.XPATH, "//span[normalize-space()='Dados cadastrais']")
-            )
-        )
-        logger.info("Tela 'Dados cadastrais' carregada com sucesso.")
-
-        # Extrai a raça/etnia
-        raca_etinia = capturar_valor_input_por_xpath(
-            driver,
-            "//span[contains(text(), 'Raça/Cor do paciente')]/ancestor::td/following-sibling::td//input[@type='text']",
-        )
-
-        raca_etinia = capturar_valor_input_por_xpath(
-            driver,
-            "//span[contains(text(), 'Raça/Cor do paciente')]/ancestor::td/following-sibling::td//input[@type='text']",
-        )
-
-        dados = {
-            'idade_paciente': idade_paciente,
-            'raca_etinia': raca_etinia,
-        }
+        dados.update(EXTRACAO_DADOS_CADASTRAIS.extrair(driver, tempo_espera=5))
 
         logger.info(f'Dados do paciente extraídos: {dados}')
         return dados
@@ -91,19 +101,7 @@ def extrair_informacoes_paciente(driver) -> dict:
         return False
 
     # 3. Extrai valores do formulário
-    informacoes_paciente = {
-        'data_nascimento': capturar_valor_input_por_xpath(
-            driver, "//input[@name='$V_DataNascimento']"
-        ),
-        'Sexo': capturar_valor_input_por_xpath(
-            driver, "(//div[@id='formularioCadastro.Sexo']//input)[2]"
-        ),
-        'CNS': capturar_valor_input_por_xpath(
-            driver, "//div[@id='formularioCadastro.CNS']//input"
-        ),
-    }
-
-    return informacoes_paciente
+    return EXTRACAO_MANUTENCAO.extrair(driver)
 
 
 def obter_nome_paciente(driver):
@@ -0,0 +1,336 @@
+import collections
+import queue
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from src.browser.utils.browser_manager import bloquear_recursos
+from src.config.checkpoint_journal import CheckpointJournal
+from src.config.config import Config
+from src.config.logger import logger
+from src.controllers.api_handler import reportar_timeout_item
+from src.controllers.navigation_handler import (
+    busca_os_respondida,
+    digitar_os,
+    tela_manutencao_aberta,
+    tratar_alerta_busca,
+)
+from src.controllers.shift_pool import FilaDeOrdens, relatar_memoria
+
+
+class _Aba:
+    def __init__(self, handle):
+        self.handle = handle
+        # (ordem, ao_concluir, terminou) em andamento nesta aba
+        self.trabalho = None
+        self.tentativa = 1
+        self.etapa = None
+        self.inicio = None
+        self.parcial = None
+
+
+class ShiftAbas(FilaDeOrdens):
+    """
+    Várias O.S. ao mesmo tempo em um único Chrome logado, uma por aba.
+
+    EXPERIMENTAL (SHIFT_ABAS > 1): a memória por O.S. em relação ao
+    `ShiftPool` ainda não foi medida no Chrome real; antes de usar em
+    produção, rode `benchmarks/bench_memoria_abas.py` na máquina do robô.
+
+    Alternativa ao `ShiftPool` para máquinas com pouca memória: as abas
+    dividem o mesmo processo do chromedriver, o mesmo Chrome e os cookies
+    da sessão, então só o primeiro login é feito. O WebDriver atende um
+    comando por vez, então uma única thread intercala as abas: cada O.S.
+    avança até o ponto em que depende do servidor do SHIFT (a busca da O.S.
+    e a abertura da 'Manutenção de indivíduo') e, enquanto ela espera, as
+    outras abas avançam. A cada volta, só as abas cuja tela já respondeu são
+    retomadas; sem nenhuma pronta, o laço dorme `intervalo` segundos.
+
+    Uma O.S. que passa do prazo do item (WATCHDOG_ITEM_TIMEOUTS) é
+    reportada e a aba é recarregada. Se um comando travar, o watchdog
+    derruba o Chrome; a O.S. culpada é reportada, as demais voltam para a
+    fila (uma vez) e as abas são reabertas com um navegador novo.
+    """
+
+    def __init__(self, controller, abas=None, intervalo=None, max_pendentes=None):
+        self.controller = controller
+        self.api_client = controller.api_client
+        self.journal = controller.journal
+        self.watchdog = controller.watchdog
+        self.n_abas = max(1, abas or Config.SHIFT_ABAS)
+        self.intervalo = intervalo if intervalo is not None else Config.SHIFT_ABAS_INTERVALO
+        self.prazo_item = Config.WATCHDOG_ITEM_TIMEOUTS.get('SHIFT')
+        self._iniciar_fila(max_pendentes or 2 * self.n_abas)
+        self._abas = []
+        # O.S. recebidas e ainda sem aba, com o número de tentativas
+        self._espera = collections.deque()
+        # Um comando por vez no driver: `preparar_sessao` vem de outra thread
+        self._lock_driver = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name='shift-abas', daemon=True)
+        self._thread.start()
+
+    @property
+    def lease_manager(self):
+        return self.controller.lease_manager
+
+    @lease_manager.setter
+    def lease_manager(self, lease_manager):
+        self.controller.lease_manager = lease_manager
+
+    @property
+    def driver(self):
+        return self.controller.driver
+
+    def navegador_ativo(self):
+        return self.controller.navegador_ativo()
+
+    def preparar_sessao(self):
+        with self._lock_driver:
+            if self._abas and not self._sessao_valida():
+                self._devolver_abas()
+            return self._preparar()
+
+    def _sessao_valida(self):
+        if not self.navegador_ativo():
+            return False
+        try:
+            handles = set(self.driver.window_handles)
+            if not all(aba.handle in handles for aba in self._abas):
+                return False
+            self.driver.switch_to.window(self._abas[0].handle)
+            return self.controller.sessao_ativa()
+        except WebDriverException:
+            return False
+
+    def _preparar(self):
+        """Garante o login e as `n_abas` abas na O.S Consulta."""
+        if self._abas:
+            return True
+        if not self.controller.preparar_sessao():
+            return False
+
+        principal = self.driver.current_window_handle
+        for handle in self.driver.window_handles:
+            if handle != principal:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+        self.driver.switch_to.window(principal)
+        self._abas = [_Aba(principal)]
+        for _ in range(self.n_abas - 1):
+            self.driver.switch_to.new_window('tab')
+            if Config.SHIFT_PERFIL_LEVE:
+                bloquear_recursos(self.driver)
+            if not self._abrir_os_consulta():
+                self.driver.close()
+                break
+            self._abas.append(_Aba(self.driver.current_window_handle))
+        self.driver.switch_to.window(principal)
+        logger.info(f'Chrome do SHIFT com {len(self._abas)} aba(s) na O.S Consulta.')
+        relatar_memoria('Abas do SHIFT', [self.controller.pid_navegador()], len(self._abas))
+        return True
+
+    def _abrir_os_consulta(self):
+        """Leva a aba atual à O.S Consulta; os cookies já trazem a sessão."""
+        self.driver.get(self.controller.url)
+        if self.driver.find_elements(*self.controller.login_page.input_usuario):
+            if not self.controller.realizar_login():
+                return False
+        return self.controller.acessar_os_consulta()
+
+    def _loop(self):
+        while True:
+            ocupadas = any(aba.trabalho is not None for aba in self._abas)
+            if not ocupadas and not self._espera:
+                trabalho = self._fila.get()
+                if trabalho is self._PARAR:
+                    return
+                self._espera.append((trabalho, 1))
+            while len(self._espera) < self.n_abas:
+                try:
+                    trabalho = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if trabalho is self._PARAR:
+                    self._fila.put(trabalho)  # Sai quando as abas esvaziarem
+                    break
+                self._espera.append((trabalho, 1))
+            try:
+                with self._lock_driver:
+                    avancou = self._passo()
+            except Exception as e:
+                logger.error(f'Abas do SHIFT: erro inesperado: {e}; O.S. ficam para o próximo ciclo.')
+                self._abandonar()
+                avancou = False
+            if not avancou:
+                time.sleep(self.intervalo)
+
+    def _passo(self):
+        """Inicia O.S. nas abas livres e avança as que já têm resposta."""
+        if not self._preparar():
+            logger.error('Abas do SHIFT: sessão indisponível; O.S. ficam para o próximo ciclo.')
+            self._abandonar()
+            return False
+
+        avancou = False
+        for aba in list(self._abas):
+            if aba not in self._abas:
+                break  # Abas reabertas no meio da volta
+            if aba.trabalho is None and not self._espera:
+                continue
+            with self.watchdog.prazo(
+                f'SHIFT aba {aba.handle}', self.prazo_item, self.controller._reciclar_navegador
+            ) as prazo:
+                try:
+                    if aba.trabalho is None:
+                        trabalho, tentativa = self._espera.popleft()
+                        self._iniciar(aba, trabalho, tentativa)
+                        avancou = True
+                    else:
+                        avancou = self._avancar(aba) or avancou
+                except Exception as e:
+                    # Com o chromedriver morto o erro pode vir do urllib3
+                    if prazo.expirado or not self.navegador_ativo():
+                        self._navegador_perdido(aba if prazo.expirado else None)
+                        return True
+                    logger.error(f'Abas do SHIFT: erro na O.S. {self._os(aba)}: {e}')
+                    # Checkpoint mantido; a aba volta à O.S Consulta
+                    self._liberar(aba)
+                    self._recarregar(aba)
+        return avancou
+
+    def _abandonar(self):
+        """Encerra sem concluir (checkpoints mantidos) tudo o que está nas abas e na espera."""
+        for aba in self._abas:
+            if aba.trabalho is not None:
+                self._liberar(aba)
+        while self._espera:
+            self._terminar(self._espera.popleft()[0])
+        self._abas = []
+
+    @staticmethod
+    def _os(aba):
+        return aba.trabalho[0].get('os') if aba.trabalho else None
+
+    def _iniciar(self, aba, trabalho, tentativa):
+        ordem, ao_concluir, _ = trabalho
+        os_numero, nome_pessoa = ordem.get('os'), ordem.get('os_name')
+        task_id, item_id = ordem['task_id'], ordem['item_id']
+        aba.trabalho, aba.tentativa = trabalho, tentativa
+        aba.inicio, aba.etapa, aba.parcial = time.monotonic(), 'busca', None
+
+        if self.watchdog.esgotado('SHIFT'):
+            self._liberar(aba)  # Fica para o próximo ciclo
+            return
+        if not os_numero or not nome_pessoa:
+            logger.warning(f'Tarefa {task_id} está incompleta: OS ou nome ausente.')
+            self._liberar(aba, executada=True)
+            return
+        if not self.controller._possui_lease(item_id):
+            self._liberar(aba)
+            return
+
+        self.driver.switch_to.window(aba.handle)
+        dados = self.controller._iniciar_ordem(task_id, item_id, nome_pessoa)
+        if dados:
+            self.controller._gravar_ordem(task_id, item_id, os_numero, dados, ao_concluir)
+            self._concluir(aba)
+        elif not digitar_os(self.driver, os_numero):
+            self._concluir(aba)
+
+    def _avancar(self, aba):
+        """Retoma a O.S. da aba se a tela esperada já chegou; True se avançou."""
+        ordem, ao_concluir, _ = aba.trabalho
+        os_numero, nome_pessoa = ordem['os'], ordem['os_name']
+        task_id, item_id = ordem['task_id'], ordem['item_id']
+        self.driver.switch_to.window(aba.handle)
+
+        if aba.etapa == 'busca':
+            if not busca_os_respondida(self.driver):
+                return self._verificar_prazo(aba)
+            if not tratar_alerta_busca(
+                self.driver, self.api_client, task_id, item_id, os_numero, espera=0
+            ):
+                self._concluir(aba)
+                return True
+            self.journal.registrar('SHIFT', item_id, 'searched')
+            aba.parcial = self.controller._extrair_exame(os_numero, item_id, nome_pessoa)
+            if not aba.parcial:
+                self._concluir(aba)
+                return True
+            aba.etapa = 'manutencao'
+            return True
+
+        if not tela_manutencao_aberta(self.driver):
+            return self._verificar_prazo(aba)
+        dados = self.controller._extrair_manutencao(aba.parcial)
+        if dados:
+            self.journal.registrar('SHIFT', item_id, CheckpointJournal.EXTRAIDO, dados)
+            self.controller._gravar_ordem(task_id, item_id, os_numero, dados, ao_concluir)
+        self._concluir(aba)
+        return True
+
+    def _verificar_prazo(self, aba):
+        """Encerra a O.S. cuja tela não respondeu dentro do prazo do item."""
+        if not self.prazo_item or time.monotonic() - aba.inicio <= self.prazo_item:
+            return False
+        item_id = aba.trabalho[0]['item_id']
+        reportar_timeout_item(self.api_client, 'SHIFT', item_id, self.prazo_item)
+        self._concluir(aba)
+        self._recarregar(aba)
+        return True
+
+    def _concluir(self, aba):
+        self.controller._concluir_checkpoint(aba.trabalho[0]['item_id'])
+        self._liberar(aba, executada=True)
+
+    def _liberar(self, aba, executada=False):
+        """Solta a aba; sem `executada`, a O.S. fica para o próximo ciclo."""
+        trabalho, aba.trabalho = aba.trabalho, None
+        aba.etapa = aba.parcial = None
+        if trabalho is not None:
+            self._terminar(trabalho, executada)
+
+    def _recarregar(self, aba):
+        try:
+            self.driver.switch_to.window(aba.handle)
+            if not self._abrir_os_consulta():
+                raise WebDriverException('O.S Consulta indisponível')
+        except WebDriverException as e:
+            logger.warning(f'Abas do SHIFT: aba não recarregou ({e}); abas serão reabertas.')
+            self._devolver_abas()
+
+    def _devolver_abas(self):
+        """Devolve à fila (uma vez) as O.S. em andamento e descarta as abas."""
+        for aba in self._abas:
+            if aba.trabalho is None:
+                continue
+            if aba.tentativa < 2:
+                self._espera.appendleft((aba.trabalho, aba.tentativa + 1))
+                aba.trabalho = None
+            else:
+                logger.error(f'O.S. {self._os(aba)} não processada; volta no próximo ciclo.')
+                self._liberar(aba)
+        self._abas = []
+
+    def _navegador_perdido(self, culpada):
+        """
+        O Chrome caiu ou foi derrubado pelo watchdog: reporta a O.S. que
+        travou, devolve as demais à fila e sobe um navegador novo.
+        """
+        if culpada is not None and culpada.trabalho is not None:
+            item_id = culpada.trabalho[0]['item_id']
+            reportar_timeout_item(self.api_client, 'SHIFT', item_id, self.prazo_item)
+            self._concluir(culpada)
+        self._devolver_abas()
+        self.controller._iniciar_navegador()
+
+    def descarregar(self):
+        """Envia as escritas pendentes à API, mantendo o navegador aberto."""
+        self.controller.descarregar()
+
+    def finalizar(self):
+        """Para o laço das abas, fecha o navegador e envia as escritas pendentes."""
+        self._fila.put(self._PARAR)
+        self._thread.join()
+        self.controller.finalizar()
@@ -1,13 +1,23 @@
+from selenium.common.exceptions import WebDriverException
+
 from src.browser.pages.login_page import ShiftLoginPage
 from src.browser.pages.os_consulta_page import OSConsultaPage
-from src.browser.utils.browser_manager import finalizar_driver, iniciar_driver
+from src.browser.utils.browser_manager import (
+    encerrar_driver_a_forca,
+    finalizar_driver,
+    iniciar_driver,
+)
+from src.config.checkpoint_journal import CheckpointJournal, obter_checkpoint_journal
+from src.config.config import Config
 from src.config.logger import logger
+from src.config.write_behind import WriteBehindQueue
 from src.controllers.anatomopatologico_controller import extrair_dados_anatomopatologico
 from src.controllers.api_handler import (
     atualizar_item_erro_shift,
     atualizar_item_fim,
     atualizar_item_inicio,
     atualizar_tarefa_inicio,
+    reportar_timeout_item,
     upsert_shift_data,
 )
 from src.controllers.buscar_numero_recipiente import buscar_prefixo_numero_recipiente
@@ -24,6 +34,7 @@ from src.controllers.paciente_controller import (
     extrair_informacoes_paciente,
     obter_nome_paciente,
 )
+from src.utils.watchdog import obter_watchdog
 
 
 class ShiftController:
@@ -37,11 +48,70 @@ class ShiftController:
         self.usuario = usuario
         self.senha = senha
         self.screenshot_path = screenshot_path
+        self._iniciar_navegador()
+        # Escritas de status vão por uma fila write-behind para não bloquear
+        # o navegador; `finalizar()` envia o que restar. Uma fila recebida
+        # pronta (ex.: a do `ShiftPool`) é compartilhada e fechada por quem
+        # a criou.
+        self._fechar_api_client = not isinstance(api_client, WriteBehindQueue)
+        self.api_client = (
+            WriteBehindQueue(api_client) if self._fechar_api_client else api_client
+        )
+        self.robot_id = robot_id
+        # Com vários robôs, só grava resultados de itens cujo lease ainda é
+        # deste robô (ver `LeaseManager`).
+        self.lease_manager = None
+        self.journal = obter_checkpoint_journal()
+        self.watchdog = obter_watchdog()
+
+    def _iniciar_navegador(self):
         self.driver = iniciar_driver(headless=True)
         self.login_page = ShiftLoginPage(self.driver)
         self.os_page = OSConsultaPage(self.driver)
-        self.api_client = api_client
-        self.robot_id = robot_id
+        # Em modo daemon o controlador é reaproveitado entre execuções; a
+        # sessão só é refeita quando `sessao_ativa()` falha.
+        self._sessao_pronta = False
+
+    def _reciclar_navegador(self):
+        """Chamado pelo watchdog: derruba o Chrome travado no item atual."""
+        encerrar_driver_a_forca(self.driver)
+
+    def pid_navegador(self):
+        """PID do chromedriver (pai dos processos do Chrome), se ainda ativo."""
+        processo = getattr(getattr(self.driver, "service", None), "process", None)
+        if processo is None or processo.poll() is not None:
+            return None
+        return processo.pid
+
+    def navegador_ativo(self):
+        """Verifica se o Chrome ainda responde ao WebDriver."""
+        try:
+            self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def sessao_ativa(self):
+        """Verifica se o navegador segue logado, fora da tela de login."""
+        if not self._sessao_pronta or not self.navegador_ativo():
+            return False
+        try:
+            # A última O.S. pode ter deixado o foco dentro de um iframe
+            self.driver.switch_to.default_content()
+            if self.driver.find_elements(*self.login_page.input_usuario):
+                logger.info("Sessão do SHIFT expirou; será feito novo login.")
+                return False
+            return bool(self.driver.find_elements(*self.os_page.menu_button))
+        except WebDriverException:
+            return False
+
+    def preparar_sessao(self):
+        """Garante login e página de O.S Consulta, reaproveitando a sessão ativa."""
+        if self.sessao_ativa():
+            logger.info("Reaproveitando sessão do SHIFT já logada.")
+            return True
+        self._sessao_pronta = self.realizar_login() and self.acessar_os_consulta()
+        return self._sessao_pronta
 
     def realizar_login(self):
         """Realiza o login no sistema SHIFT."""
@@ -74,16 +144,31 @@ class ShiftController:
             logger.error(f"Erro ao acessar O.S Consulta: {str(e)}")
             return False
 
-    def processar_dados(self, tasks):
-        """Processa as tarefas recebidas, extrai dados e envia à API."""
+    def processar_dados(self, tasks, ao_concluir=None):
+        """
+        Processa as tarefas recebidas, extrai dados e envia à API.
+
+        `ao_concluir(item)`, se informado, é chamado para cada item concluído
+        com `id`, `os_number` e `shift_data`, no formato de `items/by-stage/`.
+
+        Retorna False se alguma O.S. ficou para o próximo ciclo (prazo do
+        estágio esgotado, sessão indisponível ou lease perdido).
+        """
         if not tasks:
             logger.warning("Nenhuma tarefa foi fornecida para processamento.")
-            return
+            return True
 
-        if not self.realizar_login() or not self.acessar_os_consulta():
-            return
+        if not self.preparar_sessao():
+            return False
 
+        prazo_item = Config.WATCHDOG_ITEM_TIMEOUTS.get("SHIFT")
+        todas = True
         for task in tasks:
+            if self.watchdog.esgotado("SHIFT"):
+                logger.warning(
+                    "Prazo do estágio SHIFT esgotado; O.S. restantes ficam para o próximo ciclo."
+                )
+                return False
             os_numero = task.get("os")
             nome_pessoa = task.get("os_name")
             task_id = task["task_id"]
@@ -92,33 +177,124 @@ class ShiftController:
             if not os_numero or not nome_pessoa:
                 logger.warning(f"Tarefa {task_id} está incompleta: OS ou nome ausente.")
                 continue
+            if not self._possui_lease(item_id):
+                todas = False
+                continue
+
+            with self.watchdog.prazo(
+                f"SHIFT item {item_id}", prazo_item, self._reciclar_navegador
+            ) as prazo:
+                try:
+                    self._processar_ordem(
+                        task_id, item_id, os_numero, nome_pessoa, ao_concluir
+                    )
+                except Exception:
+                    # Com o Chrome derrubado pelo watchdog, qualquer erro
+                    # (não só do WebDriver) é consequência do prazo vencido.
+                    if not prazo.expirado:
+                        raise
+            if prazo.expirado:
+                # O Chrome foi derrubado pelo watchdog: reporta o item e
+                # segue com um navegador novo.
+                reportar_timeout_item(self.api_client, "SHIFT", item_id, prazo_item)
+                self._concluir_checkpoint(item_id)
+                self._iniciar_navegador()
+                if not self.preparar_sessao():
+                    return False
+                continue
+            # Só chega aqui se o item terminou (com sucesso ou erro tratado);
+            # uma exceção deixa o checkpoint para a próxima execução retomar.
+            self._concluir_checkpoint(item_id)
 
-            atualizar_tarefa_inicio(self.api_client, task_id, nome_pessoa)
-            atualizar_item_inicio(self.api_client, item_id)
+        logger.info("Processamento das tarefas concluído.")
+        return todas
+
+    def _concluir_checkpoint(self, item_id):
+        """
+        Encerra o item no journal só depois que suas escritas saíram da fila
+        write-behind para o outbox (durável; o envio à API segue em segundo
+        plano): uma queda antes disso ainda encontra o item para retomar.
+        """
+        self.api_client.persistir_item(item_id)
+        self.journal.concluir("SHIFT", item_id)
 
+    def _processar_ordem(self, task_id, item_id, os_numero, nome_pessoa, ao_concluir):
+        dados_extraidos = self._iniciar_ordem(task_id, item_id, nome_pessoa)
+        if not dados_extraidos:
             if not buscar_os_no_sistema(
                 self.driver, self.api_client, task_id, item_id, os_numero
             ):
-                continue  # Pula para a próxima O.S.
+                return  # Pula para a próxima O.S.
+            self.journal.registrar("SHIFT", item_id, "searched")
 
             dados_extraidos = self._extrair_dados_do_shift(os_numero, item_id, nome_pessoa)
             if not dados_extraidos:
-                continue
+                return
+            self.journal.registrar(
+                "SHIFT", item_id, CheckpointJournal.EXTRAIDO, dados_extraidos
+            )
+        self._gravar_ordem(task_id, item_id, os_numero, dados_extraidos, ao_concluir)
 
-            upsert_shift_data(self.api_client, task_id, item_id, dados_extraidos)
-            atualizar_item_fim(
-                self.api_client,
-                item_id,
-                status="COMPLETED",
-                shift_result="PROCESSO FINALIZADO",
-                stage="IMAGE_PROCESS",
+    def _iniciar_ordem(self, task_id, item_id, nome_pessoa):
+        """
+        Marca tarefa e item como iniciados e retorna os dados já extraídos
+        por uma execução interrompida, se houver. O checkpoint `started` vem
+        antes do STARTED, para que uma queda devolva o item à fila.
+        """
+        checkpoint = self.journal.estado("SHIFT", item_id)
+        if checkpoint is None:
+            self.journal.registrar("SHIFT", item_id, CheckpointJournal.INICIADO)
+        atualizar_tarefa_inicio(self.api_client, task_id, nome_pessoa)
+        atualizar_item_inicio(self.api_client, item_id)
+
+        if checkpoint and checkpoint.get("dados"):
+            # Extração já feita por uma execução interrompida: só reenvia.
+            logger.info(
+                f"Retomando item {item_id} após '{checkpoint['etapa']}', sem nova extração."
             )
+            return checkpoint["dados"]
+        return None
 
-        logger.info("Processamento das tarefas concluído.")
+    def _gravar_ordem(self, task_id, item_id, os_numero, dados_extraidos, ao_concluir):
+        """Envia os dados extraídos e conclui o item, se o lease ainda é nosso."""
+        if not self._possui_lease(item_id):
+            return
+
+        upsert_shift_data(self.api_client, task_id, item_id, dados_extraidos)
+        atualizar_item_fim(
+            self.api_client,
+            item_id,
+            status="COMPLETED",
+            shift_result="PROCESSO FINALIZADO",
+            stage="IMAGE_PROCESS",
+        )
+        # ShiftData e COMPLETED (mesclado ao STARTED) vão para o outbox antes
+        # do checkpoint, sem esperar a API; as das demais O.S. seguem na fila.
+        self.api_client.persistir_item(item_id)
+        self.journal.registrar("SHIFT", item_id, "upserted")
+        if ao_concluir:
+            ao_concluir(
+                {"id": item_id, "os_number": os_numero, "shift_data": dados_extraidos}
+            )
+
+    def _possui_lease(self, item_id):
+        if self.lease_manager is None or self.lease_manager.possui(item_id):
+            return True
+        logger.warning(f"Lease do item {item_id} perdido; item ignorado.")
+        return False
 
     def _extrair_dados_do_shift(self, os_numero, item_id, nome_pessoa):
         """Extrai e organiza os dados da O.S."""
+        parcial = self._extrair_exame(os_numero, item_id, nome_pessoa)
+        if not parcial:
+            return None
+        return self._extrair_manutencao(parcial)
 
+    def _extrair_exame(self, os_numero, item_id, nome_pessoa):
+        """
+        Extrai recipiente, paciente e exame da O.S. aberta e pede a tela
+        'Manutenção de indivíduo', sem esperar por ela.
+        """
         recipiente_encontrado = buscar_prefixo_numero_recipiente(self.driver)
         logger.success(f"Recipiente encontrado: {recipiente_encontrado}")
 
@@ -143,6 +319,16 @@ class ShiftController:
         if not acessar_informacoes_paciente(self.driver):
             return None
 
+        return {
+            "os_number": os_numero,
+            "nome_paciente": nome_pessoa,
+            "recipiente": recipiente_encontrado,
+            **dados_paciente,
+            **dados_anatomopatologico,
+        }
+
+    def _extrair_manutencao(self, parcial):
+        """Completa os dados com a tela 'Manutenção de indivíduo' e a fecha."""
         if not esperar_tela_manutencao(self.driver):
             return None
 
@@ -151,15 +337,19 @@ class ShiftController:
         fechar_janela_manutencao(self.driver)
 
         return {
-            "os_number": os_numero,
-            "nome_paciente": nome_pessoa,
-            "recipiente": recipiente_encontrado,
-            **dados_paciente,
-            **dados_anatomopatologico,
+            **parcial,
             **dados_paciente_guia_geral,
             **dados_endereco,
         }
 
+    def descarregar(self):
+        """Envia as escritas pendentes à API, mantendo o navegador aberto."""
+        self.api_client.flush()
+
     def finalizar(self):
-        """Finaliza o navegador."""
-        finalizar_driver(self.driver)
+        """Finaliza o navegador e envia as escritas pendentes à API."""
+        try:
+            finalizar_driver(self.driver)
+        finally:
+            if self._fechar_api_client:
+                self.api_client.close()
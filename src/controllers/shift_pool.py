@@ -0,0 +1,266 @@
+import queue
+import threading
+import time
+
+from src.config.config import Config
+from src.config.logger import logger
+from src.config.write_behind import WriteBehindQueue
+from src.utils.supervisor import memoria_arvore
+from src.utils.watchdog import obter_watchdog
+
+
+def relatar_memoria(modo, pids, concorrencia):
+    """Loga a memória dos Chrome (árvores de `pids`) por O.S. simultânea."""
+    memorias = [memoria_arvore(pid) for pid in pids if pid is not None]
+    total = sum(m for m in memorias if m)
+    if not total or not concorrencia:
+        return None
+    logger.info(
+        f'{modo}: {total / 2**20:.0f} MB de Chrome para {concorrencia} O.S. '
+        f'simultânea(s) ({total / concorrencia / 2**20:.0f} MB por O.S.).'
+    )
+    return total
+
+
+class FilaDeOrdens:
+    """
+    Base dos modos concorrentes do SHIFT: uma fila limitada de O.S. com a
+    mesma interface do `ShiftController` (`processar_dados`) e a entrega
+    sem espera (`submeter`) usada por `_processar_shift`.
+    """
+
+    _PARAR = object()
+
+    def _iniciar_fila(self, max_pendentes):
+        self._fila = queue.Queue(maxsize=max_pendentes)
+        self._em_andamento = 0
+        self._ocioso = threading.Condition()
+
+    def submeter(self, orders, ao_concluir=None, ao_terminar=None):
+        """
+        Enfileira as O.S. (no formato de `ShiftController.processar_dados`).
+        `ao_terminar(executadas)`, se informado, é chamado uma vez quando
+        todas elas terminarem; `executadas` é False se alguma ficou para o
+        próximo ciclo sem ser processada.
+        """
+        if not orders:
+            if ao_terminar:
+                ao_terminar(True)
+            return
+        restantes = [len(orders), True]
+        lock = threading.Lock()
+
+        def terminou_uma(executada):
+            with lock:
+                restantes[0] -= 1
+                restantes[1] = restantes[1] and executada
+                ultima = restantes[0] == 0
+            if ultima and ao_terminar:
+                ao_terminar(restantes[1])
+
+        with self._ocioso:
+            self._em_andamento += len(orders)
+        for ordem in orders:
+            self._fila.put((ordem, ao_concluir, terminou_uma))
+
+    def processar_dados(self, tasks, ao_concluir=None):
+        """Mesma interface do `ShiftController`: processa e espera terminar."""
+        executadas = []
+        self.submeter(tasks, ao_concluir, executadas.append)
+        self.aguardar()
+        return all(executadas)
+
+    def aguardar(self):
+        with self._ocioso:
+            self._ocioso.wait_for(lambda: self._em_andamento == 0)
+
+    def _terminar(self, trabalho, executada=False):
+        """
+        Dá a O.S. por encerrada, com sucesso ou não; `executada` é False se
+        ela ficou para o próximo ciclo sem ser processada.
+        """
+        try:
+            trabalho[2](executada)
+        finally:
+            with self._ocioso:
+                self._em_andamento -= 1
+                self._ocioso.notify_all()
+
+
+class ShiftPool(FilaDeOrdens):
+    """
+    Pool de navegadores do SHIFT: `tamanho` workers, cada um com o seu
+    `ShiftController` (Chrome headless próprio, logado e na O.S Consulta),
+    atendendo uma fila comum de O.S.
+
+    `submeter()` distribui as O.S. pela fila, limitada a `max_pendentes`
+    para que o streaming de tarefas não vá além do que o pool consegue
+    atender; cada worker pega a próxima O.S. quando termina a sua, então os
+    lentos não seguram os demais. `aguardar()` bloqueia até a fila esvaziar.
+
+    O worker cujo navegador falha descarta o controlador, espera um backoff
+    (`backoff_inicial` dobrando até `backoff_maximo`) e sobe outro; a O.S.
+    em andamento é tentada mais uma vez, retomando do checkpoint.
+
+    As escritas de status de todos os workers passam por um único
+    `WriteBehindQueue` (`api_client`), preservando a ordem entre tarefa e
+    itens.
+    """
+
+    def __init__(
+        self,
+        criar_controller,
+        api_client,
+        tamanho=None,
+        max_pendentes=None,
+        backoff_inicial=None,
+        backoff_maximo=None,
+    ):
+        # criar_controller(api_client) -> ShiftController ainda sem sessão
+        self.criar_controller = criar_controller
+        self.api_client = WriteBehindQueue(api_client)
+        self.tamanho = max(1, tamanho or Config.SHIFT_POOL_SIZE)
+        self.backoff_inicial = (
+            backoff_inicial if backoff_inicial is not None else Config.SHIFT_POOL_BACKOFF_INICIAL
+        )
+        self.backoff_maximo = (
+            backoff_maximo if backoff_maximo is not None else Config.SHIFT_POOL_BACKOFF_MAXIMO
+        )
+        self.lease_manager = None
+        self.watchdog = obter_watchdog()
+        self._iniciar_fila(max_pendentes or 2 * self.tamanho)
+        self._controllers = [None] * self.tamanho
+        self._falhas = [0] * self.tamanho
+        self._threads = [
+            threading.Thread(
+                target=self._loop, args=(indice,), name=f'shift-pool-{indice}', daemon=True
+            )
+            for indice in range(self.tamanho)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def preparar_sessao(self):
+        """
+        Sobe e loga os navegadores em paralelo; True se ao menos um ficou
+        pronto (os que falharem sobem de novo na primeira O.S.).
+        """
+        prontos = []
+        threads = [
+            threading.Thread(target=lambda i=i: prontos.append(self._controller(i)))
+            for i in range(self.tamanho)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ativos = [controller for controller in prontos if controller is not None]
+        logger.info(f'Pool do SHIFT com {len(ativos)}/{self.tamanho} navegador(es) logado(s).')
+        relatar_memoria(
+            'Pool do SHIFT', [c.pid_navegador() for c in ativos], len(ativos)
+        )
+        return bool(ativos)
+
+    def navegador_ativo(self):
+        return any(c is not None and c.navegador_ativo() for c in self._controllers)
+
+    def _loop(self, indice):
+        while True:
+            trabalho = self._fila.get()
+            if trabalho is self._PARAR:
+                return
+            ordem, ao_concluir, _ = trabalho
+            executada = False
+            try:
+                if self.watchdog.esgotado('SHIFT'):
+                    continue  # Fica para o próximo ciclo
+                executada = self._processar(indice, ordem, ao_concluir)
+            except Exception as e:
+                logger.error(
+                    f'Worker {indice} do SHIFT: erro inesperado na O.S. {ordem.get("os")}: {e}'
+                )
+            finally:
+                self._terminar(trabalho, executada)
+
+    def _processar(self, indice, ordem, ao_concluir):
+        """False se a O.S. ficou para o próximo ciclo."""
+        for tentativa in (1, 2):
+            controller = self._controller(indice)
+            if controller is None:
+                continue
+            controller.lease_manager = self.lease_manager
+            try:
+                executada = controller.processar_dados([ordem], ao_concluir=ao_concluir)
+                self._falhas[indice] = 0
+                return executada
+            except Exception as e:
+                logger.error(
+                    f'Worker {indice} do SHIFT falhou na O.S. {ordem.get("os")} '
+                    f'(tentativa {tentativa}): {e}'
+                )
+                self._falhas[indice] += 1
+                self._descartar(indice)
+        logger.error(
+            f'O.S. {ordem.get("os")} não processada pelo pool; volta no próximo ciclo.'
+        )
+        return False
+
+    def _controller(self, indice):
+        """Controlador do worker, recriado (após o backoff) se o Chrome morreu."""
+        controller = self._controllers[indice]
+        if controller is not None and controller.navegador_ativo():
+            return controller
+        if controller is not None:
+            logger.warning(f'Chrome do worker {indice} do SHIFT não responde; será recriado.')
+            self._falhas[indice] += 1
+            self._descartar(indice)
+        if self._falhas[indice]:
+            atraso = min(
+                self.backoff_inicial * 2 ** (self._falhas[indice] - 1), self.backoff_maximo
+            )
+            logger.info(f'Worker {indice} do SHIFT reinicia em {atraso:.0f}s.')
+            time.sleep(atraso)
+        controller = None
+        try:
+            controller = self.criar_controller(self.api_client)
+            if not controller.preparar_sessao():
+                raise RuntimeError('login ou O.S Consulta indisponível')
+        except Exception as e:
+            self._falhas[indice] += 1
+            logger.error(f'Worker {indice} do SHIFT não subiu: {e}')
+            if controller is not None:
+                self._controllers[indice] = controller
+                self._descartar(indice)
+            return None
+        self._controllers[indice] = controller
+        return controller
+
+    def _descartar(self, indice):
+        controller, self._controllers[indice] = self._controllers[indice], None
+        if controller is None:
+            return
+        try:
+            controller.finalizar()
+        except Exception as e:
+            logger.warning(f'Erro ao finalizar o Chrome do worker {indice}: {e}')
+
+    def descarregar(self):
+        """Envia as escritas pendentes à API, mantendo os navegadores abertos."""
+        self.api_client.flush()
+
+    def finalizar(self):
+        """Para os workers, fecha os navegadores e envia as escritas pendentes."""
+        for _ in self._threads:
+            self._fila.put(self._PARAR)
+        for thread in self._threads:
+            thread.join()
+        try:
+            for indice in range(self.tamanho):
+                controller, self._controllers[indice] = self._controllers[indice], None
+                if controller is not None:
+                    try:
+                        controller.finalizar()
+                    except Exception as e:
+                        logger.warning(f'Erro ao finalizar o Chrome do worker {indice}: {e}')
+        finally:
+            self.api_client.close()
@@ -11,11 +11,14 @@ from src.config.logger import logger
 from .image_services import preparar_imagem_para_ocr
 
 
-def validar_popup_data_realizacao(app: Application, api_client, item_id: int) -> bool:
+def validar_popup_data_realizacao(
+    app: Application, api_client, item_id: int, teclado=pyautogui
+) -> bool:
     """
     Verifica se um pop-up de 'Data de realização' (ou com título 'Confirma') aparece.
     Se aparecer, extrai o texto, loga, clica em 'Não' (ou 'OK'), pressiona F6 e clica na aba "Requisição".
     Retorna True se o pop-up for encontrado e tratado; caso contrário, retorna False.
+    As teclas saem por `teclado` (ex.: o `TecladoVigiado` do digitador).
     """
     try:
         dialog = app.window(class_name="TMessageForm", title="Confirma")
@@ -51,7 +54,7 @@ def validar_popup_data_realizacao(app: Application, api_client, item_id: int) ->
                 logger.info("Clicou em 'OK' para o pop-up de data.")
 
             # Pressiona F6 para cancelar o cadastro atual
-            pyautogui.press("F6")
+            teclado.press("F6")
             # Acessa a janela principal e clica na aba "Requisição"
             janela_principal = app.window(
                 title="Requisição de Exame Histopatológico - MAMA"
@@ -70,7 +73,7 @@ def validar_popup_data_realizacao(app: Application, api_client, item_id: int) ->
         return False
 
 
-def tratar_pop_up_informacao(app, api_client, item_id: int) -> bool:
+def tratar_pop_up_informacao(app, api_client, item_id: int, teclado=pyautogui) -> bool:
     """
     Aguarda e trata o pop-up de 'Informação' após salvar os dados.
     Se o pop-up for encontrado, extrai o texto via OCR, atualiza o item na API e clica em OK.
@@ -83,6 +86,7 @@ def tratar_pop_up_informacao(app, api_client, item_id: int) -> bool:
       - app: Instância da aplicação do pywinauto.
       - api_client: Instância do APIClient para atualizar o item.
       - item_id: ID do item que será atualizado.
+      - teclado: por onde saem as teclas (padrão: pyautogui).
     """
     try:
         dialog = app.window(class_name="#32770", title="Informação")
@@ -111,8 +115,8 @@ def tratar_pop_up_informacao(app, api_client, item_id: int) -> bool:
             
             # Clica no botão 'OK' do pop-up
             dialog.child_window(title="OK", control_type="Button").click()
-            pyautogui.press(["F6"])  
-            pyautogui.press(["F2"])
+            teclado.press(["F6"])
+            teclado.press(["F2"])
             return True  # Pop-up encontrado e tratado
         else:
             logger.info("Pop-up 'Informação' não encontrado.")
@@ -1,8 +1,10 @@
 import os
 import re
+import threading
 import time
 import traceback
 import unicodedata
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -10,9 +12,13 @@ from typing import Any, Dict, List, Optional
 import pyautogui
 from pywinauto import Application
 
+from src.config.checkpoint_journal import CheckpointJournal, obter_checkpoint_journal
+from src.config.config import Config
 from src.config.logger import logger
 from src.controllers.api_handler import (atualizar_item_erro_sismama,
-                                         atualizar_item_sismama)
+                                         atualizar_item_sismama,
+                                         reportar_timeout_item)
+from src.utils.watchdog import PrazoExcedido, obter_watchdog
 
 from .services.popup_services import (tratar_pop_up_informacao,
                                       validar_popup_data_realizacao)
@@ -63,14 +69,69 @@ def carregar_variaveis_ambiente() -> tuple:
     )
 
 
+class TecladoVigiado:
+    """
+    Teclado do SIS MAMA (mesma interface de `pyautogui.press`/`write`) que
+    só envia teclas enquanto o prazo do item não venceu.
+
+    O watchdog encerra o SIS MAMA de outra thread; uma tecla enviada depois
+    disso iria para a janela que ficou com o foco. Cada tecla confere o
+    prazo antes de sair, e `bloqueado()`, usado pelo watchdog antes de
+    encerrar o processo, espera a tecla em andamento e barra as seguintes
+    com `PrazoExcedido`.
+    """
+
+    def __init__(self):
+        self.prazo = None
+        self._bloqueado = False
+        self._lock = threading.Lock()
+
+    def armar(self, prazo):
+        """Libera o teclado para o item vigiado por `prazo`."""
+        with self._lock:
+            self.prazo = prazo
+            self._bloqueado = False
+
+    @contextmanager
+    def bloqueado(self):
+        with self._lock:
+            self._bloqueado = True
+            yield
+
+    def _enviar(self, funcao, tecla):
+        with self._lock:
+            if self._bloqueado or (self.prazo is not None and self.prazo.expirado):
+                raise PrazoExcedido("Teclado bloqueado: prazo do item excedido.")
+            funcao(tecla, _pause=False)
+
+    def press(self, teclas):
+        for tecla in [teclas] if isinstance(teclas, str) else teclas:
+            self._enviar(pyautogui.press, tecla)
+        time.sleep(pyautogui.PAUSE)
+
+    def write(self, texto):
+        for caractere in texto:
+            self._enviar(pyautogui.write, caractere)
+        time.sleep(pyautogui.PAUSE)
+
+
 class SismamaDigitador:
     """
     Classe responsável por inserir dados no SIS MAMA utilizando automação.
     Divide o fluxo de cadastro em etapas menores para facilitar manutenção e escalabilidade.
     """
 
-    def __init__(self, api_client):
+    def __init__(self, api_client, reciclar=None, reabrir=None):
         self.api_client = api_client
+        self.journal = obter_checkpoint_journal()
+        # Chamados quando um item estoura o prazo do watchdog: `reciclar`
+        # encerra o SIS MAMA travado e `reabrir` o abre de novo para o
+        # restante do lote.
+        self.reciclar = reciclar
+        self.reabrir = reabrir
+        self.watchdog = obter_watchdog()
+        self._prazo = None
+        self.teclado = TecladoVigiado()
         # Carrega as configurações a partir de variáveis de ambiente
         (
             self.caminho_projeto,
@@ -90,22 +151,44 @@ class SismamaDigitador:
         :param dados_sismama: Lista de dicionários com os dados obtidos via API.
         """
         try:
-            app = Application(backend="uia").connect(title_re=".*Prestador de Servi.*")
+            app = self._conectar()
             total_registros = len(dados_sismama)
             logger.info(
                 f"Iniciando o processamento de {total_registros} registros no SIS MAMA."
             )
 
+            prazo_item = Config.WATCHDOG_ITEM_TIMEOUTS.get("SISMAMA")
             for item in dados_sismama:
-                try:
-                    self._processar_item(item, app)
-                except Exception as item_e:
-                    logger.error(
-                        f"Erro ao processar o item {item.get('item_id')}: {item_e}"
-                    )
-                    logger.error(
-                        f"Erro no item {item.get('item_id')}: {item_e}\n{traceback.format_exc()}"
+                if self.watchdog.esgotado("SISMAMA"):
+                    logger.warning(
+                        "Prazo do estágio SISMAMA esgotado; registros restantes ficam para o próximo ciclo."
                     )
+                    break
+                item_id = item.get("item_id")
+                with self.watchdog.prazo(
+                    f"SISMAMA item {item_id}", prazo_item, self._interromper
+                ) as prazo:
+                    self._prazo = prazo
+                    self.teclado.armar(prazo)
+                    try:
+                        self._processar_item(item, app)
+                    except Exception as item_e:
+                        if not prazo.expirado:
+                            logger.error(
+                                f"Erro ao processar o item {item_id}: {item_e}"
+                            )
+                            logger.error(
+                                f"Erro no item {item_id}: {item_e}\n{traceback.format_exc()}"
+                            )
+                    finally:
+                        self._prazo = None
+                if prazo.expirado:
+                    reportar_timeout_item(self.api_client, "SISMAMA", item_id, prazo_item)
+                    self.journal.concluir("SISMAMA", item_id)
+                    if self.reabrir is None:
+                        break
+                    self.reabrir()
+                    app = self._conectar()
 
             logger.info(
                 f"Processamento concluído. Total de {total_registros} registros verificados."
@@ -115,6 +198,23 @@ class SismamaDigitador:
                 f"Erro durante o processamento do SIS MAMA: {e}\n{traceback.format_exc()}"
             )
 
+    def _conectar(self) -> Application:
+        return Application(backend="uia").connect(title_re=".*Prestador de Servi.*")
+
+    def _interromper(self) -> None:
+        """
+        Chamado pelo watchdog quando o item vence: bloqueia o teclado (após a
+        tecla em andamento) e só então encerra o SIS MAMA.
+        """
+        with self.teclado.bloqueado():
+            if self.reciclar is not None:
+                self.reciclar()
+
+    def _verificar_prazo(self) -> None:
+        """Interrompe a digitação entre etapas se o prazo do item venceu."""
+        if self._prazo is not None:
+            self._prazo.verificar()
+
     def _processar_item(self, item: Dict[str, Any], app: Application) -> None:
         """
         Processa um item individual:
@@ -132,6 +232,9 @@ class SismamaDigitador:
             f"Iniciando inserção dos dados do paciente ID {item_id} (OS {os_number})."
         )
 
+        if self._retomar_item(item_id):
+            return
+
         if not shift_data:
             logger.info(f"Item {item_id} não possui dados de SHIFT. Ignorando...")
             return
@@ -145,22 +248,64 @@ class SismamaDigitador:
             return
 
         # Executa o fluxo de cadastro
-        pyautogui.press(["f2"])  # Inicia cadastro
+        self.teclado.press(["f2"])  # Inicia cadastro
         self._preencher_campos_iniciais(shift_data)
+        self._verificar_prazo()
         self._preencher_endereco(shift_data, app)
+        self._verificar_prazo()
         self._preencher_caracteristicas_lesao(shift_data, app)
+        self._verificar_prazo()
         coleta_ok = self._preencher_coleta(os_number, shift_data, app, item_id)
         if not coleta_ok:
             logger.info(f"Cadastro cancelado para o item {item_id} devido ao pop-up.")
+            self.journal.concluir("SISMAMA", item_id)
             return
+        self.journal.registrar("SISMAMA", item_id, CheckpointJournal.DIGITADO)
+        # Não salva um cadastro cujo prazo venceu durante a digitação
+        self._verificar_prazo()
 
         # Salva e trata pop-up
-        pyautogui.press(["F5"])
+        self.teclado.press(["F5"])
         time.sleep(1)
-        popup_encontrado = tratar_pop_up_informacao(app, self.api_client, item_id)
+        popup_encontrado = tratar_pop_up_informacao(
+            app, self.api_client, item_id, teclado=self.teclado
+        )
+        # Com o SIS MAMA encerrado pelo watchdog, o pop-up não aparece
+        # mas o salvamento não foi confirmado
+        self._verificar_prazo()
         if not popup_encontrado:
+            self.journal.registrar("SISMAMA", item_id, CheckpointJournal.SALVO)
             logger.info(f"Nenhum popup detectado. Atualizando item {item_id} como COMPLETED")
             atualizar_item_sismama(self.api_client, item_id)
+        self.journal.concluir("SISMAMA", item_id)
+
+    def _retomar_item(self, item_id) -> bool:
+        """
+        Trata um item cuja digitação foi interrompida por uma queda.
+
+        Se o registro já foi salvo no SIS MAMA, só falta atualizar a API. Se
+        foi digitado mas o salvamento não foi confirmado, não há como saber
+        se o F5 chegou a gravar: em vez de digitar de novo (e arriscar um
+        registro duplicado), o item vai para ERROR para conferência manual.
+
+        :return: True se o item foi tratado e não deve ser digitado.
+        """
+        checkpoint = self.journal.estado("SISMAMA", item_id)
+        etapa = checkpoint and checkpoint["etapa"]
+        if etapa == CheckpointJournal.SALVO:
+            logger.info(f"Item {item_id} já salvo no SIS MAMA; concluindo na API.")
+            atualizar_item_sismama(self.api_client, item_id)
+        elif etapa == CheckpointJournal.DIGITADO:
+            mensagem_erro = (
+                "Digitação interrompida antes da confirmação do salvamento; "
+                "verifique no SIS MAMA se o registro foi gravado."
+            )
+            logger.warning(f"Item {item_id}: {mensagem_erro}")
+            atualizar_item_erro_sismama(self.api_client, item_id, mensagem_erro)
+        else:
+            return False
+        self.journal.concluir("SISMAMA", item_id)
+        return True
 
     def _dados_suficientes(self, shift_data: Dict[str, Any]) -> bool:
         """
@@ -180,48 +325,48 @@ class SismamaDigitador:
         Preenche campos iniciais como CNES, Cartão SUS, sexo, nome, data de nascimento, idade, etc.
         """
         cnes = 2078287
-        # pyautogui.write(shift_data.get("cnes", "NI"))
-        pyautogui.write(str(cnes))
-        pyautogui.press(["tab"] * 2)
+        # self.teclado.write(shift_data.get("cnes", "NI"))
+        self.teclado.write(str(cnes))
+        self.teclado.press(["tab"] * 2)
 
         cartao_sus = shift_data.get("cartao_sus")
         if cartao_sus:
-            pyautogui.write(cartao_sus + chr(9))
+            self.teclado.write(cartao_sus + chr(9))
         else:
             logger.info("Cartão SUS não especificado. Pulando inserção.")
 
         sexo = shift_data.get("sexo", "").strip().lower()
         if sexo in ["feminino", "f"]:
-            pyautogui.press(["right"])
+            self.teclado.press(["right"])
         elif sexo in ["masculino", "m"]:
-            pyautogui.press([" "])
-        pyautogui.press(["tab"])
+            self.teclado.press([" "])
+        self.teclado.press(["tab"])
 
-        pyautogui.write(shift_data.get("nome_paciente", "NI").strip())
-        pyautogui.press(["tab"] * 2)
+        self.teclado.write(shift_data.get("nome_paciente", "NI").strip())
+        self.teclado.press(["tab"] * 2)
 
-        pyautogui.write("NI")  # Campo da mãe
-        pyautogui.press(["tab"] * 5)
+        self.teclado.write("NI")  # Campo da mãe
+        self.teclado.press(["tab"] * 5)
 
         data_nascimento = shift_data.get("data_nascimento", "").strip()
         if data_nascimento:
             try:
                 dt = datetime.strptime(data_nascimento, "%Y-%m-%d")
-                pyautogui.write(dt.strftime("%d%m%Y"))
+                self.teclado.write(dt.strftime("%d%m%Y"))
             except ValueError:
                 logger.error("Data de nascimento inválida.")
         else:
             logger.info("Data de nascimento não especificada.")
-        pyautogui.press(["tab"])
+        self.teclado.press(["tab"])
 
-        pyautogui.write(str(shift_data.get("idade_paciente", "0")))
-        pyautogui.press(["tab"])
+        self.teclado.write(str(shift_data.get("idade_paciente", "0")))
+        self.teclado.press(["tab"])
 
         raca_etinia = shift_data.get("raca_etinia", "Não especificado (NI)").strip()
         if raca_etinia.lower() == "não especificado (ni)":
-            pyautogui.press(["tab"])  # Pula os campos relacionados
+            self.teclado.press(["tab"])  # Pula os campos relacionados
         else:
-            pyautogui.write(raca_etinia)
+            self.teclado.write(raca_etinia)
             print("OK")
 
     def _preencher_endereco(self, shift_data: Dict[str, Any], app: Application) -> None:
@@ -229,24 +374,24 @@ class SismamaDigitador:
         Preenche os dados de endereço, UF, município, etc.
         """
         nacionalidade = "BRASIL"
-        pyautogui.write(nacionalidade)
-        pyautogui.press(["tab"])
+        self.teclado.write(nacionalidade)
+        self.teclado.press(["tab"])
 
         logradouro = shift_data.get("logradouro", "NI").strip()
         if logradouro == "Não especificado (NI)":
             logradouro = "NI"
-        pyautogui.write(logradouro)
-        pyautogui.press(["tab"])
+        self.teclado.write(logradouro)
+        self.teclado.press(["tab"])
 
         numero = shift_data.get("numero_residencial", "NI")
         if numero == "Não especificado (NI)":
             numero = "NI"
-        pyautogui.write(numero)
-        pyautogui.press(["tab"] * 3)
+        self.teclado.write(numero)
+        self.teclado.press(["tab"] * 3)
 
         uf = str(shift_data.get("estado", "NI")).strip()
-        pyautogui.write(uf)
-        pyautogui.press(["tab"])
+        self.teclado.write(uf)
+        self.teclado.press(["tab"])
 
         municipio = str(shift_data.get("cidade", "NI")).strip().upper()
         if municipio == "NÃO ESPECIFICADO (NI)":
@@ -258,13 +403,13 @@ class SismamaDigitador:
                 if unicodedata.category(ch) != "Mn"
             )
 
-        pyautogui.write(municipio)
-        pyautogui.press(["tab"] * 6)
-        pyautogui.press(["right"] * 2)  # Seleciona "biópsia/peça"
-        pyautogui.press(["tab"])
-        pyautogui.press(["right"] * 2)  # Risco elevado? (Não sabe)
-        pyautogui.press(["tab"])
-        pyautogui.press(["right"] * 2)  # Está grávida ou amamenta? (Não sabe)
+        self.teclado.write(municipio)
+        self.teclado.press(["tab"] * 6)
+        self.teclado.press(["right"] * 2)  # Seleciona "biópsia/peça"
+        self.teclado.press(["tab"])
+        self.teclado.press(["right"] * 2)  # Risco elevado? (Não sabe)
+        self.teclado.press(["tab"])
+        self.teclado.press(["right"] * 2)  # Está grávida ou amamenta? (Não sabe)
 
         janela_principal = app.window(
             title="Requisição de Exame Histopatológico - MAMA"
@@ -280,9 +425,9 @@ class SismamaDigitador:
         """
         Preenche os dados relativos às características da lesão.
         """
-        pyautogui.press(["tab"])
-        pyautogui.press([" "])
-        pyautogui.press(["tab"])
+        self.teclado.press(["tab"])
+        self.teclado.press([" "])
+        self.teclado.press(["tab"])
 
         caracteristica = str(shift_data.get("caracteristica_lesao", "NI")).strip()
         janela_principal = app.window(
@@ -299,7 +444,7 @@ class SismamaDigitador:
             painel_caracteristica.child_window(
                 title="MAMA ESQUERDA", control_type="RadioButton"
             ).click()
-        pyautogui.press(["tab"])
+        self.teclado.press(["tab"])
 
         painel_localizacao = janela_principal.child_window(
             title="Localização", control_type="Pane"
@@ -323,7 +468,7 @@ class SismamaDigitador:
             ).click()
         else:
             logger.info(f"Localização '{localizacao}' não reconhecida.")
-        pyautogui.press(["tab"])
+        self.teclado.press(["tab"])
 
         tamanho_str = str(shift_data.get("tamanho_lesao", "")).strip()
         match = re.search(r"\d+(,\d+)?", tamanho_str)
@@ -335,19 +480,19 @@ class SismamaDigitador:
 
         if tamanho is not None:
             if tamanho < 2:
-                pyautogui.press([" "])
+                self.teclado.press([" "])
             elif 2 <= tamanho <= 5:
-                pyautogui.press(["down"])
+                self.teclado.press(["down"])
             elif 5 < tamanho <= 10:
-                pyautogui.press(["down"] * 2)
+                self.teclado.press(["down"] * 2)
             elif tamanho > 10:
-                pyautogui.press(["down"] * 3)
+                self.teclado.press(["down"] * 3)
             else:
-                pyautogui.press(["down"] * 4)
-        pyautogui.press(["tab"])
-        pyautogui.press(["down"])  # Linfonodo axilar palpável: "Não"
-        pyautogui.press(["tab"])
-        pyautogui.press(["down"] * 2)  # Biópsia por agulha grossa
+                self.teclado.press(["down"] * 4)
+        self.teclado.press(["tab"])
+        self.teclado.press(["down"])  # Linfonodo axilar palpável: "Não"
+        self.teclado.press(["tab"])
+        self.teclado.press(["down"] * 2)  # Biópsia por agulha grossa
 
     def _preencher_coleta(
         self, os_number: str, shift_data: Dict[str, Any], app: Application, item_id: int
@@ -355,45 +500,45 @@ class SismamaDigitador:
         """
         Preenche os dados de coleta, número do exame e data de liberação.
         """
-        pyautogui.press(["tab"])
+        self.teclado.press(["tab"])
         data_coleta = shift_data.get("data_coleta", "").strip()
         if data_coleta:
             self._digitar_data_coleta(data_coleta)
         else:
             logger.info("Data de coleta não especificada.")
 
-        pyautogui.press(["tab"])
+        self.teclado.press(["tab"])
         time.sleep(1)
 
-        if validar_popup_data_realizacao(app, self.api_client, item_id):
+        if validar_popup_data_realizacao(app, self.api_client, item_id, teclado=self.teclado):
             logger.info("Cadastro cancelado devido ao pop-up de data de realização.")
             return False
 
-        pyautogui.press(["tab"] * 2)
+        self.teclado.press(["tab"] * 2)
         numero_exame = os_number.replace("-", "")
-        pyautogui.write(numero_exame)
+        self.teclado.write(numero_exame)
 
 
-        pyautogui.press(["tab"])
+        self.teclado.press(["tab"])
         recebido_em = shift_data.get("data_coleta", "").strip()
         if recebido_em:
             self._digitar_data_coleta(recebido_em)
         else:
             logger.info("Data de coleta (recebido_em) não especificada.")
 
-        pyautogui.press(["tab"])
-        pyautogui.press(["down"] * 2)  # Seleciona Biópsia por agulha grossa
-        pyautogui.press(["tab"])
-        pyautogui.press([" "])  # Seleciona "Satisfatório"
-        pyautogui.press(["tab"] * 2)
-        pyautogui.press(["right"])  # Microcalcificações: "Não"
-        pyautogui.press(["tab"])
-        pyautogui.press(["down"] * 10)
-        pyautogui.press(["space"])
-        pyautogui.press(["tab"] * 2)
-        pyautogui.press(["right"])
-        pyautogui.press(["enter"])  # Seleciona aba Cont.III
-        pyautogui.press(["tab"])
+        self.teclado.press(["tab"])
+        self.teclado.press(["down"] * 2)  # Seleciona Biópsia por agulha grossa
+        self.teclado.press(["tab"])
+        self.teclado.press([" "])  # Seleciona "Satisfatório"
+        self.teclado.press(["tab"] * 2)
+        self.teclado.press(["right"])  # Microcalcificações: "Não"
+        self.teclado.press(["tab"])
+        self.teclado.press(["down"] * 10)
+        self.teclado.press(["space"])
+        self.teclado.press(["tab"] * 2)
+        self.teclado.press(["right"])
+        self.teclado.press(["enter"])  # Seleciona aba Cont.III
+        self.teclado.press(["tab"])
 
         data_liberacao = shift_data.get("data_liberacao", "").strip()
         if data_liberacao:
@@ -401,9 +546,9 @@ class SismamaDigitador:
         else:
             logger.info("Data de liberação não especificada.")
 
-        pyautogui.press(["tab"])
+        self.teclado.press(["tab"])
         med_responsavel = "10304501883"
-        pyautogui.write(med_responsavel)
+        self.teclado.write(med_responsavel)
         return True
 
     def _digitar_data_coleta(self, data_str: str) -> None:
@@ -412,7 +557,7 @@ class SismamaDigitador:
         """
         try:
             dt = datetime.strptime(data_str, "%Y-%m-%dT%H:%M:%SZ")
-            pyautogui.write(dt.strftime("%d%m%Y"))
+            self.teclado.write(dt.strftime("%d%m%Y"))
         except ValueError:
             logger.info(f"Formato inválido para data: {data_str}")
 
@@ -3,11 +3,14 @@ import time
 import subprocess
 from typing import Any, List
 import ctypes
-import pygetwindow as gw
 
 from src.config.logger import logger
 from src.config.config import Config
-from src.utils.imagens import espera_imagem_aparecer
+from src.utils.janela_lote import obter_janela_lote
+from src.utils.prioridade import obter_priorizador
+
+# pygetwindow e pyautogui (via src.utils.imagens) são importados só ao abrir o
+# SIS MAMA, para que importar o runner não carregue a automação de desktop.
 
 
 def is_admin() -> bool:
@@ -25,8 +28,16 @@ class SismamaRunner:
     Responsável pelo fluxo de abertura, preenchimento e finalização do SIS MAMA.
     """
 
-    def __init__(self, api_client: Any) -> None:
+    def __init__(
+        self, api_client: Any, manter_aberto: bool = False, lease_manager: Any = None
+    ) -> None:
         self.api_client = api_client
+        # Com leases, só digita os registros reivindicados por este robô.
+        self.lease_manager = lease_manager
+        # Em modo daemon o SIS MAMA fica aberto entre execuções e só é
+        # encerrado por `encerrar()`.
+        self.manter_aberto = manter_aberto
+        self._processo = None
         self._load_config()
 
     def _load_config(self) -> None:
@@ -40,6 +51,8 @@ class SismamaRunner:
         try:
             self._processar_sismama()
         finally:
+            if self.lease_manager:
+                self.lease_manager.liberar(stage="SISMAMA")
             elapsed = time.time() - start
             logger.info(f"Tempo total SIS MAMA: {elapsed:.2f}s")
 
@@ -49,13 +62,58 @@ class SismamaRunner:
             logger.info("Nenhum dado pendente para SIS MAMA.")
             return
 
+        if self.lease_manager:
+            concedidos = self.lease_manager.reivindicar(
+                "SISMAMA", [r.get("item_id") or r.get("id") for r in pending]
+            )
+            pending = [
+                r for r in pending if (r.get("item_id") or r.get("id")) in concedidos
+            ]
+            if not pending:
+                logger.info("Registros do SIS MAMA já reivindicados por outros robôs.")
+                return
+
+        # Registros com coleta mais antiga (prazo mais próximo) primeiro
+        pending = obter_priorizador().ordenar_itens("SISMAMA", pending)
         logger.info(f"{len(pending)} registro(s) autorizado(s).")
         self._abrir_sismama()
         self._preencher_sismama(pending)
         self._finalizar_sismama()
 
+    def aplicacao_ativa(self) -> bool:
+        """
+        Verifica se o SIS MAMA aberto por este runner segue em execução e na
+        tela de cadastro, pronta para digitar (e não em um diálogo ou tela
+        deixada por uma execução anterior).
+        """
+        if self._processo is None or self._processo.poll() is not None:
+            return False
+        import pygetwindow as gw
+
+        if not gw.getWindowsWithTitle(self.window_title):
+            return False
+
+        from src.utils.imagens import espera_imagem_aparecer
+
+        if not espera_imagem_aparecer(self.cadastro_img, None, 0.9, max_tentativas=5):
+            logger.warning("SIS MAMA aberto, mas fora da tela de cadastro.")
+            return False
+        return True
+
     def _abrir_sismama(self) -> None:
+        if self.manter_aberto and self.aplicacao_ativa():
+            logger.info("Reaproveitando SIS MAMA já aberto.")
+            return
+        if self._processo is not None:
+            logger.warning("SIS MAMA não responde; será reaberto.")
+            try:
+                self.encerrar()
+            except RuntimeError:
+                # O processo já pode ter terminado sozinho.
+                pass
+
         logger.info("Abrindo SIS MAMA")
+        inicio = time.monotonic()
 
         if not is_admin():
             raise PermissionError("Privilégios de administrador são necessários.")
@@ -97,6 +155,10 @@ class SismamaRunner:
             )
             raise RuntimeError("SisMamaFB retornou erro na inicialização")
 
+        self._processo = processo
+
+        from src.utils.imagens import espera_imagem_aparecer
+
         found = espera_imagem_aparecer(self.cadastro_img, None, 0.9)
         if not found:
             arquivo = os.path.basename(self.cadastro_img)
@@ -114,8 +176,11 @@ class SismamaRunner:
             raise VisualValidationError("Falha ao validar visualmente o SIS MAMA")
         else:
             self._maximize_window()
+            obter_janela_lote().registrar_partida("SISMAMA", time.monotonic() - inicio)
 
     def _maximize_window(self) -> None:
+        import pygetwindow as gw
+
         time.sleep(1)
         windows = gw.getWindowsWithTitle(self.window_title)
         if not windows:
@@ -128,11 +193,30 @@ class SismamaRunner:
         from .sismama_digitador import SismamaDigitador
 
         logger.info("Preenchendo SIS MAMA")
-        digitador = SismamaDigitador(api_client=self.api_client)
+        digitador = SismamaDigitador(
+            api_client=self.api_client,
+            reciclar=self._reciclar_sismama,
+            reabrir=self._abrir_sismama,
+        )
         digitador.inserir_dados_sismama(data)
 
+    def _reciclar_sismama(self) -> None:
+        """Chamado pelo watchdog: encerra o SIS MAMA travado no item atual."""
+        try:
+            self.encerrar()
+        except RuntimeError:
+            # O processo já pode ter terminado sozinho.
+            pass
+
     def _finalizar_sismama(self) -> None:
+        if self.manter_aberto:
+            logger.info("SIS MAMA mantido aberto para a próxima execução.")
+            return
+        self.encerrar()
+
+    def encerrar(self) -> None:
         logger.info("Finalizando SIS MAMA")
+        self._processo = None
         result = subprocess.run(
             ["taskkill", "/IM", "SisMamaFB.exe", "/F"],
             check=False,
@@ -29,6 +29,8 @@ class ImageAnalyzer:
             model='gpt-4o',
             max_tokens=512,
             api_key=Config.OPENAI_API_KEY,
+            timeout=Config.OPENAI_TIMEOUT,
+            max_retries=Config.OPENAI_MAX_RETRIES,
         )
 
     def _encode_image(self, image_path):
@@ -4,14 +4,18 @@ from datetime import datetime
 from pathlib import Path
 
 from src.config.api_client import APIClient
-from src.config.auth_service import AuthenticationService
+from src.config.checkpoint_journal import CheckpointJournal, obter_checkpoint_journal
+from src.config.config import Config
 from src.config.logger import logger
+from src.config.token_manager import obter_token_manager
+from src.controllers.api_handler import reportar_timeout_item
+from src.utils.watchdog import obter_watchdog
 from .utils import converter_tif_para_jpg
 
 from .agent import ImageAnalyzer
 
 
-IMAGES_DIR = Path(os.getenv('BASE_IMAGE_PATH'))
+IMAGES_DIR = Path(Config.BASE_IMAGE_PATH)
 
 if not IMAGES_DIR.exists():
     logger.warning(f"Diretório base de imagens não encontrado: {IMAGES_DIR}")
@@ -22,11 +26,42 @@ class AutomacaoImageProcess:
     Utiliza OpenAI para analisar formulários médicos.
     """
 
-    def __init__(self, robot_id, auth_token, api_client):
+    def __init__(self, robot_id, token_manager, api_client):
         self.robot_id = robot_id
-        self.auth_token = auth_token
+        self.token_manager = token_manager
         self.api_client = api_client
         self.sucesso = False
+        self.watchdog = obter_watchdog()
+        self.journal = obter_checkpoint_journal()
+
+    @property
+    def auth_token(self):
+        """Token atual, renovado pelo `token_manager` quando preciso."""
+        return self.token_manager.obter_token()
+
+    def processar_item_com_prazo(self, item):
+        """
+        Processa o item sob o prazo do watchdog. Se o prazo vencer, o item,
+        se não chegou a ser concluído, vai para ERROR com o motivo de timeout.
+
+        O prazo aqui só reporta, não interrompe: não há recurso a reciclar
+        (a sessão HTTP da API é compartilhada com os outros estágios), então
+        uma chamada lenta segura o worker até os timeouts próprios da API e
+        da OpenAI, e o timeout é reportado quando `processar_item` retorna.
+
+        O item fica no journal de checkpoints de `started` (antes do STARTED)
+        até o fim: se o processo cair no meio da análise, a próxima execução
+        o devolve a PENDING.
+        """
+        prazo_item = Config.WATCHDOG_ITEM_TIMEOUTS.get('IMAGE_PROCESS')
+        item_id = item.get('id')
+        self.sucesso = False
+        self.journal.registrar('IMAGE_PROCESS', item_id, CheckpointJournal.INICIADO)
+        with self.watchdog.prazo(f'IMAGE_PROCESS item {item_id}', prazo_item) as prazo:
+            self.processar_item(item)
+        if prazo.expirado and not self.sucesso:
+            reportar_timeout_item(self.api_client, 'IMAGE_PROCESS', item_id, prazo_item)
+        self.journal.concluir('IMAGE_PROCESS', item_id)
 
     def processar_item(self, item):
         """
@@ -157,15 +192,16 @@ class AutomacaoImageProcess:
             logger.error(f'Falha ao atualizar item {item_id} para {status}.')
             return False
 
-    def processar_pendentes(self):
+    def processar_pendentes(self, tarefas=None):
         """
-        Obtém itens pendentes da API e processa-os.
+        Obtém itens pendentes da API e processa-os. Se `tarefas` for
+        informado (ex.: já filtrado pelos leases do robô), usa essa lista.
         """
         logger.info(
             'Verificando itens pendentes para processamento de imagens...'
         )
 
-        items_pendentes = self.api_client.get_pending_items(
+        items_pendentes = tarefas if tarefas is not None else self.api_client.get_pending_items(
             stage='IMAGE_PROCESS'
         )
         logger.info(f'RESP do get_pending_items: {items_pendentes!r} (type={type(items_pendentes)})')
@@ -183,24 +219,25 @@ class AutomacaoImageProcess:
             )
 
             for item in items:
-                self.processar_item(item)
+                if self.watchdog.esgotado('IMAGE_PROCESS'):
+                    logger.warning(
+                        'Prazo do estágio IMAGE_PROCESS esgotado; itens restantes ficam para o próximo ciclo.'
+                    )
+                    return
+                self.processar_item_com_prazo(item)
 
 
 if __name__ == '__main__':
     """
     Inicializa o processamento de imagens caso o script seja executado diretamente.
     """
-    USERNAME = os.getenv('API_USERNAME')
-    PASSWORD = os.getenv('API_PASSWORD')
-
-    auth_response = AuthenticationService.authenticate(USERNAME, PASSWORD)
-    if not auth_response:
+    token_manager = obter_token_manager()
+    if not token_manager.obter_token():
         logger.error('Falha na autenticação da API. Verifique as credenciais.')
     else:
-        auth_token = auth_response.get('access')
-        api_client = APIClient(auth_token)
+        api_client = APIClient(token_manager=token_manager)
 
         automacao_imagens = AutomacaoImageProcess(
-            robot_id=1, auth_token=auth_token, api_client=api_client
+            robot_id=1, token_manager=token_manager, api_client=api_client
         )
         automacao_imagens.processar_pendentes()
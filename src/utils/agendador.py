@@ -0,0 +1,211 @@
+import os
+import random
+import socket
+import threading
+import time
+
+from src.config.logger import logger
+
+
+class AgendadorAdaptativo:
+    """
+    Agendador com intervalo adaptativo por estágio.
+
+    A cada ciclo chama `executar(estagios)` apenas com os estágios vencidos;
+    a função deve retornar {estágio: itens pendentes encontrados}. Enquanto
+    o backlog de um estágio muda de um ciclo para o outro, ele volta a rodar
+    após `intervalo_minimo`. Sem trabalho (ou com o mesmo backlog parado,
+    ex.: registros aguardando autorização), o intervalo dobra a cada ciclo,
+    com variação aleatória de ±`jitter`, até o teto do estágio em
+    `intervalos_maximos`.
+
+    `limite_intervalo(estagio)`, se informado, pode encurtar o intervalo
+    calculado (ex.: a janela de lote pede uma nova verificação quando o item
+    mais antigo atingir a espera máxima); retorna None para não interferir.
+
+    Com `assincrono=True`, `executar` apenas despacha os estágios (ex.:
+    `Supervisor.executar`) e retorna só os que não chegaram a rodar; cada
+    um dos demais fica em execução até `concluir(estagio, pendentes,
+    limite)`, que o reprograma sozinho, sem esperar os outros estágios.
+
+    `despertar()` antecipa todos os estágios para o próximo ciclo. Também
+    despertam o agendador: alterar `arquivo_despertar` (ex.: `touch`) e
+    abrir uma conexão TCP em `127.0.0.1:porta_despertar`.
+    """
+
+    def __init__(
+        self,
+        executar,
+        estagios,
+        intervalo_minimo=1.0,
+        intervalo_inicial=5.0,
+        intervalos_maximos=None,
+        fator=2.0,
+        jitter=0.2,
+        arquivo_despertar=None,
+        porta_despertar=None,
+        limite_intervalo=None,
+        assincrono=False,
+    ):
+        self.executar = executar
+        self.estagios = list(estagios)
+        self.intervalo_minimo = intervalo_minimo
+        self.intervalo_inicial = intervalo_inicial
+        self.intervalos_maximos = intervalos_maximos or {}
+        self.fator = fator
+        self.jitter = jitter
+        self.arquivo_despertar = arquivo_despertar
+        self.porta_despertar = porta_despertar
+        self.limite_intervalo = limite_intervalo
+        self.assincrono = assincrono
+
+        agora = time.monotonic()
+        self._intervalos = {estagio: 0.0 for estagio in self.estagios}
+        self._proximas = {estagio: agora for estagio in self.estagios}
+        self._backlogs = {}
+        # Estágios despachados e ainda sem `concluir`: {estágio: instante}
+        self._despachos = {}
+        self._ultimo_despertar = 0.0
+        self._despertar = threading.Event()
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._socket = None
+
+    def despertar(self, motivo='sinal externo'):
+        """Faz todos os estágios rodarem no próximo ciclo."""
+        logger.info(f'Agendador despertado: {motivo}.')
+        with self._lock:
+            agora = time.monotonic()
+            self._ultimo_despertar = agora
+            for estagio in self.estagios:
+                self._intervalos[estagio] = 0.0
+                self._proximas[estagio] = agora
+        self._despertar.set()
+
+    def parar(self):
+        self._parar.set()
+        self._despertar.set()
+
+    def proximo_intervalo(self, estagio, pendentes):
+        """Calcula o intervalo até a próxima execução do estágio."""
+        anterior = self._backlogs.get(estagio)
+        self._backlogs[estagio] = pendentes
+        if pendentes and pendentes != anterior:
+            return self.intervalo_minimo
+
+        maximo = self.intervalos_maximos.get(estagio, 60.0)
+        atual = self._intervalos[estagio]
+        intervalo = min(max(atual * self.fator, self.intervalo_inicial), maximo)
+        self._intervalos[estagio] = intervalo
+        variacao = random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(self.intervalo_minimo, min(intervalo * variacao, maximo))
+
+    def ciclo(self):
+        """Executa os estágios vencidos e reprograma cada um deles."""
+        with self._lock:
+            agora = time.monotonic()
+            vencidos = [e for e in self.estagios if self._proximas[e] <= agora]
+        if not vencidos:
+            return
+
+        inicio = time.monotonic()
+        try:
+            resultado = self.executar(vencidos) or {}
+        except Exception as e:
+            logger.error(f'Erro no ciclo do agendador: {e}')
+            resultado = {}
+
+        with self._lock:
+            despachados = [
+                e for e in vencidos if self.assincrono and e not in resultado
+            ]
+            for estagio in despachados:
+                self._despachos.setdefault(estagio, inicio)
+            if self._ultimo_despertar >= inicio:
+                # Despertado durante a execução: roda de novo em seguida.
+                return
+            agora = time.monotonic()
+            for estagio in vencidos:
+                if estagio in despachados:
+                    # Em execução: reprogramado por `concluir`
+                    self._proximas[estagio] = float('inf')
+                    continue
+                limite = self.limite_intervalo(estagio) if self.limite_intervalo else None
+                self._reprogramar(estagio, resultado.get(estagio, 0), limite, agora)
+
+    def concluir(self, estagio, pendentes, limite=None):
+        """
+        Reprograma um estágio despachado em modo assíncrono assim que ele
+        termina. `limite` (s), se informado, encurta o intervalo como em
+        `limite_intervalo`.
+        """
+        with self._lock:
+            despacho = self._despachos.pop(estagio, None)
+            agora = time.monotonic()
+            if despacho is not None and self._ultimo_despertar >= despacho:
+                # Despertado durante a execução: roda de novo em seguida.
+                self._proximas[estagio] = agora
+            else:
+                self._reprogramar(estagio, pendentes, limite, agora)
+        self._despertar.set()
+
+    def _reprogramar(self, estagio, pendentes, limite, agora):
+        intervalo = self.proximo_intervalo(estagio, pendentes)
+        if limite is not None:
+            intervalo = max(self.intervalo_minimo, min(intervalo, limite))
+        self._proximas[estagio] = agora + intervalo
+        logger.debug(f'{estagio}: próxima verificação em {intervalo:.1f}s.')
+
+    def _espera(self):
+        """Segundos até o próximo estágio vencer; None se todos estão em execução."""
+        with self._lock:
+            proxima = min(self._proximas.values())
+        if proxima == float('inf'):
+            return None
+        return max(0.0, proxima - time.monotonic())
+
+    def executar_para_sempre(self):
+        """Loop principal; retorna após `parar()`."""
+        self._iniciar_despertadores()
+        try:
+            while not self._parar.is_set():
+                self.ciclo()
+                self._despertar.wait(self._espera())
+                self._despertar.clear()
+        finally:
+            if self._socket is not None:
+                self._socket.close()
+
+    def _iniciar_despertadores(self):
+        if self.arquivo_despertar:
+            threading.Thread(
+                target=self._observar_arquivo, name='agendador-arquivo', daemon=True
+            ).start()
+        if self.porta_despertar:
+            self._socket = socket.create_server(('127.0.0.1', self.porta_despertar))
+            threading.Thread(
+                target=self._escutar_socket, name='agendador-socket', daemon=True
+            ).start()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.arquivo_despertar).st_mtime_ns
+        except OSError:
+            return None
+
+    def _observar_arquivo(self):
+        ultimo = self._mtime()
+        while not self._parar.wait(1.0):
+            atual = self._mtime()
+            if atual is not None and atual != ultimo:
+                self.despertar(f'arquivo {self.arquivo_despertar} alterado')
+            ultimo = atual
+
+    def _escutar_socket(self):
+        while not self._parar.is_set():
+            try:
+                conexao, _ = self._socket.accept()
+            except OSError:
+                return
+            conexao.close()
+            self.despertar(f'conexão na porta {self.porta_despertar}')
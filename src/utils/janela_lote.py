@@ -0,0 +1,143 @@
+import collections
+import statistics
+import threading
+import time
+
+from src.config.config import Config
+from src.config.logger import logger
+
+
+class JanelaLote:
+    """
+    Política de lote por estágio para amortizar a partida de recursos caros.
+
+    Abrir o Chrome (com `ChromeDriverManager().install()` e login) ou o SIS
+    MAMA custa dezenas de segundos. `avaliar()` só libera o estágio quando há
+    `minimo_itens` itens pendentes ou quando o mais antigo já espera há
+    `espera_maxima` segundos; com o recurso já aberto (modo daemon) libera
+    na hora, pois não há partida a pagar.
+
+    Para mostrar a troca entre latência e vazão, registra por estágio a
+    espera de cada item até o início do lote, o tamanho dos lotes e o tempo
+    de cada partida a frio (`registrar_partida`), e loga o custo de partida
+    por item a cada lote.
+    """
+
+    def __init__(self, minimo_itens=None, espera_maxima=None, relogio=time.monotonic):
+        self.minimo_itens = dict(
+            minimo_itens if minimo_itens is not None else Config.LOTE_MIN_ITENS
+        )
+        self.espera_maxima = dict(
+            espera_maxima if espera_maxima is not None else Config.LOTE_ESPERA_MAXIMA
+        )
+        self.relogio = relogio
+        # {estágio: {item_id: primeira vez visto pendente}}
+        self._vistos = collections.defaultdict(dict)
+        self._estatisticas = collections.defaultdict(
+            lambda: {
+                'lotes': 0,
+                'itens': 0,
+                'adiamentos': 0,
+                'esperas': collections.deque(maxlen=1000),
+                'partidas': collections.deque(maxlen=100),
+            }
+        )
+        self._lock = threading.Lock()
+
+    def avaliar(self, stage, item_ids, recurso_ativo=False):
+        """
+        Registra os itens pendentes do estágio e indica se ele deve rodar
+        agora (True) ou aguardar mais itens (False).
+        """
+        agora = self.relogio()
+        ids = set(item_ids)
+        with self._lock:
+            vistos = self._vistos[stage]
+            for item_id in list(vistos):
+                if item_id not in ids:
+                    del vistos[item_id]
+            for item_id in ids:
+                vistos.setdefault(item_id, agora)
+            if not ids:
+                return False
+
+            minimo = self.minimo_itens.get(stage, 1)
+            espera = self.espera_maxima.get(stage, 0)
+            mais_antigo = agora - min(vistos.values())
+            if not recurso_ativo and len(ids) < minimo and mais_antigo < espera:
+                self._estatisticas[stage]['adiamentos'] += 1
+                logger.info(
+                    f'{stage}: {len(ids)} item(ns) aguardando lote de {minimo} '
+                    f'(mais antigo há {mais_antigo:.0f}s de {espera:.0f}s).'
+                )
+                return False
+
+            esperas = [agora - vistos[item_id] for item_id in ids]
+            vistos.clear()
+            estatisticas = self._estatisticas[stage]
+            estatisticas['lotes'] += 1
+            estatisticas['itens'] += len(ids)
+            estatisticas['esperas'].extend(esperas)
+        logger.info(f'{stage}: iniciando lote de {len(ids)} item(ns). {self.resumo(stage)}')
+        return True
+
+    def registrar_partida(self, stage, segundos):
+        """Registra quanto custou abrir o recurso do estágio a frio."""
+        with self._lock:
+            self._estatisticas[stage]['partidas'].append(segundos)
+
+    def proxima_verificacao(self, stage):
+        """Segundos até o item mais antigo do estágio atingir a espera máxima."""
+        with self._lock:
+            vistos = self._vistos.get(stage)
+            if not vistos:
+                return None
+            decorrido = self.relogio() - min(vistos.values())
+        return max(0.0, self.espera_maxima.get(stage, 0) - decorrido)
+
+    def relatorio(self, stage):
+        """Estatísticas acumuladas do estágio (tempos em segundos)."""
+        with self._lock:
+            estatisticas = self._estatisticas[stage]
+            esperas = sorted(estatisticas['esperas'])
+            partidas = list(estatisticas['partidas'])
+            lotes, itens = estatisticas['lotes'], estatisticas['itens']
+            adiamentos = estatisticas['adiamentos']
+        partida_media = statistics.mean(partidas) if partidas else None
+        return {
+            'lotes': lotes,
+            'itens': itens,
+            'itens_por_lote': itens / lotes if lotes else 0.0,
+            'adiamentos': adiamentos,
+            'espera_media': statistics.mean(esperas) if esperas else 0.0,
+            'espera_p95': esperas[int(0.95 * (len(esperas) - 1))] if esperas else 0.0,
+            'partida_media': partida_media,
+            # Tempo total de partidas dividido pelos itens processados
+            'partida_por_item': sum(partidas) / itens if partidas and itens else None,
+        }
+
+    def resumo(self, stage):
+        r = self.relatorio(stage)
+        texto = (
+            f'Acumulado: {r["lotes"]} lote(s), {r["itens_por_lote"]:.1f} item(ns)/lote, '
+            f'espera média {r["espera_media"]:.0f}s (p95 {r["espera_p95"]:.0f}s)'
+        )
+        if r['partida_por_item'] is not None:
+            texto += (
+                f', partida a frio média {r["partida_media"]:.0f}s '
+                f'({r["partida_por_item"]:.1f}s por item)'
+            )
+        return texto + '.'
+
+
+_janela_padrao = None
+_janela_lock = threading.Lock()
+
+
+def obter_janela_lote():
+    """Retorna a janela de lote compartilhada do processo."""
+    global _janela_padrao
+    with _janela_lock:
+        if _janela_padrao is None:
+            _janela_padrao = JanelaLote()
+        return _janela_padrao
@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import datetime
+
+from src.config.config import Config
+from src.config.logger import logger
+
+
+def _timestamp(valor):
+    """Converte data ISO (com ou sem `Z`) ou dd/mm/aaaa em timestamp; None se inválida."""
+    if not valor or not isinstance(valor, str):
+        return None
+    valor = valor.strip()
+    try:
+        return datetime.fromisoformat(valor.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(valor[:10], '%d/%m/%Y').timestamp()
+    except ValueError:
+        return None
+
+
+class PriorizadorSLA:
+    """
+    Ordena os itens de um estágio entre todas as tarefas pelo prazo (SLA).
+
+    O prazo de cada item é, nesta ordem de preferência:
+      - `data_coleta` (dos dados do SHIFT) + `sla_coleta` dias;
+      - `created_at` do item (ou da tarefa) + o SLA do estágio em horas;
+      - o momento em que o item foi visto pela primeira vez + o SLA do estágio.
+    Os itens saem do prazo mais próximo (ou já vencido) para o mais distante.
+
+    Contra inanição, um item que espera há mais de `espera_maxima` horas
+    (desde o `created_at` ou desde que foi visto) passa a concorrer com o
+    prazo limitado a esse ponto, então não fica para trás indefinidamente
+    atrás de itens novos com coleta antiga.
+    """
+
+    def __init__(self, sla_coleta=None, sla_estagios=None, espera_maxima=None):
+        self.sla_coleta = (
+            sla_coleta if sla_coleta is not None else Config.SLA_COLETA_DIAS
+        ) * 86400
+        self.sla_estagios = {
+            estagio: horas * 3600
+            for estagio, horas in (sla_estagios or Config.SLA_ESTAGIO_HORAS).items()
+        }
+        self.espera_maxima = (
+            espera_maxima if espera_maxima is not None else Config.SLA_ESPERA_MAXIMA
+        ) * 3600
+        # {(estágio, item_id): primeira vez visto}
+        self._vistos = {}
+        self._lock = threading.Lock()
+
+    def prazo(self, stage, item, task=None, agora=None):
+        """Prazo efetivo (timestamp) do item, já com a regra contra inanição."""
+        agora = agora if agora is not None else time.time()
+        with self._lock:
+            visto = self._vistos.setdefault((stage, item.get('id')), agora)
+        chegada = (
+            _timestamp(item.get('created_at'))
+            or _timestamp((task or {}).get('created_at'))
+            or visto
+        )
+        coleta = _timestamp((item.get('shift_data') or {}).get('data_coleta'))
+        if coleta is not None:
+            prazo = coleta + self.sla_coleta
+        else:
+            prazo = chegada + self.sla_estagios.get(stage, 86400)
+        return min(prazo, chegada + self.espera_maxima)
+
+    def ordenar_itens(self, stage, itens):
+        """Itens soltos (ex.: `items/sismama-data/`) do mais urgente ao menos urgente."""
+        agora = time.time()
+        chaves = [
+            (self.prazo(stage, item, agora=agora), str(item.get('id'))) for item in itens
+        ]
+        self._esquecer(stage, {item.get('id') for item in itens})
+        self._registrar_atrasos(stage, [c for c, _ in chaves], agora)
+        return [item for _, item in sorted(zip(chaves, itens), key=lambda par: par[0])]
+
+    def priorizar_tarefas(self, stage, tarefas):
+        """
+        Reordena os itens de todas as tarefas por urgência e devolve a lista
+        no formato de `items/by-stage/`: uma tarefa pode aparecer em mais de
+        um trecho, cada um com os itens consecutivos dela.
+        """
+        agora = time.time()
+        pares = [
+            (self.prazo(stage, item, task, agora), str(item.get('id')), task, item)
+            for task in tarefas
+            for item in task.get('items', [])
+        ]
+        self._esquecer(stage, {item.get('id') for *_, item in pares})
+        self._registrar_atrasos(stage, [p[0] for p in pares], agora)
+        pares.sort(key=lambda par: par[:2])
+
+        trechos = []
+        for _, _, task, item in pares:
+            if trechos and trechos[-1]['id'] == task.get('id'):
+                trechos[-1]['items'].append(item)
+            else:
+                trechos.append({**task, 'items': [item]})
+        return trechos
+
+    def _esquecer(self, stage, presentes):
+        """Descarta itens do estágio que não estão mais pendentes."""
+        with self._lock:
+            for chave in list(self._vistos):
+                if chave[0] == stage and chave[1] not in presentes:
+                    del self._vistos[chave]
+
+    def _registrar_atrasos(self, stage, prazos, agora):
+        atrasados = sum(1 for prazo in prazos if prazo <= agora)
+        if atrasados:
+            logger.warning(
+                f'{stage}: {atrasados} item(ns) com prazo vencido; processados primeiro.'
+            )
+
+
+_priorizador_padrao = None
+_priorizador_lock = threading.Lock()
+
+
+def obter_priorizador():
+    """Retorna o priorizador compartilhado, que lembra quando cada item foi visto."""
+    global _priorizador_padrao
+    with _priorizador_lock:
+        if _priorizador_padrao is None:
+            _priorizador_padrao = PriorizadorSLA()
+        return _priorizador_padrao
@@ -0,0 +1,572 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import threading
+import time
+
+from src.config.config import Config
+from src.config.logger import logger
+
+
+def servir(conexao, executar, proxima_verificacao=None):
+    """
+    Loop do processo de estágio: a cada pedido do supervisor chama
+    `executar()` e devolve ('resultado', pendentes, próxima verificação) pelo
+    mesmo canal. `proxima_verificacao()`, se informada, diz em quantos
+    segundos o estágio quer ser consultado de novo (ex.: a janela de lote do
+    worker, `JanelaLote.proxima_verificacao`), ou None. Termina ao receber
+    'parar' ou quando o supervisor some (canal fechado).
+    """
+    while True:
+        try:
+            mensagem = conexao.recv()
+        except (EOFError, OSError):
+            return
+        if mensagem[0] == 'parar':
+            return
+        try:
+            pendentes = executar()
+            proxima = proxima_verificacao() if proxima_verificacao else None
+            resposta = ('resultado', pendentes, proxima)
+        except Exception as e:
+            logger.exception(f'Erro no processo do estágio: {e}')
+            resposta = ('erro', f'{type(e).__name__}: {e}')
+        try:
+            conexao.send(resposta)
+        except (BrokenPipeError, OSError):
+            return
+
+
+def _entrada(alvo, nome, conexao):
+    if os.name != 'nt':
+        # Grupo próprio: ao reiniciar, o Chrome e o chromedriver vão junto
+        os.setpgrp()
+    alvo(nome, conexao)
+
+
+def _arvore(pid, pais):
+    """`pid` e todos os seus descendentes, dado {pid: ppid}."""
+    arvore = {pid}
+    crescendo = True
+    while crescendo:
+        crescendo = False
+        for filho, pai in pais.items():
+            if pai in arvore and filho not in arvore:
+                arvore.add(filho)
+                crescendo = True
+    return arvore
+
+
+def _uso_posix(pid):
+    """
+    (memória residente em bytes, tempo de CPU em s) do processo e de todos
+    os seus descendentes, lidos de /proc; None se o processo não existe.
+    """
+    pagina = os.sysconf('SC_PAGE_SIZE')
+    ticks = os.sysconf('SC_CLK_TCK')
+    processos = {}
+    for entrada in os.listdir('/proc'):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entrada}/stat') as f:
+                campos = f.read().rsplit(')', 1)[1].split()
+            with open(f'/proc/{entrada}/statm') as f:
+                residente = int(f.read().split()[1]) * pagina
+        except (OSError, IndexError, ValueError):
+            continue
+        # campos[1] é o ppid; [11] e [12] são utime e stime
+        processos[int(entrada)] = (
+            int(campos[1]),
+            residente,
+            (int(campos[11]) + int(campos[12])) / ticks,
+        )
+    if pid not in processos:
+        return None
+    arvore = _arvore(pid, {p: dados[0] for p, dados in processos.items()})
+    return (
+        sum(processos[p][1] for p in arvore),
+        sum(processos[p][2] for p in arvore),
+    )
+
+
+def _memoria_windows(pid):
+    """Working set (bytes) do processo e descendentes; None se não existe."""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ('dwSize', wintypes.DWORD),
+            ('cntUsage', wintypes.DWORD),
+            ('th32ProcessID', wintypes.DWORD),
+            ('th32DefaultHeapID', ctypes.c_size_t),
+            ('th32ModuleID', wintypes.DWORD),
+            ('cntThreads', wintypes.DWORD),
+            ('th32ParentProcessID', wintypes.DWORD),
+            ('pcPriClassBase', ctypes.c_long),
+            ('dwFlags', wintypes.DWORD),
+            ('szExeFile', ctypes.c_wchar * 260),
+        ]
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+            (nome, ctypes.c_size_t)
+            for nome in (
+                'PeakWorkingSetSize',
+                'WorkingSetSize',
+                'QuotaPeakPagedPoolUsage',
+                'QuotaPagedPoolUsage',
+                'QuotaPeakNonPagedPoolUsage',
+                'QuotaNonPagedPoolUsage',
+                'PagefileUsage',
+                'PeakPagefileUsage',
+            )
+        ]
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    psapi = ctypes.WinDLL('psapi', use_last_error=True)
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+
+    # TH32CS_SNAPPROCESS
+    snapshot = kernel32.CreateToolhelp32Snapshot(0x2, 0)
+    entrada = PROCESSENTRY32W()
+    entrada.dwSize = ctypes.sizeof(entrada)
+    pais = {}
+    existe = kernel32.Process32FirstW(snapshot, ctypes.byref(entrada))
+    while existe:
+        pais[entrada.th32ProcessID] = entrada.th32ParentProcessID
+        existe = kernel32.Process32NextW(snapshot, ctypes.byref(entrada))
+    kernel32.CloseHandle(snapshot)
+    if pid not in pais:
+        return None
+
+    total = 0
+    for processo in _arvore(pid, pais):
+        # PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ
+        handle = kernel32.OpenProcess(0x1000 | 0x0010, False, processo)
+        if not handle:
+            continue
+        contadores = PROCESS_MEMORY_COUNTERS()
+        contadores.cb = ctypes.sizeof(contadores)
+        if psapi.GetProcessMemoryInfo(handle, ctypes.byref(contadores), contadores.cb):
+            total += contadores.WorkingSetSize
+        kernel32.CloseHandle(handle)
+    return total
+
+
+def memoria_arvore(pid):
+    """
+    Memória residente (bytes) do processo e de todos os seus descendentes,
+    ex.: chromedriver e os processos do Chrome; None se o processo não existe.
+    """
+    if os.name == 'nt':
+        return _memoria_windows(pid)
+    uso = _uso_posix(pid)
+    return uso[0] if uso is not None else None
+
+
+def _limitar_windows(pid, memoria_maxima, cpu_maxima):
+    """
+    Coloca o processo em um Job Object com teto de memória para o job
+    inteiro (o Chrome iniciado pelo worker herda o job) e teto rígido de
+    CPU, e que mata todos os processos quando o handle é fechado. Retorna o
+    handle do job, ou None se não foi possível criá-lo.
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    class IO_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            (nome, ctypes.c_ulonglong)
+            for nome in (
+                'ReadOperationCount',
+                'WriteOperationCount',
+                'OtherOperationCount',
+                'ReadTransferCount',
+                'WriteTransferCount',
+                'OtherTransferCount',
+            )
+        ]
+
+    class JOBOBJECT_BASIC_LIMIT_INFORMATION(ctypes.Structure):
+        _fields_ = [
+            ('PerProcessUserTimeLimit', ctypes.c_int64),
+            ('PerJobUserTimeLimit', ctypes.c_int64),
+            ('LimitFlags', wintypes.DWORD),
+            ('MinimumWorkingSetSize', ctypes.c_size_t),
+            ('MaximumWorkingSetSize', ctypes.c_size_t),
+            ('ActiveProcessLimit', wintypes.DWORD),
+            ('Affinity', ctypes.c_size_t),
+            ('PriorityClass', wintypes.DWORD),
+            ('SchedulingClass', wintypes.DWORD),
+        ]
+
+    class JOBOBJECT_EXTENDED_LIMIT_INFORMATION(ctypes.Structure):
+        _fields_ = [
+            ('BasicLimitInformation', JOBOBJECT_BASIC_LIMIT_INFORMATION),
+            ('IoInfo', IO_COUNTERS),
+            ('ProcessMemoryLimit', ctypes.c_size_t),
+            ('JobMemoryLimit', ctypes.c_size_t),
+            ('PeakProcessMemoryUsed', ctypes.c_size_t),
+            ('PeakJobMemoryUsed', ctypes.c_size_t),
+        ]
+
+    class JOBOBJECT_CPU_RATE_CONTROL_INFORMATION(ctypes.Structure):
+        _fields_ = [('ControlFlags', wintypes.DWORD), ('CpuRate', wintypes.DWORD)]
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+
+    job = kernel32.CreateJobObjectW(None, None)
+    if not job:
+        return None
+
+    limites = JOBOBJECT_EXTENDED_LIMIT_INFORMATION()
+    # JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+    limites.BasicLimitInformation.LimitFlags = 0x2000
+    if memoria_maxima:
+        # JOB_OBJECT_LIMIT_JOB_MEMORY
+        limites.BasicLimitInformation.LimitFlags |= 0x200
+        limites.JobMemoryLimit = int(memoria_maxima)
+    # JobObjectExtendedLimitInformation = 9
+    kernel32.SetInformationJobObject(job, 9, ctypes.byref(limites), ctypes.sizeof(limites))
+
+    if cpu_maxima:
+        cpu = JOBOBJECT_CPU_RATE_CONTROL_INFORMATION()
+        # ENABLE | HARD_CAP; CpuRate em centésimos de ponto percentual
+        cpu.ControlFlags = 0x1 | 0x4
+        cpu.CpuRate = max(1, min(10000, int(cpu_maxima * 10000)))
+        # JobObjectCpuRateControlInformation = 15
+        kernel32.SetInformationJobObject(job, 15, ctypes.byref(cpu), ctypes.sizeof(cpu))
+
+    # PROCESS_SET_QUOTA | PROCESS_TERMINATE
+    processo = kernel32.OpenProcess(0x0100 | 0x0001, False, pid)
+    atribuido = bool(processo) and kernel32.AssignProcessToJobObject(job, processo)
+    if processo:
+        kernel32.CloseHandle(processo)
+    if not atribuido:
+        kernel32.CloseHandle(job)
+        return None
+    return job
+
+
+def _fechar_job(job):
+    import ctypes
+
+    ctypes.WinDLL('kernel32').CloseHandle(job)
+
+
+class _Worker:
+    def __init__(self, nome):
+        self.nome = nome
+        self.processo = None
+        self.conexao = None
+        self.job = None
+        self.falhas = 0
+        self.proximo_inicio = 0.0
+        self.motivo_reinicio = None
+        # Instante em que a execução em andamento foi pedida (None se livre)
+        self.inicio_execucao = None
+        # (instante, CPU acumulada) da última amostra do monitor
+        self.amostra_cpu = None
+        self.acima_cpu_desde = None
+
+
+class Supervisor:
+    """
+    Mantém cada estágio em um processo próprio, com o scheduler só como
+    despachante.
+
+    `alvo(nome, conexao)` é a função (de módulo, para o `spawn`) que roda no
+    processo do estágio, normalmente via `servir()`. O trabalho e o
+    resultado trafegam por um `Pipe` com mensagens curtas: o supervisor
+    manda ('executar',) e recebe ('resultado', pendentes, próxima
+    verificação) ou ('erro', texto); os itens em si o worker busca direto
+    na API. `executar()` só despacha os estágios; uma thread coletora
+    entrega cada resposta a `ao_concluir(estágio, pendentes, próxima
+    verificação)` assim que aquele worker termina, sem esperar os demais.
+
+    Limites por worker (processo e descendentes, como o Chrome):
+      - no Windows, um Job Object com teto de memória (alocações acima dele
+        falham e o worker cai) e teto rígido de CPU, aplicado pelo sistema;
+      - nos demais, o monitor amostra a árvore de processos a cada
+        `intervalo_monitor` s e reinicia o worker que passar de
+        `memoria_maxima` ou ficar acima de `cpu_maxima` por `janela_cpu` s.
+    `cpu_maxima` é a fração da máquina toda (0.5 = metade dos núcleos).
+
+    Um worker que cai, estoura o prazo ou os limites é encerrado com a
+    árvore toda e só volta após um backoff exponencial (`backoff_inicial`
+    dobrando até `backoff_maximo`); até lá o estágio é pulado. O backoff
+    zera na primeira execução bem-sucedida.
+    """
+
+    def __init__(
+        self,
+        alvo,
+        nomes,
+        memoria_maxima=None,
+        cpu_maxima=None,
+        backoff_inicial=None,
+        backoff_maximo=None,
+        prazos=None,
+        intervalo_monitor=None,
+        janela_cpu=None,
+        ao_falhar=None,
+        ao_concluir=None,
+    ):
+        self.alvo = alvo
+        self.memoria_maxima = (
+            memoria_maxima
+            if memoria_maxima is not None
+            else Config.SUPERVISOR_MEMORIA_MAXIMA_MB * 1024 * 1024
+        )
+        self.cpu_maxima = cpu_maxima if cpu_maxima is not None else Config.SUPERVISOR_CPU_MAXIMA
+        self.backoff_inicial = (
+            backoff_inicial if backoff_inicial is not None else Config.SUPERVISOR_BACKOFF_INICIAL
+        )
+        self.backoff_maximo = (
+            backoff_maximo if backoff_maximo is not None else Config.SUPERVISOR_BACKOFF_MAXIMO
+        )
+        # Tempo máximo de uma execução; 0 ou None espera indefinidamente
+        self.prazos = dict(prazos if prazos is not None else Config.SUPERVISOR_PRAZOS)
+        self.intervalo_monitor = (
+            intervalo_monitor
+            if intervalo_monitor is not None
+            else Config.SUPERVISOR_INTERVALO_MONITOR
+        )
+        self.janela_cpu = janela_cpu if janela_cpu is not None else Config.SUPERVISOR_JANELA_CPU
+        self.ao_falhar = ao_falhar
+        # ao_concluir(estágio, pendentes, próxima verificação em s ou None)
+        self.ao_concluir = ao_concluir
+        self._contexto = multiprocessing.get_context('spawn')
+        self._workers = {nome: _Worker(nome) for nome in nomes}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._despachado = threading.Event()
+        self._monitor = None
+        self._coletor = None
+
+    def executar(self, nomes=None):
+        """
+        Pede a cada worker livre uma execução do seu estágio e retorna sem
+        esperar por ela. O retorno traz só os estágios que não puderam rodar
+        (0 pendentes: backoff ou canal fechado); os despachados, e os que já
+        estavam em execução, chegam depois por `ao_concluir`.
+        """
+        self._iniciar_monitor()
+        self._iniciar_coletor()
+        resultado = {}
+        for nome in self._workers if nomes is None else nomes:
+            worker = self._workers[nome]
+            if worker.inicio_execucao is not None:
+                continue  # Ainda rodando o pedido anterior
+            if not self._garantir(worker):
+                resultado[nome] = 0
+                continue
+            try:
+                worker.conexao.send(('executar',))
+            except (BrokenPipeError, OSError) as e:
+                with self._lock:
+                    self._falhou(worker, f'canal fechado ({e})')
+                resultado[nome] = 0
+                continue
+            worker.inicio_execucao = time.monotonic()
+        self._despachado.set()
+        return resultado
+
+    def encerrar(self, espera=10.0):
+        """Pede a cada worker que pare e encerra à força quem não sair a tempo."""
+        self._parar.set()
+        for worker in self._workers.values():
+            if worker.processo is None:
+                continue
+            try:
+                worker.conexao.send(('parar',))
+            except (BrokenPipeError, OSError):
+                pass
+        limite = time.monotonic() + espera
+        for worker in self._workers.values():
+            if worker.processo is not None:
+                worker.processo.join(max(0.0, limite - time.monotonic()))
+                self._derrubar(worker)
+
+    def _garantir(self, worker):
+        """Sobe o processo do worker se preciso; False se ainda em backoff."""
+        with self._lock:
+            if worker.motivo_reinicio:
+                # Estourou um limite entre execuções; o monitor só marca
+                self._falhou(worker, worker.motivo_reinicio)
+            elif worker.processo is not None and worker.processo.is_alive():
+                return True
+            if worker.processo is not None:
+                self._falhou(
+                    worker, f'processo saiu com código {worker.processo.exitcode}'
+                )
+            espera = worker.proximo_inicio - time.monotonic()
+            if espera > 0:
+                logger.info(f'Worker {worker.nome} em backoff; reinicia em {espera:.0f}s.')
+                return False
+
+            ponta_pai, ponta_filho = self._contexto.Pipe()
+            processo = self._contexto.Process(
+                target=_entrada,
+                args=(self.alvo, worker.nome, ponta_filho),
+                name=f'worker-{worker.nome}',
+            )
+            processo.start()
+            ponta_filho.close()
+            worker.processo, worker.conexao = processo, ponta_pai
+            worker.motivo_reinicio = None
+            worker.amostra_cpu = worker.acima_cpu_desde = None
+            if os.name == 'nt':
+                worker.job = _limitar_windows(processo.pid, self.memoria_maxima, self.cpu_maxima)
+                if worker.job is None:
+                    logger.warning(
+                        f'Worker {worker.nome}: não foi possível aplicar os limites do Job Object.'
+                    )
+            logger.info(f'Worker {worker.nome} iniciado (pid {processo.pid}).')
+            return True
+
+    def _iniciar_coletor(self):
+        if self._coletor is not None:
+            return
+        self._coletor = threading.Thread(
+            target=self._loop_coleta, name='supervisor-coletor', daemon=True
+        )
+        self._coletor.start()
+
+    def _loop_coleta(self):
+        while not self._parar.is_set():
+            ocupados = [w for w in self._workers.values() if w.inicio_execucao is not None]
+            if not ocupados:
+                self._despachado.wait(1.0)
+                self._despachado.clear()
+                continue
+            try:
+                # Timeout curto: workers despachados depois entram na próxima volta
+                multiprocessing.connection.wait(
+                    [w.conexao for w in ocupados if w.conexao is not None], timeout=0.25
+                )
+            except OSError:
+                pass
+            for worker in ocupados:
+                with self._lock:
+                    resposta = self._coletar(worker)
+                if resposta is None:
+                    continue
+                pendentes, proxima = resposta
+                if self.ao_concluir is not None:
+                    try:
+                        self.ao_concluir(worker.nome, pendentes, proxima)
+                    except Exception as e:
+                        logger.warning(f'Erro ao entregar o resultado de {worker.nome}: {e}')
+
+    def _coletar(self, worker):
+        """
+        (pendentes, próxima verificação) se a execução do worker terminou,
+        ou None se ainda está rodando. Um worker que caiu, estourou o prazo
+        ou um limite é derrubado e conta como (0, None).
+        """
+        try:
+            if worker.conexao.poll():
+                resposta = worker.conexao.recv()
+                worker.inicio_execucao = None
+                if resposta[0] == 'resultado':
+                    worker.falhas = 0
+                    return resposta[1], resposta[2]
+                logger.error(f'Worker {worker.nome}: execução falhou: {resposta[1]}')
+                return 0, None
+        except (EOFError, OSError):
+            pass
+
+        prazo = self.prazos.get(worker.nome) or None
+        if worker.motivo_reinicio:
+            motivo = worker.motivo_reinicio
+        elif not worker.processo.is_alive():
+            motivo = f'processo saiu com código {worker.processo.exitcode}'
+        elif prazo and time.monotonic() - worker.inicio_execucao > prazo:
+            motivo = f'sem resposta em {prazo:.0f}s'
+        else:
+            return None
+        worker.inicio_execucao = None
+        self._falhou(worker, motivo)
+        return 0, None
+
+    def _falhou(self, worker, motivo):
+        worker.falhas += 1
+        atraso = min(self.backoff_inicial * 2 ** (worker.falhas - 1), self.backoff_maximo)
+        worker.proximo_inicio = time.monotonic() + atraso
+        logger.error(
+            f'Worker {worker.nome} reiniciado: {motivo}. '
+            f'Falha {worker.falhas} seguida; nova tentativa em {atraso:.0f}s.'
+        )
+        self._derrubar(worker)
+        if self.ao_falhar is not None:
+            try:
+                self.ao_falhar(worker.nome, motivo)
+            except Exception as e:
+                logger.warning(f'Erro ao notificar falha do worker {worker.nome}: {e}')
+
+    def _derrubar(self, worker):
+        """Encerra o worker e seus descendentes (Chrome, chromedriver...)."""
+        processo = worker.processo
+        if processo is None:
+            return
+        if worker.job is not None:
+            _fechar_job(worker.job)  # KILL_ON_JOB_CLOSE
+            worker.job = None
+        if processo.is_alive():
+            if os.name != 'nt':
+                try:
+                    os.killpg(processo.pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            processo.kill()
+        processo.join(5)
+        if worker.conexao is not None:
+            worker.conexao.close()
+        worker.processo = worker.conexao = None
+        worker.motivo_reinicio = None
+
+    def _iniciar_monitor(self):
+        if os.name == 'nt' or self._monitor is not None:
+            return  # No Windows os limites ficam com o Job Object
+        self._monitor = threading.Thread(
+            target=self._loop_monitor, name='supervisor-monitor', daemon=True
+        )
+        self._monitor.start()
+
+    def _loop_monitor(self):
+        while not self._parar.wait(self.intervalo_monitor):
+            for worker in list(self._workers.values()):
+                processo = worker.processo
+                if processo is None or worker.motivo_reinicio:
+                    continue
+                uso = _uso_posix(processo.pid)
+                if uso is not None:
+                    self._verificar_limites(worker, *uso)
+
+    def _verificar_limites(self, worker, memoria, cpu):
+        agora = time.monotonic()
+        if self.memoria_maxima and memoria > self.memoria_maxima:
+            worker.motivo_reinicio = (
+                f'memória {memoria / 2**20:.0f} MB acima do limite de '
+                f'{self.memoria_maxima / 2**20:.0f} MB'
+            )
+        elif self.cpu_maxima and worker.amostra_cpu is not None:
+            instante, anterior = worker.amostra_cpu
+            fracao = (cpu - anterior) / max(agora - instante, 1e-6) / (os.cpu_count() or 1)
+            if fracao <= self.cpu_maxima:
+                worker.acima_cpu_desde = None
+            elif worker.acima_cpu_desde is None:
+                worker.acima_cpu_desde = agora
+            elif agora - worker.acima_cpu_desde >= self.janela_cpu:
+                worker.motivo_reinicio = (
+                    f'CPU em {fracao:.0%} da máquina por {self.janela_cpu:.0f}s '
+                    f'(limite {self.cpu_maxima:.0%})'
+                )
+        worker.amostra_cpu = (agora, cpu)
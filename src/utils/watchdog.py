@@ -0,0 +1,124 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from src.config.logger import logger
+
+
+class PrazoExcedido(Exception):
+    """Lançada por `Prazo.verificar()` quando o prazo já expirou."""
+
+
+class Prazo:
+    """Prazo ativo no `Watchdog`; `expirado` passa a True ao vencer."""
+
+    def __init__(self, nome, segundos, ao_expirar=None):
+        self.nome = nome
+        self.segundos = segundos
+        self.ao_expirar = ao_expirar
+        self.limite = time.monotonic() + segundos if segundos else None
+        self.expirado = False
+
+    def restante(self):
+        if self.limite is None:
+            return None
+        return max(0.0, self.limite - time.monotonic())
+
+    def verificar(self):
+        """Interrompe fluxos longos (ex.: digitação) entre uma etapa e outra."""
+        if self.expirado:
+            raise PrazoExcedido(f'{self.nome}: prazo de {self.segundos:.0f}s excedido.')
+
+
+class Watchdog:
+    """
+    Vigia prazos de itens e de estágios em uma thread de fundo.
+
+    Uma chamada travada (um `WebDriverWait`, um `wait()` do pywinauto, uma
+    requisição sem resposta) não pode ser interrompida de fora da thread.
+    Por isso, quando um prazo vence, o watchdog marca o `Prazo` como
+    expirado e chama `ao_expirar`, que recicla o recurso usado pelo item
+    (fecha o Chrome, encerra o SIS MAMA): a chamada travada falha logo em
+    seguida e quem abriu o prazo reporta o item como timeout e segue para o
+    próximo. Sem `ao_expirar` o prazo só é reportado quando a chamada
+    retorna.
+
+    Prazos de estágio normalmente não têm `ao_expirar`; os loops consultam
+    `esgotado(estagio)` e param de pegar itens novos, deixando o restante
+    para a próxima execução.
+    """
+
+    def __init__(self, intervalo=1.0):
+        self.intervalo = intervalo
+        self._prazos = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @contextmanager
+    def prazo(self, nome, segundos, ao_expirar=None):
+        """
+        Vigia o bloco por `segundos` (None ou 0 desativa o prazo) e entrega
+        o `Prazo`, que deve ser consultado ao final do bloco.
+        """
+        prazo = Prazo(nome, segundos, ao_expirar)
+        if prazo.limite is None:
+            yield prazo
+            return
+        with self._lock:
+            self._prazos.append(prazo)
+            self._iniciar()
+        try:
+            yield prazo
+        finally:
+            with self._lock:
+                self._prazos.remove(prazo)
+
+    def esgotado(self, nome):
+        """Indica se algum prazo ativo com esse nome já expirou."""
+        with self._lock:
+            return any(p.expirado for p in self._prazos if p.nome == nome)
+
+    def _iniciar(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._loop, name='watchdog', daemon=True
+            )
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.intervalo)
+            agora = time.monotonic()
+            with self._lock:
+                if not self._prazos:
+                    # Sem prazos a thread termina; `prazo()` cria outra.
+                    self._thread = None
+                    return
+                vencidos = [
+                    p for p in self._prazos if not p.expirado and p.limite <= agora
+                ]
+                for prazo in vencidos:
+                    prazo.expirado = True
+            for prazo in vencidos:
+                logger.warning(
+                    f'Watchdog: {prazo.nome} excedeu o prazo de {prazo.segundos:.0f}s.'
+                )
+                if prazo.ao_expirar is None:
+                    continue
+                try:
+                    prazo.ao_expirar()
+                except Exception as e:
+                    logger.error(f'Watchdog: falha ao reciclar recurso de {prazo.nome}: {e}')
+
+
+_watchdog_padrao = None
+_watchdog_lock = threading.Lock()
+
+
+def obter_watchdog():
+    """Retorna o watchdog compartilhado do processo."""
+    global _watchdog_padrao
+    with _watchdog_lock:
+        if _watchdog_padrao is None:
+            _watchdog_padrao = Watchdog()
+        return _watchdog_padrao